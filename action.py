@@ -15,18 +15,39 @@ class PaintStep:
     affected_layer: Layer
 
     def undo_apply(self, grid: Grid):
-        sq = grid[self.affected_grid_square[0]][self.affected_grid_square[1]]
+        x, y = self.affected_grid_square
+        sq = grid[x, y]
         sq.erase(self.affected_layer)
 
     def redo_apply(self, grid: Grid):
-        sq = grid[self.affected_grid_square[0]][self.affected_grid_square[1]]
+        x, y = self.affected_grid_square
+        sq = grid[x, y]
         sq.add(self.affected_layer)
 
 
+@dataclass
+class ReplaceStep:
+    """
+    The layers painted on one square changing all at once, see Grid.set_layers.
+    """
+
+    affected_grid_square: tuple[int, int]
+    layers_before: tuple[Layer, ...]
+    layers_after: tuple[Layer, ...]
+
+    def undo_apply(self, grid: Grid):
+        x, y = self.affected_grid_square
+        grid.set_layers(x, y, self.layers_before)
+
+    def redo_apply(self, grid: Grid):
+        x, y = self.affected_grid_square
+        grid.set_layers(x, y, self.layers_after)
+
+
 @dataclass
 class PaintAction:
 
-    steps: list[PaintStep] = field(default_factory=list)
+    steps: list[PaintStep | ReplaceStep] = field(default_factory=list)
     is_special: bool = False
 
     def undo_apply(self, grid: Grid):
@@ -43,5 +64,13 @@ class PaintAction:
         for step in self.steps:
             step.redo_apply(grid)
 
-    def add_step(self, step: PaintStep):
+    def add_step(self, step: PaintStep | ReplaceStep):
         self.steps.append(step)
+
+    @classmethod
+    def replace_layer(cls, grid: Grid, old: Layer, new: Layer | None = None) -> PaintAction:
+        """
+        Replaces old with new on every square of the grid it is painted on, or erases it if new is None,
+        see Grid.replace_layer, and returns the change as one action which can be undone and replayed.
+        """
+        return cls([ReplaceStep(position, before, after) for position, before, after in grid.replace_layer(old, new)])
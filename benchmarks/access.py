@@ -0,0 +1,51 @@
+"""
+Cost of reaching the LayerStore of a square, one square at a time and a whole region at a time.
+
+Usage: python -m benchmarks.access
+"""
+
+import time
+from grid import Grid
+
+SIZE = 512
+REPEATS = 3
+
+
+def best(func) -> float:
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def nested(grid: Grid) -> None:
+    for x in range(grid.x):
+        for y in range(grid.y):
+            grid[x][y]
+
+
+def pair(grid: Grid) -> None:
+    for x in range(grid.x):
+        for y in range(grid.y):
+            grid[x, y]
+
+
+def region(grid: Grid) -> None:
+    for _ in grid.region(0, 0, grid.x, grid.y):
+        pass
+
+
+def main() -> None:
+    grid = Grid(Grid.DRAW_STYLE_SET, SIZE, SIZE)
+    squares = SIZE * SIZE
+    print(f"{SIZE}x{SIZE} grid of LayerStore objects, ns per square")
+    print(f"  grid[x][y]       {best(lambda: nested(grid)) / squares * 1e9:8.1f}")
+    if hasattr(grid, 'region'):
+        print(f"  grid[x, y]       {best(lambda: pair(grid)) / squares * 1e9:8.1f}")
+        print(f"  grid.region(...) {best(lambda: region(grid)) / squares * 1e9:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
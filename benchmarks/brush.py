@@ -0,0 +1,58 @@
+"""
+Paints per second of a brush stroke, with the old on_paint loop over the whole (2b+1)^2 box
+against the clipped diamond stencil of Grid.paint, both recording a PaintStep per square.
+
+Usage: python -m benchmarks.brush
+"""
+
+import random
+import time
+from action import PaintAction, PaintStep
+from grid import Grid
+from layers import red
+
+SIZE = 512
+PAINTS = 200
+
+
+def box_paint(grid: Grid, layer, px: int, py: int, brush_size: int) -> PaintAction:
+    steps = PaintAction()
+    for i in range(-brush_size, brush_size + 1):
+        for j in range(-brush_size, brush_size + 1):
+            if abs(px - (px + i)) + abs(py - (py + j)) <= brush_size:
+                try:
+                    x = abs(px + i)
+                    y = abs(py + j)
+                    grid[x, y].add(layer)
+                    steps.add_step(PaintStep((x, y), layer))
+                except IndexError:
+                    pass
+    return steps
+
+
+def stencil_paint(grid: Grid, layer, px: int, py: int, brush_size: int) -> PaintAction:
+    grid.brush_size = brush_size
+    return PaintAction([PaintStep(position, layer) for position in grid.paint(layer, px, py)])
+
+
+def paints_per_second(paint, brush_size: int) -> float:
+    rng = random.Random(brush_size)
+    grid = Grid(Grid.DRAW_STYLE_SET, SIZE, SIZE)
+    centres = [(rng.randrange(SIZE), rng.randrange(SIZE)) for _ in range(PAINTS)]
+    start = time.perf_counter()
+    for px, py in centres:
+        paint(grid, red, px, py, brush_size)
+    return PAINTS / (time.perf_counter() - start)
+
+
+def main() -> None:
+    print(f"{SIZE}x{SIZE} SET grid, paints per second")
+    print(f"  brush   box loop   stencil  speedup")
+    for brush_size in (5, 32, 128):
+        old = paints_per_second(box_paint, brush_size)
+        new = paints_per_second(stencil_paint, brush_size)
+        print(f"  {brush_size:5}  {old:9.1f}  {new:8.1f}  {new / old:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Microbenchmarks of BSet, comparing the new methods with how the same thing was done before.
+
+Usage: python -m benchmarks.bset
+"""
+
+import random
+import timeit
+from data_structures.bset import BSet
+
+SET_SIZES = [(10, 5), (64, 32), (1000, 100)]
+
+
+def looping_len(s: BSet) -> int:
+    """__len__ before using int.bit_count, checking every bit position."""
+    res = 0
+    for item in range(1, int.bit_length(s.elems) + 1):
+        if item in s:
+            res += 1
+    return res
+
+
+def scanning_iter(s: BSet) -> list:
+    """Listing the members before __iter__, checking every possible item."""
+    return [item for item in range(1, int.bit_length(s.elems) + 1) if item in s]
+
+
+def scanning_select(s: BSet, k: int) -> int:
+    """Finding the k-th member before select, scanning up from 1."""
+    for item in range(1, int.bit_length(s.elems) + 1):
+        if item in s:
+            if k == 0:
+                return item
+            k -= 1
+
+
+def microseconds(statement, number: int = 2000) -> float:
+    return min(timeit.repeat(statement, number=number, repeat=3)) / number * 1e6
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{'universe':>8} {'members':>8} {'operation':>10} {'before us':>10} {'after us':>9} {'speedup':>8}")
+    for universe, members in SET_SIZES:
+        s = BSet()
+        for item in rng.sample(range(1, universe + 1), members):
+            s.add(item)
+        t = BSet()
+        for item in rng.sample(range(1, universe + 1), members):
+            t.add(item)
+        k = members // 2
+        assert looping_len(s) == len(s) and scanning_iter(s) == list(s) and scanning_select(s, k) == s.select(k)
+
+        def in_place():
+            u = BSet()
+            u.elems = s.elems
+            u |= t
+            u &= s
+            u -= t
+
+        def allocating():
+            u = BSet()
+            u.elems = s.elems
+            u = u.union(t).intersection(s).difference(t)
+
+        rows = [
+            ("len", lambda: looping_len(s), lambda: len(s)),
+            ("iterate", lambda: scanning_iter(s), lambda: list(s)),
+            ("select", lambda: scanning_select(s, k), lambda: s.select(k)),
+            ("set ops", allocating, in_place),
+        ]
+        for name, before, after in rows:
+            before_us, after_us = microseconds(before), microseconds(after)
+            print(f"{universe:>8} {members:>8} {name:>10} {before_us:>10.2f} {after_us:>9.2f} {before_us / after_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
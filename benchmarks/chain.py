@@ -0,0 +1,56 @@
+"""
+Cost of AdditiveLayerStore.get_color, applying every queued layer vs the compiled chain.
+
+Usage: python -m benchmarks.chain
+"""
+
+import random
+import time
+from layer_store import AdditiveLayerStore
+from layer_util import get_layers
+
+CALLS = 20000
+QUEUE_LENGTHS = [10, 100]
+
+
+def naive_fold(store, start, timestamp, x, y):
+    """get_color before compiling, applying every layer in the queue."""
+    color = start
+    for layer in store.applied_layers():
+        color = layer.apply(color, timestamp, x, y)
+    return color
+
+
+def best_time(func, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    rng = random.Random(0)
+    all_layers = [layer for layer in get_layers() if layer is not None]
+    mixes = {
+        "any layers": all_layers,
+        "lighten/darken/invert": [layer for layer in all_layers if layer.channel_map is not None],
+        "no overwrites": [layer for layer in all_layers if not layer.overwrites],
+    }
+    print(f"{'layers':>22} {'queue':>6} {'chain':>6} {'naive ms':>9} {'compiled ms':>12} {'speedup':>8}")
+    for name, choices in mixes.items():
+        for length in QUEUE_LENGTHS:
+            store = AdditiveLayerStore()
+            for _ in range(length):
+                store.add(rng.choice(choices))
+            cells = [(rng.randrange(100), rng.randrange(100)) for _ in range(CALLS)]
+            assert all(store.get_color((1, 2, 3), 2.5, x, y) == naive_fold(store, (1, 2, 3), 2.5, x, y) for x, y in cells[:500])
+
+            naive = best_time(lambda: [naive_fold(store, (1, 2, 3), 2.5, x, y) for x, y in cells])
+            compiled = best_time(lambda: [store.get_color((1, 2, 3), 2.5, x, y) for x, y in cells])
+            print(f"{name:>22} {length:>6} {len(store.chain):>6} {naive * 1000:>9.1f} {compiled * 1000:>12.1f} {naive / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
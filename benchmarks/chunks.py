@@ -0,0 +1,54 @@
+"""
+Creating a grid and painting a few strokes on it, with a LayerStore object per square vs chunks
+made only where something is painted. Time and memory of chunks follow the painted area, not the size.
+
+Usage: python -m benchmarks.chunks
+"""
+
+import random
+import time
+import tracemalloc
+import layers
+from grid import Grid
+
+OBJECT_SIZES = [256, 1024]
+CHUNK_SIZES = [256, 1024, 100000]
+STROKES = 20
+STROKE_LENGTH = 200
+
+
+def strokes(size: int, rng: random.Random) -> list:
+    """ Random horizontal strokes three squares thick. """
+    cells = []
+    for _ in range(STROKES):
+        x, y = rng.randrange(size - STROKE_LENGTH), rng.randrange(size - 3)
+        cells.extend((x + i, y + j) for i in range(STROKE_LENGTH) for j in range(3))
+    return cells
+
+
+def run(style: str, size: int, backend: str) -> list:
+    cells = strokes(size, random.Random(size))
+    tracemalloc.start()
+    start = time.perf_counter()
+    grid = Grid(style, size, size, backend=backend)
+    create = time.perf_counter() - start
+    grid.add_many(layers.red, cells)
+    grid.add_many(layers.lighten, cells[::2])
+    paint = time.perf_counter() - start - create
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return [create, paint, memory / 2**20]
+
+
+def main() -> None:
+    print(f"{STROKES} strokes of {STROKE_LENGTH}x3 squares")
+    print(f"{'style':>9} {'size':>7} {'backend':>8} {'create s':>9} {'paint s':>8} {'MiB':>8}")
+    for style in Grid.DRAW_STYLE_OPTIONS:
+        for backend, sizes in ((Grid.BACKEND_OBJECTS, OBJECT_SIZES), (Grid.BACKEND_CHUNKS, CHUNK_SIZES)):
+            for size in sizes:
+                create, paint, memory = run(style, size, backend)
+                print(f"{style:>9} {size:>7} {backend:>8} {create:>9.3f} {paint:>8.3f} {memory:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
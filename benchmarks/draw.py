@@ -0,0 +1,91 @@
+"""
+Frame time of drawing the grid, one draw call per square vs GridMesh.
+
+Usage: python -m benchmarks.draw [--headless]
+"""
+
+import argparse
+import time
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--headless", action="store_true", help="Render offscreen (no display needed).")
+    p.add_argument("--frames", type=int, default=5)
+    args = p.parse_args()
+    if args.headless:
+        import pyglet
+        pyglet.options["headless"] = True
+
+import arcade
+from grid import Grid
+from grid_mesh import GridMesh
+from layers import rainbow, black, lighten, red, sparkle
+
+SIZES = [32, 128, 512]
+WIDTH, HEIGHT = 700, 700
+BG = [255, 255, 255]
+
+
+def paint(grid: Grid) -> None:
+    """Fill the grid with a mix of static and animated layers."""
+    palette = [None, rainbow, black, lighten, red, sparkle]
+    for x in range(grid.x):
+        for y in range(grid.y):
+            layer = palette[(x * 7 + y * 3) % len(palette)]
+            if layer is not None:
+                grid[x][y].add(layer)
+
+
+def draw_per_square(grid: Grid, sq_w: float, sq_h: float, timestamp: float) -> None:
+    """The drawing loop MyWindow.on_draw used before GridMesh."""
+    for x in range(grid.x):
+        for y in range(grid.y):
+            arcade.draw_lrtb_rectangle_filled(
+                sq_w * x, sq_w * (x + 1), sq_h * (y + 1), sq_h * y,
+                grid[x][y].get_color(BG[:], timestamp, x, y),
+            )
+
+
+def draw_mesh(mesh: GridMesh, grid: Grid, timestamp: float) -> None:
+    mesh.update(grid.colors(BG, timestamp))
+    mesh.draw()
+
+
+def time_frames(window: arcade.Window, draw, frames: int) -> float:
+    """Average wall time of a frame, waiting for the GPU to finish each one."""
+    total = 0
+    for frame in range(frames):
+        start = time.perf_counter()
+        window.clear()
+        draw(frame * 0.1)
+        window.ctx.finish()
+        total += time.perf_counter() - start
+    return total / frames
+
+
+def main(frames: int) -> None:
+    window = arcade.Window(WIDTH, HEIGHT, "benchmark", visible=False)
+    arcade.set_background_color(BG)
+    print(f"{'size':>9} {'per square (ms)':>16} {'mesh (ms)':>10} {'speedup':>8} {'same picture':>13}")
+    for size in SIZES:
+        grid = Grid(Grid.DRAW_STYLE_SET, size, size)
+        paint(grid)
+        sq_w, sq_h = WIDTH / size, HEIGHT / size
+        mesh = GridMesh(size, size, sq_w, sq_h)
+
+        # The per square loop takes seconds per frame at the largest size.
+        old_frames = frames if size <= 128 else 1
+        old = time_frames(window, lambda t: draw_per_square(grid, sq_w, sq_h, t), old_frames)
+        new = time_frames(window, lambda t: draw_mesh(mesh, grid, t), frames)
+
+        window.clear()
+        draw_per_square(grid, sq_w, sq_h, 0)
+        old_image = window.ctx.screen.read()
+        window.clear()
+        draw_mesh(mesh, grid, 0)
+        new_image = window.ctx.screen.read()
+        print(f"{size:>4}x{size:<4} {old * 1000:>16.1f} {new * 1000:>10.1f} {old / new:>7.1f}x {str(old_image == new_image):>13}")
+
+
+if __name__ == "__main__":
+    main(args.frames)
@@ -0,0 +1,61 @@
+"""
+Time and peak memory to find the region a bucket fill paints on a million square SET grid,
+with a queue of single squares and a set of those seen against the scanline Grid.fill_region.
+A recursive fill can't do it at all, it runs into the recursion limit after 1000 squares.
+
+Usage: python -m benchmarks.fill
+"""
+
+import time
+import tracemalloc
+from grid import Grid
+from layers import red
+
+SIZE = 1000
+
+
+def square_fill(grid: Grid, px: int, py: int) -> int:
+    target = grid[px, py].state_key()
+    seen = {(px, py)}
+    queue = [(px, py)]
+    while queue:
+        x, y = queue.pop()
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < grid.x and 0 <= ny < grid.y and (nx, ny) not in seen and grid[nx, ny].state_key() == target:
+                seen.add((nx, ny))
+                queue.append((nx, ny))
+    return len(seen)
+
+
+def scanline_fill(grid: Grid, px: int, py: int) -> int:
+    return sum(y1 - y0 for _, y0, y1 in grid.fill_region(px, py))
+
+
+def measure(fill, grid: Grid) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    count = fill(grid, 0, 0)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fill(grid, 0, 0)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, count
+
+
+def main() -> None:
+    empty = Grid(Grid.DRAW_STYLE_SET, SIZE, SIZE)
+    # Walls every 10 columns, open at alternate ends, so the region winds through the whole grid.
+    walls = Grid(Grid.DRAW_STYLE_SET, SIZE, SIZE)
+    for x in range(5, SIZE, 10):
+        for y in range(1, SIZE) if x % 20 == 5 else range(SIZE - 1):
+            walls[x, y].add(red)
+    print(f"{SIZE}x{SIZE} SET grid, finding the region from (0, 0)")
+    print(f"  grid      squares   square queue s      MB   scanline s      MB")
+    for name, grid in (("empty", empty), ("walls", walls)):
+        old, old_peak, count = measure(square_fill, grid)
+        new, new_peak, _ = measure(scanline_fill, grid)
+        print(f"  {name:<6}  {count:9}  {old:14.2f}  {old_peak / 1e6:6.1f}  {new:11.2f}  {new_peak / 1e6:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Per frame cost of getting every square's colour on a static canvas,
+calling get_color on every square vs Grid.colors.
+
+Usage: python -m benchmarks.framebuffer
+"""
+
+import itertools
+import time
+from grid import Grid
+from layers import black, lighten, red, green, invert
+
+SIZES = [128, 512]
+FRAMES = 20
+CHANGES_PER_FRAME = 10
+BG = (255, 255, 255)
+CHANGE = itertools.count()  # Shared so every timed frame paints different squares.
+
+
+def paint(grid: Grid) -> None:
+    """Fill the grid with static layers only."""
+    palette = [None, black, lighten, red, green, invert]
+    for x in range(grid.x):
+        for y in range(grid.y):
+            layer = palette[(x * 7 + y * 3) % len(palette)]
+            if layer is not None:
+                grid[x][y].add(layer)
+
+
+def every_square(grid: Grid, timestamp: float) -> None:
+    for x in range(grid.x):
+        for y in range(grid.y):
+            grid[x][y].get_color(BG, timestamp, x, y)
+
+
+def time_frames(grid: Grid, draw) -> float:
+    """Average time of a frame, with a few squares painted before each one."""
+    total = 0
+    for frame in range(FRAMES):
+        for _ in range(CHANGES_PER_FRAME):
+            change = next(CHANGE)
+            square = grid[change * 31 % grid.x][change * 17 % grid.y]
+            # Squares repeat every grid.x changes, so swap layers each time round.
+            square.add(red if change // grid.x % 2 else green)
+        start = time.perf_counter()
+        draw(grid, frame / 60)
+        total += time.perf_counter() - start
+    return total / FRAMES
+
+
+def main() -> None:
+    print(f"{CHANGES_PER_FRAME} squares painted per frame")
+    print(f"{'size':>9} {'every square (ms)':>18} {'Grid.colors (ms)':>17} {'speedup':>8}")
+    for size in SIZES:
+        grid = Grid(Grid.DRAW_STYLE_SET, size, size)
+        paint(grid)
+        old = time_frames(grid, every_square)
+        grid.colors(BG, 0)  # The first frame computes everything.
+        new = time_frames(grid, lambda g, t: g.colors(BG, t))
+        print(f"{size:>4}x{size:<4} {old * 1000:>18.2f} {new * 1000:>17.3f} {old / new:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Throughput of every registered layer, apply on each square vs the batch form.
+
+Usage: python -m benchmarks.layers
+"""
+
+import time
+import numpy as np
+from layer_util import get_layers
+
+SQUARES = 512 * 512
+
+
+def best_time(func, repeats: int = 3) -> float:
+    best = float("inf")
+    for i in range(repeats):
+        start = time.perf_counter()
+        func(i * 0.5)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def scalar(layer, colors: list, xs: list, ys: list, timestamp: float) -> None:
+    for color, x, y in zip(colors, xs, ys):
+        layer.apply(color, timestamp, x, y)
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    xs = rng.integers(0, 512, SQUARES)
+    ys = rng.integers(0, 512, SQUARES)
+    colors = rng.integers(0, 256, (SQUARES, 3))
+    colors_list = [tuple(c) for c in colors.tolist()]
+    xs_list, ys_list = xs.tolist(), ys.tolist()
+
+    print(f"{SQUARES} squares")
+    print(f"{'layer':>8} {'apply (Msq/s)':>14} {'batch (Msq/s)':>14} {'speedup':>8}")
+    for layer in get_layers():
+        if layer is None:
+            break
+        old = best_time(lambda t: scalar(layer, colors_list, xs_list, ys_list, t))
+        new = best_time(lambda t: layer.apply_batch(colors, t, xs, ys))
+        print(f"{layer.name:>8} {SQUARES / old / 1e6:>14.2f} {SQUARES / new / 1e6:>14.1f} {old / new:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Memory used by a newly created grid of each draw style and backend, and by one with 8 layers on every square.
+
+Usage: python -m benchmarks.memory
+"""
+
+import gc
+import time
+import tracemalloc
+import layers
+from grid import Grid
+
+SIZE = 512
+LAYERS_ADDED = [layers.red, layers.lighten, layers.green, layers.invert,
+                layers.blue, layers.darken, layers.black, layers.rainbow]
+
+
+def measure(style: str, backend: str, layer_count: int) -> tuple[int, float]:
+    """ Returns the bytes traced and seconds taken to create a grid and add the layers to every square. """
+    everything = [(x, y) for x in range(SIZE) for y in range(SIZE)]
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    grid = Grid(style, SIZE, SIZE, backend=backend)
+    for layer in LAYERS_ADDED[:layer_count]:
+        grid.add_many(layer, everything)
+    elapsed = time.perf_counter() - start
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del grid
+    return used, elapsed
+
+
+def main() -> None:
+    print(f"{SIZE}x{SIZE} grid, traced by tracemalloc")
+    print(f"{'style':>9} {'backend':>8} {'layers':>6} {'MiB':>8} {'bytes/square':>13} {'seconds':>8}")
+    for style in Grid.DRAW_STYLE_OPTIONS:
+        backends = [Grid.BACKEND_OBJECTS, Grid.BACKEND_ARRAYS, Grid.BACKEND_STATES]
+        if style == Grid.DRAW_STYLE_SEQUENCE:
+            backends.append(Grid.BACKEND_PLANES)
+        for backend in backends:
+            for layer_count in (0, len(LAYERS_ADDED)):
+                used, elapsed = measure(style, backend, layer_count)
+                print(f"{style:>9} {backend:>8} {layer_count:>6} {used / 2**20:>8.1f} {used / SIZE**2:>13.0f} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
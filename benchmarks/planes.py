@@ -0,0 +1,47 @@
+"""
+Sequence grids with a LayerStore object per square vs bit planes over the whole grid.
+
+Usage: python -m benchmarks.planes
+"""
+
+import random
+import time
+import tracemalloc
+from grid import Grid
+from layer_util import get_layers
+
+SIZES = [256, 512]
+PLANES_ONLY = 1024
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run(size: int, backend: str, rng: random.Random) -> list:
+    layers = [layer for layer in get_layers() if layer is not None]
+    tracemalloc.start()
+    grid, create = timed(lambda: Grid(Grid.DRAW_STYLE_SEQUENCE, size, size, backend=backend))
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # A quarter of the canvas painted with each layer.
+    regions = [[(rng.randrange(size), rng.randrange(size)) for _ in range(size * size // 4)] for _ in layers]
+    _, add = timed(lambda: [grid.add_many(layer, cells) for layer, cells in zip(layers, regions)])
+    _, special = timed(grid.special)
+    _, erase = timed(lambda: [grid.erase_many(layer, cells) for layer, cells in zip(layers, regions)])
+    return [create, memory / 2**20, add, special, erase]
+
+
+def main() -> None:
+    print(f"{'size':>6} {'backend':>8} {'create s':>9} {'MiB':>7} {'add s':>7} {'special s':>10} {'erase s':>8}")
+    for size in SIZES + [PLANES_ONLY]:
+        backends = [Grid.BACKEND_PLANES] if size == PLANES_ONLY else [Grid.BACKEND_OBJECTS, Grid.BACKEND_PLANES]
+        for backend in backends:
+            create, memory, add, special, erase = run(size, backend, random.Random(size))
+            print(f"{size:>6} {backend:>8} {create:>9.2f} {memory:>7.1f} {add:>7.2f} {special:>10.3f} {erase:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Cost of the rainbow layer, converting the hue of every square vs once per distinct hue.
+
+Usage: python -m benchmarks.rainbow
+"""
+
+import colorsys
+import time
+import numpy as np
+from layers import rainbow, _hls_to_rgb
+
+SIZES = [32, 256, 1024]
+
+
+def uncached_rainbow(color, timestamp, x, y):
+    """rainbow before caching by hue."""
+    return tuple(int(255*x) for x in colorsys.hls_to_rgb((timestamp/20 + x/20 + y/20)%1, 0.6, 0.6))
+
+
+def uncached_batch(colors, timestamp, xs, ys):
+    """The batch form of rainbow before caching by hue."""
+    return (255*_hls_to_rgb((timestamp/20 + xs/20 + ys/20)%1, 0.6, 0.6)).astype(np.int64)
+
+
+def best_time(func, repeats: int = 3) -> float:
+    # A new timestamp every run, so every run is a new frame.
+    best = float("inf")
+    for i in range(repeats):
+        start = time.perf_counter()
+        func(i * 0.37)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def scalar(apply, xs: list, ys: list, timestamp: float) -> None:
+    for x, y in zip(xs, ys):
+        apply(None, timestamp, x, y)
+
+
+def main() -> None:
+    for size in SIZES:
+        xs, ys = np.divmod(np.arange(size * size), size)
+        colors = np.zeros((size * size, 3), dtype=np.int64)
+        xs_list, ys_list = xs.tolist(), ys.tolist()
+        assert (uncached_batch(colors, 1.5, xs, ys) == rainbow.apply_batch(colors, 1.5, xs, ys)).all()
+        hues = len(np.unique((1.5/20 + xs/20 + ys/20)%1))
+        print(f"{size}x{size}: {hues} distinct hues in a frame, outputs checked identical")
+        print(f"{'size':>6} {'version':>16} {'ms':>9} {'Msq/s':>7} {'vs first':>9}")
+
+        timings = [
+            ("scalar", best_time(lambda t: scalar(uncached_rainbow, xs_list, ys_list, t))),
+            ("scalar, cached", best_time(lambda t: scalar(rainbow.apply, xs_list, ys_list, t))),
+            ("batch", best_time(lambda t: uncached_batch(colors, t, xs, ys))),
+            ("batch, cached", best_time(lambda t: rainbow.apply_batch(colors, t, xs, ys))),
+        ]
+        for name, seconds in timings:
+            print(f"{size:>6} {name:>16} {seconds * 1000:>9.1f} {size * size / seconds / 1e6:>7.2f} "
+                  f"{timings[0][1] / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
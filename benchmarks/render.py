@@ -0,0 +1,56 @@
+"""
+Throughput of rendering a whole grid, get_color on every square vs renderer.render.
+
+Usage: python -m benchmarks.render
+"""
+
+import time
+from grid import Grid
+from renderer import render
+from layers import rainbow, black, lighten, red, green, invert, sparkle
+
+SIZES = [256, 512, 1024]
+BG = (255, 255, 255)
+CANVASES = {
+    "static": [None, black, lighten, red, green, invert],
+    "animated": [None, rainbow, black, lighten, red, sparkle],
+}
+
+
+def paint(grid: Grid, palette: list) -> None:
+    for x in range(grid.x):
+        for y in range(grid.y):
+            layer = palette[(x * 7 + y * 3) % len(palette)]
+            if layer is not None:
+                grid[x][y].add(layer)
+
+
+def every_square(grid: Grid, timestamp: float) -> None:
+    for x in range(grid.x):
+        for y in range(grid.y):
+            grid[x][y].get_color(BG, timestamp, x, y)
+
+
+def best_time(func, repeats: int = 3) -> float:
+    best = float("inf")
+    for i in range(repeats):
+        start = time.perf_counter()
+        func(i * 0.5)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    print(f"{'canvas':>8} {'size':>10} {'get_color (Msq/s)':>18} {'render (Msq/s)':>15} {'speedup':>8}")
+    for name, palette in CANVASES.items():
+        for size in SIZES:
+            grid = Grid(Grid.DRAW_STYLE_SET, size, size)
+            paint(grid, palette)
+            old = best_time(lambda t: every_square(grid, t))
+            new = best_time(lambda t: render(grid, t, BG))
+            squares = size * size / 1e6
+            print(f"{name:>8} {size:>4}x{size:<5} {squares / old:>18.2f} {squares / new:>15.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
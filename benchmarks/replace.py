@@ -0,0 +1,47 @@
+"""
+Cost of finding and replacing one layer across a large canvas,
+scanning every square against looking the squares up in the layer index.
+
+Usage: python -m benchmarks.replace
+"""
+
+import random
+import time
+from action import PaintAction
+from grid import Grid
+from layers import red, blue, lighten
+
+SIZE = 512
+PAINTED = 2000
+
+
+def scan(grid: Grid, layer) -> list[tuple[int, int]]:
+    return [(x, y) for x in range(grid.x) for y in range(grid.y)
+            if any(other.index == layer.index for other in grid[x, y].painted_layers())]
+
+
+def timed(func) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{SIZE}x{SIZE} grids with red on {PAINTED} squares, ms")
+    print(f"  style       find by scan  find by index  replace everywhere")
+    for style in Grid.DRAW_STYLE_OPTIONS:
+        grid = Grid(style, SIZE, SIZE)
+        for _ in range(PAINTED):
+            x, y = rng.randrange(SIZE), rng.randrange(SIZE)
+            grid[x, y].add(lighten)
+            grid[x, y].add(red)
+        scanned, found = timed(lambda: scan(grid, red))
+        indexed, listed = timed(lambda: grid.layer_index.positions(red.index))
+        assert found == listed
+        replaced, action = timed(lambda: PaintAction.replace_layer(grid, red, blue))
+        print(f"  {style:<10}  {scanned * 1e3:12.1f}  {indexed * 1e3:13.2f}  {replaced * 1e3:18.1f}")
+
+
+if __name__ == "__main__":
+    main()
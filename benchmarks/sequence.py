@@ -0,0 +1,79 @@
+"""
+Cost of SequenceLayerStore.get_color over a canvas where most squares share a handful of masks,
+walking every LAYERS slot vs visiting set bits with the shared mask caches.
+
+Usage: python -m benchmarks.sequence
+"""
+
+import random
+import time
+from grid import Grid
+from layer_util import LAYERS
+from layers import black, lighten, invert, red, green, blue, darken, rainbow, sparkle
+
+SIZE = 256
+MASKS = {
+    "pure": [
+        (lighten,), (black, lighten), (red, invert, darken),
+        (green, lighten, darken), (blue, invert), (black, lighten, invert, darken),
+    ],
+    "mixed": [
+        (lighten,), (black, lighten), (red, invert, darken),
+        (rainbow, lighten), (blue, sparkle), (black, lighten, invert, sparkle),
+    ],
+}
+
+
+def walking_get_color(store, start, timestamp, x, y):
+    """get_color before only visiting set bits, checking every LAYERS slot."""
+    if store.layers_store.is_empty():
+        return start
+    current_color = start
+    for i in range(len(LAYERS)):
+        try:
+            if type(LAYERS[i].index) == int:
+                if store.layers_store.__contains__(LAYERS[i].index+1):
+                    current_color = LAYERS[i].apply(current_color, timestamp, x, y)
+        except:
+            break
+    return current_color
+
+
+def best_time(func, repeats: int = 3) -> float:
+    best = float("inf")
+    for i in range(repeats):
+        start = time.perf_counter()
+        func(i * 0.5)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def paint_all(grid, get_color, timestamp):
+    for x in range(grid.x):
+        column = grid[x]
+        for y in range(grid.y):
+            get_color(column[y], (255, 255, 255), timestamp, x, y)
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{SIZE}x{SIZE} SEQUENCE grid, every square has one of a handful of masks")
+    print(f"{'masks':>6} {'walk ms':>9} {'set bits ms':>12} {'speedup':>8}")
+    for name, masks in MASKS.items():
+        grid = Grid(Grid.DRAW_STYLE_SEQUENCE, SIZE, SIZE)
+        for x in range(SIZE):
+            for y in range(SIZE):
+                # Most squares have one of the masks, a few are left empty.
+                if rng.random() < 0.95:
+                    for layer in rng.choice(masks):
+                        grid[x][y].add(layer)
+        for x, y in [(rng.randrange(SIZE), rng.randrange(SIZE)) for _ in range(2000)]:
+            assert grid[x][y].get_color((255, 255, 255), 1.5, x, y) == walking_get_color(grid[x][y], (255, 255, 255), 1.5, x, y)
+
+        walking = best_time(lambda t: paint_all(grid, walking_get_color, t))
+        set_bits = best_time(lambda t: paint_all(grid, lambda store, *args: store.get_color(*args), t))
+        print(f"{name:>6} {walking * 1000:>9.1f} {set_bits * 1000:>12.1f} {walking / set_bits:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Checkpointing a grid: deep copying a grid of LayerStore objects vs a snapshot of a grid of shared states.
+
+Usage: python -m benchmarks.snapshots
+"""
+
+import copy
+import random
+import time
+import layers
+from grid import Grid
+
+COPY_SIZE = 256
+SNAPSHOT_SIZE = 1024
+CHECKPOINTS = 100
+BRUSH = [(i, j) for i in range(-2, 3) for j in range(-2, 3) if abs(i) + abs(j) <= 2]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def paint(grid: Grid, rng: random.Random) -> None:
+    """ One brush stroke somewhere on the grid. """
+    x, y = rng.randrange(2, grid.x - 2), rng.randrange(2, grid.y - 2)
+    grid.add_many(layers.red, [(x + i, y + j) for i, j in BRUSH])
+
+
+def main() -> None:
+    rng = random.Random(0)
+    grid = Grid(Grid.DRAW_STYLE_SET, COPY_SIZE, COPY_SIZE)
+    for _ in range(CHECKPOINTS):
+        paint(grid, rng)
+    _, elapsed = timed(lambda: copy.deepcopy(grid.cells))
+    print(f"deep copy of a {COPY_SIZE}x{COPY_SIZE} object grid: {elapsed * 1000:.1f}ms")
+
+    grid = Grid(Grid.DRAW_STYLE_SET, SNAPSHOT_SIZE, SNAPSHOT_SIZE, backend=Grid.BACKEND_STATES)
+    snapshots = []
+    snapshot_time = paint_time = 0
+    for _ in range(CHECKPOINTS):
+        snapshot, elapsed = timed(grid.snapshot)
+        snapshots.append(snapshot)
+        snapshot_time += elapsed
+        _, elapsed = timed(lambda: paint(grid, rng))
+        paint_time += elapsed
+    _, restore_one = timed(lambda: grid.restore(snapshots[-1]))
+    _, restore_all = timed(lambda: grid.restore(snapshots[0]))
+    print(f"{SNAPSHOT_SIZE}x{SNAPSHOT_SIZE} state grid, {CHECKPOINTS} strokes with a snapshot before each:")
+    print(f"  snapshot {snapshot_time / CHECKPOINTS * 1e6:.1f}us, stroke after a snapshot {paint_time / CHECKPOINTS * 1000:.2f}ms")
+    print(f"  restore one stroke back {restore_one * 1000:.2f}ms, {CHECKPOINTS} strokes back {restore_all * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Cost of the sparkle layer, stepping its generator one step at a time vs jumping ahead.
+
+Usage: python -m benchmarks.sparkle
+"""
+
+import time
+import numpy as np
+from layers import sparkle, lighten, darken
+
+SQUARES = 512 * 512
+
+
+def looping_sparkle(color, timestamp, x, y):
+    """sparkle before jumping ahead."""
+    ts = int((timestamp + x/3 + y/5) * 3)
+    other = x
+    for _ in range(10 + (ts * 31 % 17)):
+        other = (1103515245 * other + 12345) % (1 << 31)
+    other += y
+    for _ in range(10 + (ts * 31 % 17)):
+        other = (1103515245 * other + 12345) % (1 << 31)
+    other = (other & ((1 << 31)-1)) >> 16
+    if other/(1 << 15) < 0.1:
+        return lighten.apply(color, timestamp, x, y)
+    return darken.apply(color, timestamp, x, y)
+
+
+def stepping_batch(colors, timestamp, xs, ys):
+    """The batch form of sparkle before jumping ahead, stepping every square at once."""
+    ts = np.trunc((timestamp + xs/3 + ys/5) * 3).astype(np.int64)
+    steps = 10 + (ts * 31 % 17)
+    other = xs.astype(np.uint64)
+    for step in range(26):
+        other = np.where(step < steps, (np.uint64(1103515245) * other + np.uint64(12345)) % np.uint64(1 << 31), other)
+    other = other + ys.astype(np.uint64)
+    for step in range(26):
+        other = np.where(step < steps, (np.uint64(1103515245) * other + np.uint64(12345)) % np.uint64(1 << 31), other)
+    other = (other & np.uint64((1 << 31)-1)) >> np.uint64(16)
+    lit = (other/(1 << 15) < 0.1)[:, None]
+    return np.where(lit, lighten.apply_batch(colors, timestamp, xs, ys), darken.apply_batch(colors, timestamp, xs, ys))
+
+
+def best_time(func, repeats: int = 3) -> float:
+    best = float("inf")
+    for i in range(repeats):
+        start = time.perf_counter()
+        func(i * 0.5)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def scalar(apply, colors: list, xs: list, ys: list, timestamp: float) -> None:
+    for color, x, y in zip(colors, xs, ys):
+        apply(color, timestamp, x, y)
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    xs = rng.integers(0, 512, SQUARES)
+    ys = rng.integers(0, 512, SQUARES)
+    colors = rng.integers(0, 256, (SQUARES, 3))
+    colors_list = [tuple(c) for c in colors.tolist()]
+    xs_list, ys_list = xs.tolist(), ys.tolist()
+
+    assert (stepping_batch(colors, 1.5, xs, ys) == sparkle.apply_batch(colors, 1.5, xs, ys)).all()
+    assert all(looping_sparkle(c, 1.5, x, y) == sparkle.apply(c, 1.5, x, y)
+               for c, x, y in zip(colors_list[:10000], xs_list, ys_list))
+
+    timings = [
+        ("scalar, stepping", best_time(lambda t: scalar(looping_sparkle, colors_list, xs_list, ys_list, t))),
+        ("scalar, jump ahead", best_time(lambda t: scalar(sparkle.apply, colors_list, xs_list, ys_list, t))),
+        ("batch, stepping", best_time(lambda t: stepping_batch(colors, t, xs, ys))),
+        ("batch, jump ahead", best_time(lambda t: sparkle.apply_batch(colors, t, xs, ys))),
+    ]
+    print(f"{SQUARES} squares, outputs checked identical")
+    print(f"{'version':>20} {'ms':>9} {'Msq/s':>7} {'vs first':>9}")
+    for name, seconds in timings:
+        print(f"{name:>20} {seconds * 1000:>9.1f} {SQUARES / seconds / 1e6:>7.2f} {timings[0][1] / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
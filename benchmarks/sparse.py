@@ -0,0 +1,57 @@
+"""
+Cost of grid-wide work on a large canvas with only a few hundred painted squares,
+going over every square against going over the occupied ones only.
+
+Usage: python -m benchmarks.sparse
+"""
+
+import random
+import time
+import numpy as np
+from grid import Grid
+from renderer import render, render_cells
+from layers import red, blue, lighten, rainbow
+
+SIZE = 512
+PAINTED = 300
+REPEATS = 3
+
+
+def best(func) -> float:
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def special_everywhere(grid: Grid) -> None:
+    for store in grid.cells:
+        store.special()
+
+
+def render_everywhere(grid: Grid) -> None:
+    out = np.empty((grid.x, grid.y, 3), dtype=np.uint8)
+    render_cells(grid, grid.region(0, 0, grid.x, grid.y).positions(), 0, (255, 255, 255), out)
+
+
+def main() -> None:
+    rng = random.Random(0)
+    grid = Grid(Grid.DRAW_STYLE_ADD, SIZE, SIZE)
+    for _ in range(PAINTED):
+        x, y = rng.randrange(SIZE), rng.randrange(SIZE)
+        for layer in rng.sample([red, blue, lighten, rainbow], 2):
+            grid[x, y].add(layer)
+    starts = iter((k, k, k) for k in range(256))
+    print(f"{SIZE}x{SIZE} ADD grid with {len(grid.occupied)} occupied squares, ms")
+    print(f"                       every square  occupied")
+    print(f"  special              {best(lambda: special_everywhere(grid)) * 1e3:12.2f}"
+          f"  {best(grid.special) * 1e3:8.2f}")
+    print(f"  render               {best(lambda: render_everywhere(grid)) * 1e3:12.2f}"
+          f"  {best(lambda: render(grid, 0)) * 1e3:8.2f}")
+    print(f"  colors, new start    {'':12}  {best(lambda: grid.colors(next(starts), 0)) * 1e3:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Cost of Grid.special on a large canvas of LayerStore objects, applying special to every store
+against flipping the special the stores share, and of the colors() call after it.
+
+Usage: python -m benchmarks.special
+"""
+
+import random
+import time
+from grid import Grid
+from layers import red, blue, lighten, rainbow
+
+SIZE = 512
+PAINTED = 2000
+REPEATS = 3
+
+
+def best(func) -> float:
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def special_per_store(grid: Grid) -> None:
+    for store in grid.cells:
+        store.special()
+
+
+def painted(style: str) -> Grid:
+    rng = random.Random(0)
+    grid = Grid(style, SIZE, SIZE)
+    for _ in range(PAINTED):
+        x, y = rng.randrange(SIZE), rng.randrange(SIZE)
+        for layer in rng.sample([red, blue, lighten, rainbow], 2):
+            grid[x, y].add(layer)
+    grid.colors((255, 255, 255), 0)
+    return grid
+
+
+def main() -> None:
+    print(f"{SIZE}x{SIZE} grids with {PAINTED} painted squares, ms")
+    print(f"  style   every store  Grid.special  colors after")
+    for style in (Grid.DRAW_STYLE_SET, Grid.DRAW_STYLE_ADD):
+        # Twice, so the squares end up as they were.
+        per_store = best(lambda grid=painted(style): (special_per_store(grid), special_per_store(grid))) / 2
+        grid = painted(style)
+        shared = best(grid.special)
+        colors = best(lambda: (grid.special(), grid.colors((255, 255, 255), 0)))
+        print(f"  {style:<6}  {per_store * 1e3:11.1f}  {shared * 1e3:12.4f}  {colors * 1e3:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Cost of a fast drag across the window, one motion event per flick, with the old try_draw walking the
+mouse path in 0.5 pixel steps and painting the brush at each new square it reaches, against stroking
+the brush along the squares in between with stencil.line and Grid.stroke.
+
+Usage: python -m benchmarks.stroke
+"""
+
+import math
+import random
+import time
+from action import PaintAction, PaintStep
+from grid import Grid
+from layers import lighten
+from stencil import line
+
+GRID_SIZE = 32
+SQ_WIDTH = 700 / GRID_SIZE
+SQ_HEIGHT = 700 / GRID_SIZE
+FLICKS = 200
+
+
+def walk_paint(grid: Grid, start: tuple, end: tuple) -> int:
+    mhat_dist = abs(end[0] - start[0]) + abs(end[1] - start[1])
+    points_to_draw = []
+    for d in range(1, math.ceil(mhat_dist / 0.5) + 1):
+        distance = min(d * 0.5 / mhat_dist, 1)
+        nx = distance * (end[0] - start[0]) + start[0]
+        ny = distance * (end[1] - start[1]) + start[1]
+        points_to_draw.append((int(nx // SQ_WIDTH), int(ny // SQ_HEIGHT)))
+    prev_drawn = (int(start[0] // SQ_WIDTH), int(start[1] // SQ_HEIGHT))
+    added = 0
+    for px, py in points_to_draw:
+        if (px, py) != prev_drawn and 0 <= px < grid.x and 0 <= py < grid.y:
+            steps = PaintAction([PaintStep(position, lighten) for position in grid.paint(lighten, px, py)])
+            added += len(steps.steps)
+            prev_drawn = (px, py)
+    return added
+
+
+def stroke_paint(grid: Grid, start: tuple, end: tuple) -> int:
+    points = line(int(start[0] // SQ_WIDTH), int(start[1] // SQ_HEIGHT), int(end[0] // SQ_WIDTH), int(end[1] // SQ_HEIGHT))[1:]
+    points = [(px, py) for px, py in points if 0 <= px < grid.x and 0 <= py < grid.y]
+    steps = PaintAction([PaintStep(position, lighten) for position in grid.stroke(lighten, points)])
+    return len(steps.steps)
+
+
+def flicks(paint, brush_size: int) -> tuple[float, float]:
+    rng = random.Random(0)
+    grid = Grid(Grid.DRAW_STYLE_ADD, GRID_SIZE, GRID_SIZE, brush_size=brush_size, max_layers=1000)
+    moves = [((rng.uniform(0, 700), rng.uniform(0, 700)), (rng.uniform(0, 700), rng.uniform(0, 700))) for _ in range(FLICKS)]
+    added = 0
+    start = time.perf_counter()
+    for begin, end in moves:
+        added += paint(grid, begin, end)
+    return (time.perf_counter() - start) / FLICKS, added / FLICKS
+
+
+def main() -> None:
+    print(f"{GRID_SIZE}x{GRID_SIZE} ADD grid in the window's {SQ_WIDTH:.1f}x{SQ_HEIGHT:.1f} pixel squares, per flick")
+    print(f"  brush   0.5px walk ms  layers added   stroke ms  layers added")
+    for brush_size in (0, 2, 5):
+        old, old_added = flicks(walk_paint, brush_size)
+        new, new_added = flicks(stroke_paint, brush_size)
+        print(f"  {brush_size:5}  {old * 1e3:14.2f}  {old_added:12.0f}  {new * 1e3:10.2f}  {new_added:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Longest frame spent on a special of a large sequence canvas, done in one go with Grid.special
+against spread over frames with Grid.start_special and step_special.
+
+Usage: python -m benchmarks.sweep
+"""
+
+import random
+import time
+from grid import Grid
+from layer_store import SequenceLayerStore
+from layer_util import get_layers
+
+SIZE = 512
+BUDGET = 0.008
+
+
+def painted() -> Grid:
+    rng = random.Random(0)
+    layers = [layer for layer in get_layers() if layer is not None]
+    grid = Grid(Grid.DRAW_STYLE_SEQUENCE, SIZE, SIZE)
+    for x in range(SIZE):
+        for y in range(SIZE):
+            for layer in rng.sample(layers, rng.randrange(1, len(layers))):
+                grid[x, y].add(layer)
+    grid.colors((255, 255, 255), 0)
+    return grid
+
+
+def main() -> None:
+    grid = painted()
+    SequenceLayerStore.special_cache.clear()
+    start = time.perf_counter()
+    grid.special()
+    grid.colors((255, 255, 255), 0)
+    at_once = time.perf_counter() - start
+
+    grid = painted()
+    SequenceLayerStore.special_cache.clear()
+    frames = []
+    start = time.perf_counter()
+    grid.start_special()
+    frames.append(time.perf_counter() - start)
+    done = False
+    while not done:
+        start = time.perf_counter()
+        done = grid.step_special(BUDGET)
+        grid.colors((255, 255, 255), 0)
+        frames.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    grid.colors((255, 255, 255), 1)
+    steady = time.perf_counter() - start
+    print(f"{SIZE}x{SIZE} sequence grid, every square painted, ms")
+    print(f"  colors, a frame without special  {steady * 1e3:8.1f}")
+    print(f"  Grid.special, one frame          {at_once * 1e3:8.1f}")
+    print(f"  start_special                    {frames[0] * 1e3:8.1f}")
+    print(f"  step_special({BUDGET}), {len(frames) - 1:3} frames, longest {max(frames[1:-1], default=0) * 1e3:8.1f}"
+          f", last with colors {frames[-1] * 1e3:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 """
 
 from __future__ import annotations
+from typing import Iterator
 from data_structures.set_adt import Set
 
 class BSet(Set[int]):
@@ -35,15 +36,38 @@ class BSet(Set[int]):
         return (self.elems >> (item - 1)) & 1
 
     def __len__(self) -> int:
+        """ Size computation, counting the set bits with int.bit_count. """
+        return self.elems.bit_count()
+
+    def __iter__(self) -> Iterator[int]:
+        """ Iterates over the elements in ascending order,
+        only visiting the set bits.
         """
-        Size computation. The most expensive operation.
-        Use int.bit_length(your_integer) to calculate the bit length.
+        bits = self.elems
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length()
+            bits ^= lowest
+
+    def rank(self, item: int) -> int:
+        """ Returns the number of elements in the set smaller than item.
+        :raises TypeError: if the item is not integer or if not positive.
         """
-        res = 0
-        for item in range(1, int.bit_length(self.elems) + 1):
-            if item in self:
-                res += 1
-        return res
+        if not isinstance(item, int) or item <= 0:
+            raise TypeError('Set elements should be integers')
+        return (self.elems & ((1 << (item - 1)) - 1)).bit_count()
+
+    def select(self, k: int) -> int:
+        """ Returns the element with k elements smaller than it in the set,
+        so select(rank(item)) == item for every item in the set.
+        :raises IndexError: if k is not between 0 and len(self) - 1.
+        """
+        if not 0 <= k < len(self):
+            raise IndexError(k)
+        bits = self.elems
+        for _ in range(k):
+            bits &= bits - 1 # clears the lowest set bit
+        return (bits & -bits).bit_length()
 
     def add(self, item: int) -> None:
         """ Adds an element to the set.
@@ -91,6 +115,21 @@ class BSet(Set[int]):
         res.elems = self.elems & ~other.elems
         return res
 
+    def __ior__(self, other: BSet[int]) -> BSet[int]:
+        """ Adds every element of other to this set, without creating a new set. """
+        self.elems |= other.elems
+        return self
+
+    def __iand__(self, other: BSet[int]) -> BSet[int]:
+        """ Keeps only the elements also in other, without creating a new set. """
+        self.elems &= other.elems
+        return self
+
+    def __isub__(self, other: BSet[int]) -> BSet[int]:
+        """ Removes every element of other from this set, without creating a new set. """
+        self.elems &= ~other.elems
+        return self
+
     def __str__(self):
         """ Construct a nice string representation. """
         bit_elems = self.elems
@@ -116,3 +155,6 @@ if __name__ == '__main__':
 
     print(f'S union T = {s.union(t)}')
     print(f'S intersect T = {s.intersection(t)}')
+    print(f'Elements of S = {list(s)}, rank of 4 in S = {s.rank(4)}, select(1) of T = {t.select(1)}')
+    s |= t
+    print(f'S |= T gives {s}')
@@ -0,0 +1,251 @@
+""" Double-ended queue and a circular array implementation.
+
+Implements a queue which can also be added to at the front and served from
+the rear, can be iterated over without changing it, and can be reversed in
+constant time. The array is only allocated when the first element is added,
+and doubles in size as needed up to the maximum capacity.
+Also defines UnitTests for the class.
+"""
+__docformat__ = 'reStructuredText'
+
+import unittest
+from typing import Iterator
+from data_structures.referential_array import ArrayR, T
+from data_structures.queue_adt import Queue
+
+class CircularDeque(Queue[T]):
+    """ Circular implementation of a double-ended queue with arrays.
+
+    The elements are kept in order from self.start in the array, wrapping around.
+    Reversing only flips self.reversed, which swaps which end of the array is the
+    logical front, so every operation works out which physical end it acts on.
+
+    Attributes:
+         length (int): number of elements in the deque (inherited)
+         start (int): index of the physically first element in the array
+         reversed (bool): True if the logical front is the physically last element
+         max_capacity (int): the most elements the deque can hold
+         array (ArrayR[T] | None): array storing the elements of the deque, None until the first is added
+
+    ArrayR cannot create empty arrays. The array is only made once an element can be added,
+    so a deque with a max_capacity of 0 is always full and never makes one.
+    """
+    INITIAL_CAPACITY = 4
+
+    def __init__(self, max_capacity: int) -> None:
+        Queue.__init__(self)
+        self.start = 0
+        self.reversed = False
+        self.max_capacity = max_capacity
+        self.array = None
+
+    def append(self, item: T) -> None:
+        """ Adds an element to the rear of the deque.
+        :complexity: O(1) amortised, see __grow
+        :raises Exception: if the deque is full
+        """
+        if self.reversed:
+            self.__push_first(item)
+        else:
+            self.__push_last(item)
+
+    def prepend(self, item: T) -> None:
+        """ Adds an element to the front of the deque.
+        :complexity: O(1) amortised, see __grow
+        :raises Exception: if the deque is full
+        """
+        if self.reversed:
+            self.__push_last(item)
+        else:
+            self.__push_first(item)
+
+    def serve(self) -> T:
+        """ Deletes and returns the element at the deque's front.
+        :complexity: O(1)
+        :raises Exception: if the deque is empty
+        """
+        if self.reversed:
+            return self.__pop_last()
+        return self.__pop_first()
+
+    def pop(self) -> T:
+        """ Deletes and returns the element at the deque's rear.
+        :complexity: O(1)
+        :raises Exception: if the deque is empty
+        """
+        if self.reversed:
+            return self.__pop_first()
+        return self.__pop_last()
+
+    def reverse(self) -> None:
+        """ Reverses the order of the elements, so the front becomes the rear.
+        :complexity: O(1)
+        """
+        self.reversed = not self.reversed
+
+    def __iter__(self) -> Iterator[T]:
+        """ Iterates over the elements from front to rear, without changing the deque.
+        :complexity: O(1) per element
+        """
+        if self.is_empty():
+            return
+        capacity = len(self.array)
+        if self.reversed:
+            for i in range(self.length - 1, -1, -1):
+                yield self.array[(self.start + i) % capacity]
+        else:
+            for i in range(self.length):
+                yield self.array[(self.start + i) % capacity]
+
+    def is_full(self) -> bool:
+        """ True if the deque is full and no element can be added. """
+        return len(self) == self.max_capacity
+
+    def clear(self) -> None:
+        """ Clears all elements from the deque, and frees the array. """
+        Queue.__init__(self)
+        self.start = 0
+        self.reversed = False
+        self.array = None
+
+    def __grow(self) -> None:
+        """ Makes room for one more element, doubling the array if it is full.
+        :complexity: O(1) amortised, O(N) when the array is copied
+        """
+        if self.array is None:
+            self.array = ArrayR(min(self.INITIAL_CAPACITY, self.max_capacity))
+        elif self.length == len(self.array):
+            array = ArrayR(min(2 * len(self.array), self.max_capacity))
+            for i in range(self.length):
+                array[i] = self.array[(self.start + i) % len(self.array)]
+            self.array = array
+            self.start = 0
+
+    def __push_first(self, item: T) -> None:
+        if self.is_full():
+            raise Exception("Deque is full")
+        self.__grow()
+        self.start = (self.start - 1) % len(self.array)
+        self.array[self.start] = item
+        self.length += 1
+
+    def __push_last(self, item: T) -> None:
+        if self.is_full():
+            raise Exception("Deque is full")
+        self.__grow()
+        self.array[(self.start + self.length) % len(self.array)] = item
+        self.length += 1
+
+    def __pop_first(self) -> T:
+        if self.is_empty():
+            raise Exception("Deque is empty")
+        item = self.array[self.start]
+        self.array[self.start] = None
+        self.start = (self.start + 1) % len(self.array)
+        self.length -= 1
+        return item
+
+    def __pop_last(self) -> T:
+        if self.is_empty():
+            raise Exception("Deque is empty")
+        self.length -= 1
+        last = (self.start + self.length) % len(self.array)
+        item = self.array[last]
+        self.array[last] = None
+        return item
+
+
+class TestDeque(unittest.TestCase):
+    """ Tests for the above class."""
+    CAPACITY = 8
+
+    def setUp(self):
+        self.deque = CircularDeque(self.CAPACITY)
+
+    def test_init(self):
+        self.assertTrue(self.deque.is_empty())
+        self.assertEqual(list(self.deque), [])
+
+    def test_append_and_serve(self):
+        for i in range(5):
+            self.deque.append(i)
+        self.assertEqual(list(self.deque), [0, 1, 2, 3, 4])
+        # Iterating doesn't change the deque.
+        self.assertEqual(len(self.deque), 5)
+        for i in range(5):
+            self.assertEqual(self.deque.serve(), i)
+        self.assertTrue(self.deque.is_empty())
+
+    def test_both_ends(self):
+        self.deque.append(1)
+        self.deque.prepend(0)
+        self.deque.append(2)
+        self.assertEqual(list(self.deque), [0, 1, 2])
+        self.assertEqual(self.deque.pop(), 2)
+        self.assertEqual(self.deque.serve(), 0)
+        self.assertEqual(list(self.deque), [1])
+
+    def test_reverse(self):
+        for i in range(4):
+            self.deque.append(i)
+        self.deque.reverse()
+        self.assertEqual(list(self.deque), [3, 2, 1, 0])
+        self.deque.append(-1)
+        self.deque.prepend(4)
+        self.assertEqual(list(self.deque), [4, 3, 2, 1, 0, -1])
+        self.assertEqual(self.deque.serve(), 4)
+        self.assertEqual(self.deque.pop(), -1)
+        self.deque.reverse()
+        self.assertEqual(list(self.deque), [0, 1, 2, 3])
+
+    def test_wrap_around(self):
+        for i in range(self.CAPACITY):
+            self.deque.append(i)
+        self.assertTrue(self.deque.is_full())
+        self.assertRaises(Exception, self.deque.append, 8)
+        for i in range(3):
+            self.deque.serve()
+            self.deque.append(self.CAPACITY + i)
+        self.assertEqual(list(self.deque), list(range(3, self.CAPACITY + 3)))
+        self.deque.reverse()
+        self.assertEqual(list(self.deque), list(range(self.CAPACITY + 2, 2, -1)))
+
+    def test_grow(self):
+        self.assertIsNone(self.deque.array)
+        self.deque.prepend(1)
+        self.deque.prepend(0)
+        self.assertEqual(len(self.deque.array), CircularDeque.INITIAL_CAPACITY)
+        for i in range(2, 7):
+            self.deque.append(i)
+        self.assertEqual(len(self.deque.array), self.CAPACITY)
+        self.assertEqual(list(self.deque), list(range(7)))
+
+        # Never grows past the maximum capacity.
+        deque = CircularDeque(6)
+        for i in range(6):
+            deque.append(i)
+        self.assertEqual(len(deque.array), 6)
+        self.assertTrue(deque.is_full())
+
+        # A capacity of 0 is always full, and never makes an array.
+        deque = CircularDeque(0)
+        self.assertTrue(deque.is_full())
+        self.assertRaises(Exception, deque.append, 0)
+        self.assertIsNone(deque.array)
+
+    def test_empty(self):
+        self.assertRaises(Exception, self.deque.serve)
+        self.assertRaises(Exception, self.deque.pop)
+
+    def test_clear(self):
+        self.deque.append(1)
+        self.deque.reverse()
+        self.deque.clear()
+        self.assertTrue(self.deque.is_empty())
+        self.assertFalse(self.deque.reversed)
+        self.assertIsNone(self.deque.array)
+
+if __name__ == '__main__':
+    testtorun = TestDeque()
+    suite = unittest.TestLoader().loadTestsFromModule(testtorun)
+    unittest.TextTestRunner().run(suite)
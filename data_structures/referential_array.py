@@ -16,6 +16,7 @@ checked by self.array[index].
 __author__ = "Julian Garcia for the __init__ code, Maria Garcia de la Banda for the rest"
 __docformat__ = 'reStructuredText'
 
+import copy
 from ctypes import py_object
 from typing import TypeVar, Generic
 
@@ -51,3 +52,26 @@ class ArrayR(Generic[T]):
         :pre: index in between 0 and length - self.array[] checks it
         """
         self.array[index] = value
+
+    def resize(self, length: int) -> None:
+        """ Changes the length of the array in place, keeping the objects
+        that still fit and filling any new positions with None.
+        :complexity: O(length) for best/worst case to copy and initialise
+        :pre: length > 0
+        """
+        if length <= 0:
+            raise ValueError("Array length should be larger than 0.")
+        array = (length * py_object)()
+        array[:] = [None for _ in range(length)]
+        kept = min(length, len(self.array))
+        array[:kept] = self.array[:kept]
+        self.array = array
+
+    def __deepcopy__(self, memo: dict) -> 'ArrayR[T]':
+        """ Returns a new array holding deep copies of the objects, for copy.deepcopy.
+        :complexity: O(length) plus the cost of copying the objects
+        """
+        copied = ArrayR(len(self.array))
+        memo[id(self)] = copied
+        copied.array[:] = [copy.deepcopy(item, memo) for item in self.array]
+        return copied
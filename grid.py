@@ -1,6 +1,18 @@
 from __future__ import annotations
-from data_structures.referential_array import ArrayR
-from layer_store import SetLayerStore, AdditiveLayerStore, SequenceLayerStore
+import time
+from bisect import bisect_right
+from typing import Callable, Hashable
+import numpy as np
+from layer_store import SetLayerStore, AdditiveLayerStore, SequenceLayerStore, GridSpecial
+from renderer import render_cells
+from sequence_planes import SequencePlanes, PlaneLayerStore
+from grid_arrays import SetArrays, SequenceArrays, AdditiveArrays, ArraySetStore, ArraySequenceStore, ArrayAdditiveStore, ProxyColumns
+from grid_chunks import GridChunks, ChunkSetStore, ChunkAdditiveStore, ChunkSequenceStore
+from grid_states import StateTable, StateArrays, StateLayerStore
+from state_tree import Snapshot
+from grid_views import FlatColumns, GridRegion
+from occupancy import Occupancy, LayerIndex
+from stencil import get_stencil, DIAMOND
 
 
 class Grid():
@@ -9,10 +21,20 @@ class Grid():
     DRAW_STYLE_SEQUENCE = "SEQUENCE"
     DRAW_STYLE_OPTIONS = (DRAW_STYLE_SET, DRAW_STYLE_ADD, DRAW_STYLE_SEQUENCE)
 
+    BACKEND_OBJECTS = "OBJECTS"
+    BACKEND_PLANES = "PLANES"
+    BACKEND_ARRAYS = "ARRAYS"
+    BACKEND_CHUNKS = "CHUNKS"
+    BACKEND_STATES = "STATES"
+    BACKEND_OPTIONS = (BACKEND_OBJECTS, BACKEND_PLANES, BACKEND_ARRAYS, BACKEND_CHUNKS, BACKEND_STATES)
+
+    SPECIAL_SLICE = 64 # squares a sweep does between looks at the clock, see step_special
+
     DEFAULT_BRUSH_SIZE = 2
+    DEFAULT_BRUSH_SHAPE = DIAMOND
     MAX_BRUSH = 5
     MIN_BRUSH = 0
-    def __init__(self, draw_style: str, x: int, y: int,brush_size = DEFAULT_BRUSH_SIZE) -> None:
+    def __init__(self, draw_style: str, x: int, y: int,brush_size = DEFAULT_BRUSH_SIZE, max_layers: int = AdditiveLayerStore.MAX_LAYERS, backend: str = BACKEND_OBJECTS, chunk_size: int = GridChunks.CHUNK_SIZE) -> None:
         """
         Initialise the grid object.
         - draw_style:
@@ -20,19 +42,78 @@ class Grid():
             Should be one of DRAW_STYLE_OPTIONS
             This draw style determines the LayerStore used on each grid square.
         - x, y: The dimensions of the grid.
+        - max_layers: the most layers a square can have with DRAW_STYLE_ADD, at least 1,
+            the same for every backend.
+        - backend: how the layers of the squares are kept, one of BACKEND_OPTIONS.
+            BACKEND_OBJECTS keeps a LayerStore object per square.
+            BACKEND_PLANES (DRAW_STYLE_SEQUENCE only) keeps a bit plane per layer over the whole grid,
+            see sequence_planes, and grid[x][y] gives a view of the square.
+            BACKEND_ARRAYS keeps a few compact arrays for the whole grid, see grid_arrays,
+            and grid[x][y] gives a view of the square.
+            BACKEND_CHUNKS keeps the same arrays for chunks of chunk_size by chunk_size squares,
+            only made once something is painted in them, see grid_chunks. The grid can be of any size,
+            and can grow, see grow().
+            BACKEND_STATES keeps each distinct state of a square once, as a LayerStore shared by every square
+            in that state, and the number of the state of each square, see grid_states.
+            Only these grids can take snapshots, see snapshot().
 
         Should also intialise the brush size to the DEFAULT provided as a class variable.
+
+        The grid also keeps a framebuffer of the last colours computed for each square,
+        see colors(). With BACKEND_CHUNKS it is only made by the first call to colors().
+
+        The squares which aren't empty are kept in self.occupied, see occupancy.Occupancy, updated whenever
+        a square changes, so special, colors and the renderer can leave empty squares alone.
+        A square is empty when it reads the same as a square which was never painted, see background().
+        The squares each layer is painted on are kept in self.layer_index, see occupancy.LayerIndex,
+        so a layer can be replaced or erased everywhere without looking at the other squares, see replace_layer().
         """
+        if max_layers < 1:
+            raise ValueError("A square must be able to hold at least one layer")
         self.x = x
         self.y = y
         self.draw_style = draw_style
         self.brush_size = brush_size
-        self.grid = self.create_grid(draw_style, x, y)
+        self.brush_shape = self.DEFAULT_BRUSH_SHAPE # see stencil.SHAPES
+        self.max_layers = max_layers
+        self.backend = backend
+        self.cells = None # the LayerStore of every square, square (i, j) at i * y + j, with BACKEND_OBJECTS
+        self.grid_special = GridSpecial() # special of every square at once, for BACKEND_OBJECTS, see special()
+        if backend == self.BACKEND_PLANES:
+            if draw_style != self.DRAW_STYLE_SEQUENCE:
+                raise TypeError('Bit planes are only for the sequence draw style')
+            self.planes = SequencePlanes(x, y)
+            self.grid = ProxyColumns(self)
+        elif backend == self.BACKEND_ARRAYS:
+            self.arrays = self.create_arrays(x * y)
+            self.grid = ProxyColumns(self)
+        elif backend == self.BACKEND_CHUNKS:
+            self.chunks = GridChunks(self.create_arrays, chunk_size)
+            self.origin_x = 0 # square (i, j) is at canvas position (i - origin_x, j - origin_y)
+            self.origin_y = 0
+            self.grid = ProxyColumns(self)
+        elif backend == self.BACKEND_STATES:
+            self.arrays = StateArrays(StateTable(self.create_store), x * y)
+            self.grid = ProxyColumns(self)
+        elif backend == self.BACKEND_OBJECTS:
+            self.grid = self.create_grid(draw_style, x, y)
+        else:
+            raise TypeError('Invalid Backend')
+        self.framebuffer = None if backend == self.BACKEND_CHUNKS else np.zeros((x, y, 3), dtype=np.uint8)
+        self.framebuffer_start = None # colour the framebuffer was computed on top of, None if never computed
+        self.dirty = set()
+        self.animated = set()
+        self.occupied = Occupancy()
+        self.layer_index = LayerIndex()
+        self.sweep = None # positions a special started by start_special goes over, None if there isn't one
+        self.swept = 0 # how many of them it has done
+        self.back_buffer = None # colours of the squares the sweep has done, shown once it is done
 
-    def create_grid(self, draw_style: str, x: int, y: int) -> ArrayR(ArrayR()):
+    def create_grid(self, draw_style: str, x: int, y: int) -> FlatColumns:
         """
-            makes a nested list with lists of length y storing layerstore object repeated in list of length x
-            example with x and y 3[[Layerstore,Layerstore,Layerstore],[Layerstore,Layerstore,Layerstore],[Layerstore,Layerstore,Layerstore]]
+            makes a flat list of x * y layerstore objects in self.cells, the one of square (i, j) at i * y + j,
+            and columns on top of it so grid[i][j] still works
+            example with x and y 2 [Layerstore(0, 0),Layerstore(0, 1),Layerstore(1, 0),Layerstore(1, 1)]
 
 
             Args:
@@ -43,47 +124,162 @@ class Grid():
             - type Error: if draw style is invalid
 
             Returns:
-            - result: a nested array with layerstore objects for each element 
+            - result: the columns, see grid_views.FlatColumns
 
             Complexity:
             - Worst case and Best: O(N^2), assuming x and y are same length
         """
-        self.grid = ArrayR(x)
+        self.cells = []
         for i in range(x):
-            temp_list = ArrayR(y)
             for j in range(y):
-                if draw_style == self.DRAW_STYLE_SET:
-                    temp_list[j] = SetLayerStore()
-                elif draw_style == self.DRAW_STYLE_ADD:
-                    temp_list[j] = AdditiveLayerStore()
-                elif draw_style == self.DRAW_STYLE_SEQUENCE:
-                    temp_list[j] = SequenceLayerStore()
-                else:
-                    raise TypeError('Invalid Draw Style Invalid')
-            self.grid[i] = temp_list
-        return self.grid
-
-    #using the magic method to return the layerstore value at that coordinate, technically getitem is called twice
+                store = self.create_store()
+                store.watch(self, (i, j))
+                store.share(self.grid_special)
+                self.cells.append(store)
+        return FlatColumns(self.cells, x, y)
+
+    def create_store(self) -> SetLayerStore or AdditiveLayerStore or SequenceLayerStore:
+        """
+        Returns an empty LayerStore of the draw style.
+
+        Raises:
+        - type Error: if draw style is invalid
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        if self.draw_style == self.DRAW_STYLE_SET:
+            return SetLayerStore()
+        if self.draw_style == self.DRAW_STYLE_ADD:
+            return AdditiveLayerStore(self.max_layers)
+        if self.draw_style == self.DRAW_STYLE_SEQUENCE:
+            return SequenceLayerStore()
+        raise TypeError('Invalid Draw Style Invalid')
+
+    def create_arrays(self, size: int):
+        """
+        Returns grid_arrays storage of the draw style for the given number of squares.
+
+        Raises:
+        - TypeError: if draw style is invalid
+
+        Complexity:
+        - Worst case and Best: O(N), N is the number of squares
+        """
+        if self.draw_style == self.DRAW_STYLE_SET:
+            return SetArrays(size)
+        if self.draw_style == self.DRAW_STYLE_ADD:
+            return AdditiveArrays(size, self.max_layers)
+        if self.draw_style == self.DRAW_STYLE_SEQUENCE:
+            return SequenceArrays(size)
+        raise TypeError('Invalid Draw Style Invalid')
+
+    def proxy(self, x: int, y: int):
+        """
+        Returns a new view of the square at (x, y), for every backend but BACKEND_OBJECTS.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        cell = x * self.y + y
+        if self.backend == self.BACKEND_PLANES:
+            return PlaneLayerStore(self.planes, x, y)
+        if self.backend == self.BACKEND_CHUNKS:
+            return self.chunk_store(*self.chunks.locate(x - self.origin_x, y - self.origin_y))
+        if self.backend == self.BACKEND_STATES:
+            return StateLayerStore(self.arrays, cell)
+        if self.draw_style == self.DRAW_STYLE_SET:
+            return ArraySetStore(self.arrays, cell)
+        if self.draw_style == self.DRAW_STYLE_ADD:
+            return ArrayAdditiveStore(self.arrays, cell)
+        return ArraySequenceStore(self.arrays, cell)
+
+    def chunk_store(self, key: tuple[int, int] | None, cell: int):
+        """
+        Returns a view of square number cell of the chunk with the key, of the template if key is None.
+        """
+        if self.draw_style == self.DRAW_STYLE_SET:
+            return ChunkSetStore(self.chunks, key, cell)
+        if self.draw_style == self.DRAW_STYLE_ADD:
+            return ChunkAdditiveStore(self.chunks, key, cell)
+        return ChunkSequenceStore(self.chunks, key, cell)
+
+    def background(self):
+        """
+        Returns a store reading as a square which was never painted, which must not be changed:
+        an empty store, sharing the grid special with BACKEND_OBJECTS,
+        or for BACKEND_CHUNKS the template, which holds what special did to such squares.
+        Every square not in self.occupied reads the same.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        if self.backend == self.BACKEND_CHUNKS:
+            return self.chunk_store(None, 0)
+        store = self.create_store()
+        if self.backend == self.BACKEND_OBJECTS:
+            store.share(self.grid_special)
+        return store
+
+    #using the magic method to return the layerstore value at that coordinate, grid[x, y] or grid[x][y]
     def __getitem__(
-        self, index: int
+        self, index: int | tuple[int, int]
     ) -> SetLayerStore or AdditiveLayerStore or SequenceLayerStore:
         """
-            gets the layer store object at the x and y coordinate
+            gets the layer store object at the x and y coordinate with grid[x, y],
+            or the column at x with grid[x], so grid[x][y] works as well
 
             Args:
-            - 2 ints, x and y
+            - 2 ints, x and y, or 1 int x
 
             Raises:
-            - Index Error: if the x or y input is out of range
+            - Index Error: if the x or y input is out of range, negative values count from the end
 
             Returns:
             - result: Layer store object, the type hint
 
             Complexity:
-            - Worst case and Best: O(1), getting an element from refrential array is always constant
+            - Worst case and Best: O(1), one lookup in the flat list of squares
         """
+        if type(index) is tuple:
+            x, y = index
+            if self.cells is not None and 0 <= x < self.x and 0 <= y < self.y:
+                return self.cells[x * self.y + y]
+            if not (-self.x <= x < self.x and -self.y <= y < self.y):
+                raise IndexError("invalid index")
+            x %= self.x
+            y %= self.y
+            if self.cells is not None:
+                return self.cells[x * self.y + y]
+            store = self.proxy(x, y)
+            store.watch(self, (x, y))
+            return store
         return self.grid[index]
 
+    def region(self, x0: int, y0: int, x1: int, y1: int) -> GridRegion:
+        """
+        Returns a view of the squares x0 <= x < x1, y0 <= y < y1, which goes over them in order of x then y.
+
+        Raises:
+        - Index Error: if the region isn't inside the grid
+
+        Complexity:
+        - Worst case and Best: O(1), and O(1) per square gone over
+        """
+        return GridRegion(self, x0, y0, x1, y1)
+
+    def row(self, y: int) -> GridRegion:
+        """
+        Returns a view of the squares with the given y, see region.
+        """
+        return self.region(0, y, self.x, y + 1)
+
+    def column(self, x: int) -> GridRegion:
+        """
+        Returns a view of the squares with the given x, see region.
+        """
+        return self.region(x, 0, x + 1, self.y)
+
     def increase_brush_size(self) -> int:
         """
         Increases the size of the brush by 1,
@@ -133,6 +329,171 @@ class Grid():
             print('brush size is already min')
         return self.brush_size
 
+    def paint(self, layer, px: int, py: int) -> list[tuple[int, int]]:
+        """
+        Adds the layer to every square the brush covers when centred at (px, py), see stencil.
+        Squares outside the grid are left out, see paint_spans.
+
+        Args:
+        - layer: the layer to add
+        - px, py: the centre of the brush, which can be outside the grid
+
+        Raises:
+        - ValueError: if brush_shape isn't a registered shape
+
+        Returns:
+        - result: the positions of the squares covered, in order of x then y
+
+        Complexity:
+        - Worst case and Best: O(S + C), S is the number of columns of the brush and C the number of squares covered,
+          ignoring the complexity of add
+        """
+        return self.paint_spans(layer, get_stencil(self.brush_shape, self.brush_size).clip(px, py, self.x, self.y))
+
+    def stroke(self, layer, points: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """
+        Adds the layer to every square the brush covers when centred at any of the points, see stencil.line
+        for the points of a straight stroke. Each square is painted once, however many of the brushes cover it.
+
+        Args:
+        - layer: the layer to add
+        - points: the centres of the brush, which can be outside the grid
+
+        Raises:
+        - ValueError: if brush_shape isn't a registered shape
+
+        Returns:
+        - result: the positions of the squares covered, in order of x then y
+
+        Complexity:
+        - Worst case: O(P*S*log(P*S) + C), P is the number of points, S the number of columns of the brush
+          and C the number of squares covered, ignoring the complexity of add
+        """
+        return self.paint_spans(layer, get_stencil(self.brush_shape, self.brush_size).stroke(points, self.x, self.y))
+
+    def paint_spans(self, layer, spans: list[tuple[int, int, int]]) -> list[tuple[int, int]]:
+        """
+        Adds the layer to the squares (x, y) with y0 <= y < y1 for each span (x, y0, y1), which must be inside the grid.
+        With BACKEND_OBJECTS each span is a slice of self.cells, other backends get all the squares in one add_many.
+
+        Returns:
+        - result: the positions of the squares, in the order of the spans
+
+        Complexity:
+        - Worst case and Best: O(S + C), S is the number of spans and C the number of squares, ignoring the complexity of add
+        """
+        positions = [(x, y) for x, y0, y1 in spans for y in range(y0, y1)]
+        if self.cells is None:
+            self.add_many(layer, positions)
+            return positions
+        for x, y0, y1 in spans:
+            for store in self.cells[x * self.y + y0:x * self.y + y1]:
+                store.add(layer)
+        return positions
+
+    def fill(self, layer, px: int, py: int) -> list[tuple[int, int]]:
+        """
+        Adds the layer to every square of the region around (px, py), see fill_region.
+
+        Raises:
+        - IndexError: if (px, py) is outside the grid
+
+        Returns:
+        - result: the positions of the squares filled, see paint_spans
+
+        Complexity:
+        - Worst case and Best: O(C), C is the number of squares in the region, ignoring the complexity of add
+        """
+        return self.paint_spans(layer, self.fill_region(px, py))
+
+    def state_keys(self) -> Callable[[int, int], Hashable]:
+        """
+        Returns a function giving the state_key of the square at (x, y), read straight from the storage
+        of the backend, without making a view of the square as grid[x, y] does for all but BACKEND_OBJECTS.
+        It reads the grid as it is when called, so it must not be kept after the grid grows.
+
+        Complexity:
+        - Worst case and Best: O(1), calls cost the same as the state_key of the storage
+        """
+        if self.cells is not None:
+            cells, size_y = self.cells, self.y
+            return lambda x, y: cells[x * size_y + y].state_key()
+        if self.backend == self.BACKEND_PLANES:
+            planes = self.planes
+            return lambda x, y: planes.state_key(x * planes.size_y + y)
+        if self.backend == self.BACKEND_CHUNKS:
+            chunks, origin_x, origin_y = self.chunks, self.origin_x, self.origin_y
+
+            def chunk_key(x: int, y: int) -> Hashable:
+                key, cell = chunks.locate(x - origin_x, y - origin_y)
+                return chunks.get(key).state_key(cell)
+            return chunk_key
+        arrays, size_y = self.arrays, self.y
+        return lambda x, y: arrays.state_key(x * size_y + y)
+
+    def fill_region(self, px: int, py: int) -> list[tuple[int, int, int]]:
+        """
+        Returns the squares connected to (px, py) through squares sharing a side, which all have the same
+        state_key as it, as spans (x, y0, y1) with y0 <= y < y1 the same as for stencil.Stencil.clip.
+        A scanline fill: each span is a whole run of the region along a column (next to each other in self.cells),
+        and the runs it touches in the columns either side are queued on a stack, one entry per run,
+        so there is no recursion. The spans found so far are kept sorted by column to skip squares already filled,
+        so the memory used grows with the region, not with the grid, which matters for BACKEND_CHUNKS.
+
+        Raises:
+        - IndexError: if (px, py) is outside the grid
+
+        Returns:
+        - result: the spans of the region, in the order found
+
+        Complexity:
+        - Worst case: O(C*log(S)) state_key calls, C is the number of squares in the region and next to it
+          and S the most spans of the region in a column
+        """
+        if not (0 <= px < self.x and 0 <= py < self.y):
+            raise IndexError(f"({px}, {py}) is outside the grid")
+        key = self.state_keys()
+        target = key(px, py)
+        found = {} # column -> the spans of the region found in it, as sorted (y0, y1)
+        spans = []
+        seeds = [(px, py)]
+        while seeds:
+            x, y = seeds.pop()
+            column = found.setdefault(x, [])
+            i = bisect_right(column, (y, self.y))
+            if i and column[i - 1][1] > y:
+                continue
+            # Spans are whole runs, so a run being found can't reach one already found.
+            y0, y1 = y, y + 1
+            while y0 > 0 and key(x, y0 - 1) == target:
+                y0 -= 1
+            while y1 < self.y and key(x, y1) == target:
+                y1 += 1
+            column.insert(i, (y0, y1))
+            spans.append((x, y0, y1))
+            for nx in (x - 1, x + 1):
+                if not 0 <= nx < self.x:
+                    continue
+                beside = found.get(nx, ())
+                j = bisect_right(beside, (y0, self.y))
+                if j and beside[j - 1][1] > y0:
+                    j -= 1
+                ny, in_run = y0, False
+                while ny < y1:
+                    if j < len(beside) and beside[j][0] <= ny:
+                        # Already filled, skip to the end of the span.
+                        ny, in_run = beside[j][1], False
+                        j += 1
+                        continue
+                    if key(nx, ny) == target:
+                        if not in_run:
+                            seeds.append((nx, ny))
+                            in_run = True
+                    else:
+                        in_run = False
+                    ny += 1
+        return spans
+
     def special(self) -> None:
         """
         Activate the special affect on all grid squares.
@@ -148,8 +509,464 @@ class Grid():
 
         time complexity = O(N^2) best and worst as it is nested for loop assuming x and y are same size, 
         ignoring the time complexity of special as that is different for each 
-        layer store type
+        layer store type. With BACKEND_OBJECTS, special is the same for every square with DRAW_STYLE_SET (invert)
+        and DRAW_STYLE_ADD (reverse), so it is O(1): the grid special the squares share is flipped,
+        see LayerStore.share. With DRAW_STYLE_SEQUENCE special does nothing to an empty square,
+        so only the P occupied squares are gone over, O(P).
+        """
+        if self.backend == self.BACKEND_PLANES:
+            self.mark_dirty(self.planes.unpack(self.planes.special()))
+            return
+        if self.backend in (self.BACKEND_ARRAYS, self.BACKEND_STATES):
+            # Done on the whole arrays at once, see SetArrays.special and the others.
+            # Only the sequence special changes which layers are painted.
+            self.mark_dirty(self.arrays.special(), self.draw_style == self.DRAW_STYLE_SEQUENCE)
+            return
+        if self.backend == self.BACKEND_CHUNKS:
+            self.special_chunks()
+            return
+        self.finish_special()
+        if self.draw_style == self.DRAW_STYLE_SEQUENCE:
+            # A list, as squares leave the index while special goes over them,
+            # working out the new mask once per distinct mask.
+            SequenceLayerStore.special_all([self.cells[x * self.y + y] for x, y in self.occupied])
+            return
+        self.grid_special.active = not self.grid_special.active
+        # No store reported a change, and which squares are empty or have which layers stays the same.
+        if self.draw_style == self.DRAW_STYLE_SET:
+            # Unpainted squares are inverted too, so all of the framebuffer is computed again.
+            self.framebuffer_start = None
+        else:
+            self.dirty.update(self.occupied)
+
+    def start_special(self) -> None:
+        """
+        Starts Grid.special as a sweep over the occupied squares, done a slice at a time by step_special,
+        for the DRAW_STYLE_SEQUENCE grids of LayerStore objects where special costs O(M*log(M)) per distinct mask.
+        Other grids do special straight away, as it is O(1) or done on whole arrays.
+        colors() keeps returning the framebuffer from before the sweep until it is done,
+        so no frame shows a special applied to only some of the squares. The colours of the squares done
+        are worked out into a copy of it as the sweep goes, which is shown once the sweep is done.
+        Squares painted during the sweep get the special before or after the paint, depending on
+        whether the sweep had reached them, and squares painted after being empty at the start don't get it.
+        A sweep still going is finished first.
+
+        Complexity:
+        - Worst case and Best: O(P) to list the P occupied squares, for DRAW_STYLE_SEQUENCE with BACKEND_OBJECTS
+        """
+        self.finish_special()
+        if self.backend != self.BACKEND_OBJECTS or self.draw_style != self.DRAW_STYLE_SEQUENCE:
+            self.special()
+            return
+        self.sweep = list(self.occupied)
+        self.swept = 0
+        if self.framebuffer_start is not None:
+            self.back_buffer = self.framebuffer.copy()
+
+    def step_special(self, budget: float) -> bool:
         """
-        for i in range(self.x):
-            for j in range(self.y):
-                self.grid[i][j].special() #O(1) or O(M^2) or O(M)
+        Goes on with the sweep started by start_special, SPECIAL_SLICE squares at a time,
+        until it is done or budget seconds have passed. At least one slice is done.
+
+        Args:
+        - budget: seconds the step can take, give or take a slice
+
+        Returns:
+        - result: True if there is no sweep left to do
+
+        Complexity:
+        - Worst case: O(P*M + D*M*log(M)) for a step doing a whole sweep of P squares, D distinct masks among them,
+          and O(X*Y) to show the colours at the end
+        - Best case: O(SPECIAL_SLICE*M) when the masks are cached
+        """
+        if self.sweep is None:
+            return True
+        deadline = time.perf_counter() + budget
+        while self.swept < len(self.sweep):
+            done = self.sweep[self.swept:self.swept + self.SPECIAL_SLICE]
+            SequenceLayerStore.special_all([self.cells[x * self.y + y] for x, y in done])
+            self.swept += len(done)
+            if self.back_buffer is not None:
+                self.draw_back(done)
+            if time.perf_counter() >= deadline:
+                break
+        if self.swept < len(self.sweep):
+            return False
+        self.sweep = None
+        if self.back_buffer is not None:
+            self.framebuffer[:] = self.back_buffer
+            self.back_buffer = None
+        return True
+
+    def draw_back(self, positions: list[tuple[int, int]]) -> None:
+        """
+        Works out the colours of the squares at the positions into the back buffer, see start_special,
+        so they don't need to be worked out again by colors().
+        Animated squares are left to colors(), which works them out on every call anyway.
+        """
+        still = []
+        for i, j in positions:
+            self.dirty.discard((i, j))
+            if self[i, j].is_animated():
+                self.animated.add((i, j))
+            else:
+                self.animated.discard((i, j))
+                still.append((i, j))
+        render_cells(self, still, 0, self.framebuffer_start, self.back_buffer)
+
+    def finish_special(self) -> None:
+        """
+        Does the rest of the sweep started by start_special, if there is one.
+        """
+        self.step_special(float('inf'))
+
+    def special_chunks(self) -> None:
+        """
+        Grid.special for BACKEND_CHUNKS, done on the arrays of each chunk made, and the template for
+        the squares of chunks which haven't been made.
+
+        Complexity:
+        - Worst case and Best: O(K*S^2) for the K chunks made, see GridChunks.special,
+          and with DRAW_STYLE_SET O(X*Y) on the next call to colors()
+        """
+        changed = self.chunks.special()
+        if self.draw_style == self.DRAW_STYLE_SET:
+            # Every square of the canvas was inverted, so all of it has to be computed again.
+            # The template was inverted with them, so which squares read differently from it stays the same.
+            self.framebuffer_start = None
+            return
+        for key, cells in changed:
+            self.mark_positions(self.chunks.positions(key, cells), self.chunks.empty(key, cells),
+                                self.draw_style == self.DRAW_STYLE_SEQUENCE)
+
+    def grow(self, x_before: int = 0, x_after: int = 0, y_before: int = 0, y_after: int = 0) -> None:
+        """
+        Adds empty squares on any side of a BACKEND_CHUNKS grid. Nothing is moved or copied:
+        squares added before move the existing squares up, so grid[i][j] becomes grid[i + x_before][j + y_before].
+        Squares added read as unpainted squares, including whatever Grid.special did to those.
+
+        Args:
+        - x_before, x_after, y_before, y_after: numbers of squares to add on each side
+
+        Raises:
+        - TypeError: if the backend isn't BACKEND_CHUNKS
+        - ValueError: if a number is negative
+
+        Complexity:
+        - Worst case and Best: O(P) to move the P occupied squares, and O(X*Y) on the next call to colors()
+        """
+        if self.backend != self.BACKEND_CHUNKS:
+            raise TypeError('Only chunked grids can grow')
+        if min(x_before, x_after, y_before, y_after) < 0:
+            raise ValueError('Grids can only grow')
+        self.origin_x += x_before
+        self.origin_y += y_before
+        self.occupied.shift(x_before, y_before)
+        self.layer_index.shift(x_before, y_before)
+        self.x += x_before + x_after
+        self.y += y_before + y_after
+        # Positions have moved, so the framebuffer is made again.
+        self.framebuffer = None
+        self.framebuffer_start = None
+        self.dirty.clear()
+        self.animated.clear()
+
+    def snapshot(self) -> Snapshot:
+        """
+        Returns the layers of every square now, as a snapshot which never changes and can be restored later.
+        The snapshot shares everything with the grid, later changes to the grid only copy what they touch,
+        see state_tree.
+
+        Raises:
+        - TypeError: if the backend isn't BACKEND_STATES
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        if self.backend != self.BACKEND_STATES:
+            raise TypeError('Only grids with BACKEND_STATES can take snapshots')
+        return self.arrays.snapshot()
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """
+        Puts every square back to how it was in a snapshot, taken of this grid or another of the same size
+        and draw style. Only the squares which are different are marked dirty.
+
+        Raises:
+        - TypeError: if the backend isn't BACKEND_STATES
+        - ValueError: if the snapshot is of a grid with a different number of squares
+
+        Complexity:
+        - Worst case: O(X*Y)
+        - Best case: O(P*log(X*Y)), P is the number of parts of the grid written since the snapshot
+        """
+        if self.backend != self.BACKEND_STATES:
+            raise TypeError('Only grids with BACKEND_STATES can restore snapshots')
+        self.mark_dirty(self.arrays.restore(snapshot))
+
+    def add_many(self, layer, cells) -> list[tuple[int, int]]:
+        """
+        Adds the layer to every square given, as grid[x][y].add(layer) would.
+        With BACKEND_PLANES this is a few bitwise operations over the whole grid,
+        and with BACKEND_ARRAYS, BACKEND_CHUNKS and BACKEND_STATES it works on the arrays directly rather than through a view per square.
+
+        Args:
+        - layer: the layer to add
+        - cells: iterable of (x, y) positions inside the grid
+
+        Raises:
+        - Index Error: if a position is out of range
+
+        Returns:
+        - result: the positions which actually changed, in order of x then y for BACKEND_PLANES,
+          and for BACKEND_ARRAYS with SET and SEQUENCE
+
+        Complexity:
+        - Worst case and Best: O(C) for BACKEND_OBJECTS, O(C + X*Y/64) for BACKEND_PLANES,
+          O(C*log(C)) for BACKEND_ARRAYS and BACKEND_CHUNKS (O(C*M) with ADD),
+          O(C*log(C) + D) for BACKEND_STATES, C is the number of cells and D the number of distinct states among them
+        """
+        if self.backend == self.BACKEND_PLANES:
+            changed = self.planes.unpack(self.planes.add(layer, self.planes.pack(self.cell_numbers(cells))))
+            return self.mark_dirty(changed)
+        if self.backend in (self.BACKEND_ARRAYS, self.BACKEND_STATES):
+            return self.mark_dirty(self.arrays.add(layer.index, self.cell_numbers(cells)))
+        if self.backend == self.BACKEND_CHUNKS:
+            return self.add_chunks(layer, cells)
+        return [(x, y) for x, y in cells if self[x, y].add(layer)]
+
+    def erase_many(self, layer, cells) -> list[tuple[int, int]]:
+        """
+        Erases the layer from every square given, as grid[x][y].erase(layer) would.
+        With BACKEND_PLANES this is a few bitwise operations over the whole grid,
+        and with BACKEND_ARRAYS, BACKEND_CHUNKS and BACKEND_STATES it works on the arrays directly rather than through a view per square.
+
+        Args:
+        - layer: the layer to erase
+        - cells: iterable of (x, y) positions inside the grid
+
+        Raises:
+        - Index Error: if a position is out of range
+
+        Returns:
+        - result: the positions which actually changed, in order of x then y for BACKEND_PLANES,
+          and for BACKEND_ARRAYS with SET and SEQUENCE
+
+        Complexity:
+        - Worst case and Best: O(C) for BACKEND_OBJECTS, O(C + X*Y/64) for BACKEND_PLANES,
+          O(C*log(C)) for BACKEND_ARRAYS and BACKEND_CHUNKS (O(C*M) with ADD),
+          O(C*log(C) + D) for BACKEND_STATES, C is the number of cells and D the number of distinct states among them
+        """
+        if self.backend == self.BACKEND_PLANES:
+            changed = self.planes.unpack(self.planes.erase(layer, self.planes.pack(self.cell_numbers(cells))))
+            return self.mark_dirty(changed)
+        if self.backend in (self.BACKEND_ARRAYS, self.BACKEND_STATES):
+            return self.mark_dirty(self.arrays.erase(layer.index, self.cell_numbers(cells)))
+        if self.backend == self.BACKEND_CHUNKS:
+            return self.erase_chunks(layer, cells)
+        return [(x, y) for x, y in cells if self[x, y].erase(layer)]
+
+    def add_chunks(self, layer, cells) -> list[tuple[int, int]]:
+        """
+        add_many for BACKEND_CHUNKS, making the chunks the cells are in.
+        """
+        changed = []
+        for key, numbers in self.chunks.split(self.cell_positions(cells) - (self.origin_x, self.origin_y)):
+            numbers = self.chunks.claim(key).add(layer.index, numbers)
+            changed.extend(self.mark_positions(self.chunks.positions(key, numbers), self.chunks.empty(key, numbers)))
+        return changed
+
+    def erase_chunks(self, layer, cells) -> list[tuple[int, int]]:
+        """
+        erase_many for BACKEND_CHUNKS, skipping chunks which haven't been made as their squares have no layers.
+        """
+        changed = []
+        for key, numbers in self.chunks.split(self.cell_positions(cells) - (self.origin_x, self.origin_y)):
+            if key in self.chunks.chunks:
+                numbers = self.chunks.chunks[key].erase(layer.index, numbers)
+                changed.extend(self.mark_positions(self.chunks.positions(key, numbers), self.chunks.empty(key, numbers)))
+        return changed
+
+    def cell_positions(self, cells) -> np.ndarray:
+        """
+        Returns the positions given as a (C, 2) array.
+
+        Raises:
+        - Index Error: if a position is out of range
+        """
+        positions = np.array(list(cells), dtype=np.int64).reshape(-1, 2)
+        if ((positions < 0) | (positions >= (self.x, self.y))).any():
+            raise IndexError("invalid index")
+        return positions
+
+    def cell_numbers(self, cells) -> np.ndarray:
+        """
+        Returns the square numbers x * self.y + y of the positions given.
+
+        Raises:
+        - Index Error: if a position is out of range
+        """
+        positions = self.cell_positions(cells)
+        return positions[:, 0] * self.y + positions[:, 1]
+
+    def mark_dirty(self, numbers: np.ndarray, painted: bool = True) -> list[tuple[int, int]]:
+        """
+        Marks the squares with the given numbers x * self.y + y dirty, updates whether they are occupied,
+        and the layer index too unless painted is False, and returns their positions.
+        For BACKEND_PLANES, BACKEND_ARRAYS and BACKEND_STATES.
+        """
+        xs, ys = np.divmod(numbers, self.y)
+        changed = list(zip(xs.tolist(), ys.tolist()))
+        self.dirty.update(changed)
+        storage = self.planes if self.backend == self.BACKEND_PLANES else self.arrays
+        self.occupied.update_many(changed, storage.empty(numbers).tolist())
+        if painted:
+            self.index_layers(changed)
+        return changed
+
+    def mark_positions(self, positions: np.ndarray, empty: np.ndarray, painted: bool = True) -> list[tuple[int, int]]:
+        """
+        Marks the squares at the given (C, 2) canvas positions of a BACKEND_CHUNKS grid dirty,
+        updates whether they are occupied from empty, and the layer index too unless painted is False,
+        and returns their positions in the grid.
+        """
+        changed = list(zip((positions[:, 0] + self.origin_x).tolist(), (positions[:, 1] + self.origin_y).tolist()))
+        self.dirty.update(changed)
+        self.occupied.update_many(changed, empty.tolist())
+        if painted:
+            self.index_layers(changed)
+        return changed
+
+    def index_layers(self, positions: list[tuple[int, int]]) -> None:
+        """
+        Updates the layer index for the squares at the given positions.
+
+        Complexity:
+        - Worst case and Best: O(C*M), C is the number of positions and M the number of layers per square
+        """
+        for x, y in positions:
+            self.layer_index.update(x, y, frozenset(layer.index for layer in self.proxy(x, y).painted_layers()))
+
+    def set_layers(self, x: int, y: int, layers) -> bool:
+        """
+        Makes the layers painted on the square at (x, y) the ones given, applied in the order given,
+        by erasing the layers it has and adding them. Whatever special did to the colour output is kept.
+
+        Args:
+        - x, y: the square
+        - layers: iterable of layers, at most one with DRAW_STYLE_SET, each at most once with DRAW_STYLE_SEQUENCE
+
+        Raises:
+        - Index Error: if the position is out of range
+
+        Returns:
+        - result: True if the layers painted on the square were different
+
+        Complexity:
+        - Worst case and Best: O(M), M is the number of layers before and after
+        """
+        store = self[x, y]
+        before = store.painted_layers()
+        layers = tuple(layers)
+        if before == layers:
+            return False
+        for layer in before:
+            store.erase(layer)
+        for layer in layers:
+            store.add(layer)
+        return True
+
+    def replace_layer(self, old, new=None) -> list[tuple[tuple[int, int], tuple, tuple]]:
+        """
+        Replaces the layer old with new on every square it is painted on, keeping its place among the other layers,
+        or erases it from them if new is None. Only the squares the layer index lists are looked at.
+
+        Args:
+        - old: the layer to replace
+        - new: the layer to put in its place, or None
+
+        Returns:
+        - result: (position, layers before, layers after) for every square which changed, in order of x then y
+
+        Complexity:
+        - Worst case and Best: O(K*(log(K) + M)), K is the number of squares with the layer
+          and M the number of layers per square
+        """
+        changes = []
+        if new is not None and new.index == old.index:
+            return changes
+        for x, y in self.layer_index.positions(old.index):
+            store = self[x, y]
+            before = store.painted_layers()
+            after = tuple(layer if layer.index != old.index else new for layer in before)
+            self.set_layers(x, y, (layer for layer in after if layer is not None))
+            changes.append(((x, y), before, store.painted_layers()))
+        return changes
+
+    def cell_changed(self, x: int, y: int) -> None:
+        """
+        Called by the layer store at (x, y) whenever it actually changes,
+        so its colour is recomputed on the next call to colors(), and the occupancy and layer indexes are updated.
+
+        Args:
+        - 2 ints, x and y
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case and Best: O(1), O(M) with DRAW_STYLE_ADD for the layer index
+        """
+        self.dirty.add((x, y))
+        store = self[x, y]
+        self.occupied.update(x, y, store.is_empty())
+        self.layer_index.update(x, y, frozenset(layer.index for layer in store.painted_layers()))
+
+    def colors(self, start: tuple, timestamp: float) -> np.ndarray:
+        """
+        Returns the colour of every grid square, framebuffer[x, y] is the colour of self[x][y].
+        Only dirty squares, and squares with layers that vary over time, are recomputed,
+        every other square keeps the colour computed in an earlier call.
+
+        Args:
+        - the start value of the color which is a tuple
+        - the timestamp as a float
+
+        Raises:
+        - None
+
+        Returns:
+        - result: the framebuffer, an (x, y, 3) uint8 array
+
+        Complexity:
+        - Worst case: O(N^2 + P) the first time, or when start changes, assuming x and y are same size,
+          where the N^2 is one numpy fill with the background colour and only the P occupied squares are computed
+        - Best case: O(D + A), D is the number of dirty squares and A the number of animated squares
+        """
+        start = tuple(start)
+        if self.sweep is not None:
+            # Showing the squares the sweep has done would show half a special, see start_special.
+            return self.framebuffer
+        if self.framebuffer is None:
+            self.framebuffer = np.zeros((self.x, self.y, 3), dtype=np.uint8)
+            self.framebuffer_start = None
+        if start != self.framebuffer_start:
+            # Everything was computed on top of a different colour, start over.
+            # Empty squares all have the background colour, so only occupied squares are computed.
+            self.framebuffer_start = start
+            self.framebuffer[:] = self.background().get_color(start, timestamp, 0, 0)
+            self.dirty = set(self.occupied)
+            self.animated.clear()
+
+        for i, j in self.dirty:
+            # The layers of a dirty square changed, so it might have started or stopped animating.
+            if self[i, j].is_animated():
+                self.animated.add((i, j))
+            else:
+                self.animated.discard((i, j))
+        render_cells(self, self.dirty | self.animated, timestamp, start, self.framebuffer)
+        self.dirty.clear()
+        return self.framebuffer
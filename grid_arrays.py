@@ -0,0 +1,703 @@
+"""
+Structure of arrays storage for a whole grid, one compact NumPy array per field instead of a LayerStore object per square.
+
+- SET: the index of each square's layer, and whether it is inverted.
+- SEQUENCE: each square's layer set as BSet bits, in uint64 words.
+- ADD: each square's layers live in a segment of one shared array of layer indices,
+  used as a ring like CircularDeque, with arrays for where each segment is and how full it is.
+
+Squares are numbered x * size_y + y. The *Store classes give a single square the usual LayerStore
+interface, reading and writing the arrays, and ProxyColumns makes grid[x][y] give them.
+"""
+
+from __future__ import annotations
+import numpy as np
+import layers
+import layer_util
+from layer_util import Layer, LAYERS
+from layer_store import LayerStore, AdditiveLayerStore, SequenceLayerStore
+from layer_chain import compile_chain, apply_chain
+from data_structures.bset import BSet
+
+WORD_BITS = 64
+
+
+def rounds(cells: np.ndarray) -> list[np.ndarray]:
+    """
+    Splits square numbers into rounds, round k holding the squares given more than k times,
+    so each round can be done in bulk and a square given twice is done twice.
+
+    Complexity:
+    - Worst case and Best: O(C*log(C) + R*C), C is the number of squares given and R the most times one is given
+    """
+    cells = np.sort(cells, kind='stable')
+    first = np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]]) if len(cells) else np.zeros(0, dtype=np.int64)
+    occurrence = np.arange(len(cells)) - np.repeat(first, np.diff(np.r_[first, len(cells)]))
+    return [cells[occurrence == k] for k in range(int(occurrence.max(initial=-1)) + 1)]
+
+
+class SetArrays:
+    """
+    Attributes:
+        layer (np.ndarray): index of the layer of each square, -1 for none
+        inverted (np.ndarray): True where special has been applied an odd number of times
+    """
+
+    def __init__(self, size: int) -> None:
+        self.layer = np.full(size, -1, dtype=np.int32)
+        self.inverted = np.zeros(size, dtype=bool)
+
+    def add(self, index: int, cells: np.ndarray) -> np.ndarray:
+        """
+        Sets the layer of every square given, returns the numbers of the squares which changed, in increasing order.
+
+        Complexity:
+        - Worst case and Best: O(C*log(C)), C is the number of squares given
+        """
+        cells = np.unique(cells)
+        cells = cells[self.layer[cells] != index]
+        self.layer[cells] = index
+        return cells
+
+    def erase(self, index: int, cells: np.ndarray) -> np.ndarray:
+        """
+        Removes the layer of every square given, whatever index is given, returns the numbers of the squares which changed, in increasing order.
+
+        Complexity:
+        - Worst case and Best: O(C*log(C)), C is the number of squares given
+        """
+        cells = np.unique(cells)
+        cells = cells[self.layer[cells] >= 0]
+        self.layer[cells] = -1
+        return cells
+
+    def special(self) -> np.ndarray:
+        """
+        Inverts every square, returns the numbers of all of them as they all changed.
+
+        Complexity:
+        - Worst case and Best: O(N)
+        """
+        self.inverted ^= True
+        return np.arange(len(self.layer))
+
+    def empty(self, cells: np.ndarray, inverted: bool = False) -> np.ndarray:
+        """
+        Returns whether each square given has no layer and is inverted as given,
+        False unless the squares are compared to unpainted squares a special has been applied to.
+
+        Complexity:
+        - Worst case and Best: O(C), C is the number of squares given
+        """
+        return (self.layer[cells] < 0) & (self.inverted[cells] == inverted)
+
+    def state_key(self, cell: int) -> tuple:
+        """
+        Returns the key SetLayerStore gives for a square, see LayerStore.state_key.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        index = int(self.layer[cell])
+        return (None if index < 0 else index, bool(self.inverted[cell]))
+
+
+class SequenceArrays:
+    """
+    Attributes:
+        masks (np.ndarray): (squares, words) uint64 array, bit i of a square's words is set if the layer with index i is applied
+    """
+
+    def __init__(self, size: int) -> None:
+        self.masks = np.zeros((size, self.words_for(layer_util.cur_layer_index)), dtype=np.uint64)
+
+    @staticmethod
+    def words_for(layer_count: int) -> int:
+        return max(1, -(-layer_count // WORD_BITS))
+
+    def mask(self, cell: int) -> int:
+        """
+        Returns the BSet bits of a square.
+
+        Complexity:
+        - Worst case and Best: O(L/64), L is the number of registered layers
+        """
+        return self.from_words(self.masks[cell].tolist())
+
+    @staticmethod
+    def from_words(words: list[int]) -> int:
+        """
+        Returns the BSet bits held in a row of words, lowest word first.
+        """
+        mask = 0
+        for word in reversed(words):
+            mask = (mask << WORD_BITS) | word
+        return mask
+
+    def set_mask(self, cell: int, mask: int) -> None:
+        """
+        Sets the BSet bits of a square, making the words wider if needed.
+
+        Complexity:
+        - Worst case: O(N*L/64) when the words have to be made wider
+        - Best case: O(L/64)
+        """
+        self.widen(self.words_for(mask.bit_length()))
+        self.masks[cell] = [(mask >> (WORD_BITS * k)) & ((1 << WORD_BITS) - 1) for k in range(self.masks.shape[1])]
+
+
+    def widen(self, words: int) -> None:
+        """
+        Makes every square have at least the given number of words.
+
+        Complexity:
+        - Worst case: O(N*L/64) when the words have to be made wider
+        - Best case: O(1)
+        """
+        if words > self.masks.shape[1]:
+            wider = np.zeros((len(self.masks), words), dtype=np.uint64)
+            wider[:, :self.masks.shape[1]] = self.masks
+            self.masks = wider
+
+    def add(self, index: int, cells: np.ndarray) -> np.ndarray:
+        """
+        Sets bit index of every square given, returns the numbers of the squares which changed, in increasing order.
+
+        Complexity:
+        - Worst case and Best: O(C*log(C)), O(N*L/64) when the words have to be made wider
+        """
+        self.widen(self.words_for(index + 1))
+        word, bit = index // WORD_BITS, np.uint64(1 << (index % WORD_BITS))
+        cells = np.unique(cells)
+        cells = cells[(self.masks[cells, word] & bit) == 0]
+        self.masks[cells, word] |= bit
+        return cells
+
+    def erase(self, index: int, cells: np.ndarray) -> np.ndarray:
+        """
+        Clears bit index of every square given, returns the numbers of the squares which changed, in increasing order.
+
+        Complexity:
+        - Worst case and Best: O(C*log(C)), C is the number of squares given
+        """
+        word, bit = index // WORD_BITS, np.uint64(1 << (index % WORD_BITS))
+        if word >= self.masks.shape[1]:
+            return np.zeros(0, dtype=np.int64)
+        cells = np.unique(cells)
+        cells = cells[(self.masks[cells, word] & bit) != 0]
+        self.masks[cells, word] &= ~bit
+        return cells
+
+    def special(self) -> np.ndarray:
+        """
+        Removes the layer with the median name from every square, see SequenceLayerStore.special.
+        Squares with the same mask end up with the same mask, so it is only worked out once per mask.
+
+        Returns:
+        - result: the numbers of the squares which changed
+
+        Complexity:
+        - Worst case: O(N*log(N) + D*M), D is the number of distinct masks
+        - Best case: O(N*log(N))
+        """
+        distinct, inverse = np.unique(self.masks, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        order = np.argsort(inverse, kind='stable')
+        ends = np.cumsum(np.bincount(inverse, minlength=len(distinct))).tolist()
+        changed = []
+        begin = 0
+        for words, end in zip(distinct.tolist(), ends):
+            cells = order[begin:end]
+            begin = end
+            mask = self.from_words(words)
+            if mask:
+                self.set_mask(cells[0], SequenceLayerStore.special_mask(mask))
+                self.masks[cells] = self.masks[cells[0]]
+                changed.append(cells)
+        return np.concatenate(changed) if changed else np.zeros(0, dtype=np.int64)
+
+    def empty(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Returns whether each square given has no layers.
+
+        Complexity:
+        - Worst case and Best: O(C*L/64), C is the number of squares given
+        """
+        return ~self.masks[cells].any(axis=1)
+
+    def state_key(self, cell: int) -> int:
+        """
+        Returns the key SequenceLayerStore gives for a square, its BSet bits, see LayerStore.state_key.
+
+        Complexity:
+        - Worst case and Best: O(L/64), L is the number of registered layers
+        """
+        return self.mask(cell)
+
+
+class AdditiveArrays:
+    """
+    The layers of square c are the ring values[start[c] : start[c] + capacity[c]], holding length[c] layer indices
+    from position head[c], and read backwards when reversed[c]. A full ring is moved to a new segment of
+    twice the capacity at the end of values, up to max_layers, like CircularDeque grows its array.
+
+    Attributes:
+        values (np.ndarray): layer indices of every square, values[:used] is in use
+        start, capacity, head, length (np.ndarray): where each square's ring is and how full it is
+        reversed (np.ndarray): True where the square's layers are read from the physical end
+        animated (np.ndarray): number of layers of each square which aren't pure
+    """
+    INITIAL_CAPACITY = 4
+
+    def __init__(self, size: int, max_layers: int) -> None:
+        self.max_layers = max_layers
+        self.values = np.zeros(self.INITIAL_CAPACITY * 16, dtype=np.int32)
+        self.used = 0
+        self.start = np.zeros(size, dtype=np.int64)
+        self.capacity = np.zeros(size, dtype=np.int32)
+        self.head = np.zeros(size, dtype=np.int32)
+        self.length = np.zeros(size, dtype=np.int32)
+        self.reversed = np.zeros(size, dtype=bool)
+        self.animated = np.zeros(size, dtype=np.int32)
+
+    def indices(self, cell: int) -> list[int]:
+        """
+        Returns the layer indices of a square, first added first.
+
+        Complexity:
+        - Worst case and Best: O(M), M is the number of layers of the square
+        """
+        start, capacity, head, length = int(self.start[cell]), int(self.capacity[cell]), int(self.head[cell]), int(self.length[cell])
+        ring = self.values[start:start + capacity].tolist()
+        physical = [ring[(head + i) % capacity] for i in range(length)]
+        if self.reversed[cell]:
+            physical.reverse()
+        return physical
+
+    def state_key(self, cell: int) -> tuple:
+        """
+        Returns the key AdditiveLayerStore gives for a square, see LayerStore.state_key.
+
+        Complexity:
+        - Worst case and Best: O(M), M is the number of layers of the square
+        """
+        return tuple(self.indices(cell))
+
+    def append(self, cell: int, index: int) -> bool:
+        """
+        Adds a layer index at the logical end of a square, returns False if it already has max_layers.
+
+        Complexity:
+        - Worst case: O(M) when the ring is moved
+        - Best case: O(1)
+        """
+        length = int(self.length[cell])
+        if length == self.max_layers:
+            return False
+        if length == self.capacity[cell]:
+            self.__grow(cell)
+        capacity = int(self.capacity[cell])
+        if self.reversed[cell]:
+            self.head[cell] = (self.head[cell] - 1) % capacity
+            position = int(self.head[cell])
+        else:
+            position = (int(self.head[cell]) + length) % capacity
+        self.values[self.start[cell] + position] = index
+        self.length[cell] = length + 1
+        return True
+
+    def serve(self, cell: int) -> int:
+        """
+        Removes and returns the logically first layer index of a non empty square.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        capacity = int(self.capacity[cell])
+        self.length[cell] -= 1
+        if self.reversed[cell]:
+            position = (int(self.head[cell]) + int(self.length[cell])) % capacity
+        else:
+            position = int(self.head[cell])
+            self.head[cell] = (position + 1) % capacity
+        return int(self.values[self.start[cell] + position])
+
+    def add(self, index: int, cells: np.ndarray) -> np.ndarray:
+        """
+        Appends the layer index to every square given, in order, so a square given twice gets it twice.
+        Squares are done a round at a time, each round taking every square given at most once.
+
+        Returns:
+        - result: the numbers of the squares which changed, once per change
+
+        Complexity:
+        - Worst case: O(C + R*N), C is the number of squares given and R the most times one is given
+        - Best case: O(C*log(C))
+        """
+        animated = not LAYERS[index].pure
+        changed = []
+        for cells in rounds(cells):
+            cells = cells[self.length[cells] < self.max_layers]
+            self.__grow(cells[self.length[cells] == self.capacity[cells]])
+            capacity = self.capacity[cells]
+            backwards = self.reversed[cells]
+            self.head[cells] = np.where(backwards, (self.head[cells] - 1) % capacity, self.head[cells])
+            position = np.where(backwards, self.head[cells], (self.head[cells] + self.length[cells]) % capacity)
+            self.values[self.start[cells] + position] = index
+            self.length[cells] += 1
+            self.animated[cells] += animated
+            changed.append(cells)
+        return np.concatenate(changed) if changed else np.zeros(0, dtype=np.int64)
+
+    def erase(self, index: int, cells: np.ndarray) -> np.ndarray:
+        """
+        Serves the first layer index of every square given, whatever index is given, in order, skipping empty squares.
+
+        Returns:
+        - result: the numbers of the squares which changed, once per change
+
+        Complexity:
+        - Worst case: O(C + R*N), C is the number of squares given and R the most times one is given
+        - Best case: O(C*log(C))
+        """
+        pure = np.array([layer is not None and layer.pure for layer in LAYERS], dtype=bool)
+        changed = []
+        for cells in rounds(cells):
+            cells = cells[self.length[cells] > 0]
+            capacity = self.capacity[cells]
+            self.length[cells] -= 1
+            backwards = self.reversed[cells]
+            position = np.where(backwards, (self.head[cells] + self.length[cells]) % capacity, self.head[cells])
+            self.head[cells] = np.where(backwards, self.head[cells], (self.head[cells] + 1) % capacity)
+            self.animated[cells] -= ~pure[self.values[self.start[cells] + position]]
+            changed.append(cells)
+        return np.concatenate(changed) if changed else np.zeros(0, dtype=np.int64)
+
+    def special(self) -> np.ndarray:
+        """
+        Reverses the layers of every square, returns the numbers of the squares with more than one layer.
+
+        Complexity:
+        - Worst case and Best: O(N)
+        """
+        self.reversed ^= True
+        return np.flatnonzero(self.length > 1)
+
+    def empty(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Returns whether each square given has no layers.
+
+        Complexity:
+        - Worst case and Best: O(C), C is the number of squares given
+        """
+        return self.length[cells] == 0
+
+    def __grow(self, cells) -> None:
+        """
+        Moves the full rings of the squares given to new segments with twice the capacity, keeping the physical order.
+        """
+        cells = np.atleast_1d(cells)
+        if not len(cells):
+            return
+        capacity = np.minimum(self.max_layers, np.maximum(self.INITIAL_CAPACITY, 2 * self.capacity[cells]))
+        starts = self.used + np.cumsum(capacity) - capacity
+        needed = self.used + int(capacity.sum())
+        if needed > len(self.values):
+            values = np.zeros(max(2 * len(self.values), needed), dtype=np.int32)
+            values[:self.used] = self.values[:self.used]
+            self.values = values
+        lengths = self.length[cells]
+        owner = np.repeat(np.arange(len(cells)), lengths)
+        offset = np.arange(len(owner)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        old = self.start[cells][owner] + (self.head[cells][owner] + offset) % np.maximum(self.capacity[cells][owner], 1)
+        self.values[starts[owner] + offset] = self.values[old]
+        self.start[cells] = starts
+        self.capacity[cells] = capacity
+        self.head[cells] = 0
+        self.used = needed
+
+
+class ArraySetStore(LayerStore):
+    """
+    A single square of SetArrays, behaving like a SetLayerStore.
+    """
+
+    def __init__(self, arrays: SetArrays, cell: int) -> None:
+        LayerStore.__init__(self)
+        self.arrays = arrays
+        self.cell = cell
+
+    def add(self, layer: Layer) -> bool:
+        """
+        Set the single layer. Returns true if the LayerStore was actually changed.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        if self.arrays.layer[self.cell] == layer.index:
+            return False
+        self.arrays.layer[self.cell] = layer.index
+        self.changed()
+        return True
+
+    def get_color(self, start: tuple, timestamp: float, x: int, y: int) -> tuple[int, int, int]:
+        """
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        color = start
+        for layer in self.applied_layers():
+            color = layer.apply(color, timestamp, x, y)
+        return color
+
+    def erase(self, layer: Layer) -> bool:
+        """
+        Remove the single layer, whatever layer is given. Returns true if the LayerStore was actually changed.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        if self.arrays.layer[self.cell] < 0:
+            return False
+        self.arrays.layer[self.cell] = -1
+        self.changed()
+        return True
+
+    def special(self) -> None:
+        """
+        Invert the colour output.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        self.arrays.inverted[self.cell] = not self.arrays.inverted[self.cell]
+        self.changed()
+
+    def is_animated(self) -> bool:
+        index = int(self.arrays.layer[self.cell])
+        return index >= 0 and not LAYERS[index].pure
+
+    def applied_layers(self) -> tuple[Layer, ...]:
+        index = int(self.arrays.layer[self.cell])
+        applied = () if index < 0 else (LAYERS[index],)
+        if self.arrays.inverted[self.cell]:
+            applied += (layers.invert,)
+        return applied
+
+    def painted_layers(self) -> tuple[Layer, ...]:
+        index = int(self.arrays.layer[self.cell])
+        return () if index < 0 else (LAYERS[index],)
+
+    def state_key(self) -> tuple:
+        """
+        The same key SetLayerStore gives.
+        """
+        return self.arrays.state_key(self.cell)
+
+
+class ArraySequenceStore(SequenceLayerStore):
+    """
+    A single square of SequenceArrays, behaving like a SequenceLayerStore.
+    """
+
+    def __init__(self, arrays: SequenceArrays, cell: int) -> None:
+        LayerStore.__init__(self)
+        self.arrays = arrays
+        self.cell = cell
+
+    @property
+    def layers_store(self) -> BSet:
+        """
+        The layers applied to the square, as a new BSet. Changing it doesn't change the square.
+        """
+        layers_store = BSet()
+        layers_store.elems = self.arrays.mask(self.cell)
+        return layers_store
+
+    def add(self, layer: Layer) -> bool:
+        """
+        Ensure this layer type is applied. Returns true if the LayerStore was actually changed.
+
+        Complexity:
+        - Worst case and Best: O(L/64)
+        """
+        mask = self.arrays.mask(self.cell)
+        if (mask >> layer.index) & 1:
+            return False
+        self.arrays.set_mask(self.cell, mask | (1 << layer.index))
+        self.changed()
+        return True
+
+    def erase(self, layer: Layer) -> bool:
+        """
+        Ensure this layer type is not applied. Returns true if the LayerStore was actually changed.
+
+        Complexity:
+        - Worst case and Best: O(L/64)
+        """
+        mask = self.arrays.mask(self.cell)
+        if not (mask >> layer.index) & 1:
+            return False
+        self.arrays.set_mask(self.cell, mask & ~(1 << layer.index))
+        self.changed()
+        return True
+
+    def special(self) -> None:
+        """
+        Remove the layer with the median name, see SequenceLayerStore.special.
+
+        Complexity:
+        - Worst case: O(M) when the mask isn't cached
+        - Best case: O(L/64)
+        """
+        mask = self.arrays.mask(self.cell)
+        if not mask:
+            return
+        self.arrays.set_mask(self.cell, SequenceLayerStore.special_mask(mask))
+        self.changed()
+
+    def state_key(self) -> int:
+        """
+        The same key SequenceLayerStore gives, without making a BSet.
+        """
+        return self.arrays.state_key(self.cell)
+
+
+class ArrayAdditiveStore(LayerStore):
+    """
+    A single square of AdditiveArrays, behaving like an AdditiveLayerStore.
+    Every view of a square is thrown away quickly, so compiled chains are shared between squares
+    through chain_cache, keyed by state_key.
+    """
+    chain_cache = {}
+    CHAIN_CACHE_LIMIT = 4096
+
+    def __init__(self, arrays: AdditiveArrays, cell: int) -> None:
+        LayerStore.__init__(self)
+        self.arrays = arrays
+        self.cell = cell
+
+    def add(self, layer: Layer) -> bool:
+        """
+        Add a new layer to be added last. Returns true if the LayerStore was actually changed.
+
+        Complexity:
+        - Worst case: O(M) when the square's ring has to grow
+        - Best case: O(1)
+        """
+        if not self.arrays.append(self.cell, layer.index):
+            return False
+        if not layer.pure:
+            self.arrays.animated[self.cell] += 1
+        self.changed()
+        return True
+
+    def get_color(self, start: tuple, timestamp: float, x: int, y: int) -> tuple[int, int, int]:
+        """
+        Applies the compiled chain of the square's layers, see AdditiveLayerStore.get_color.
+
+        Complexity:
+        - Worst case: O(M) when the chain isn't cached
+        - Best case: O(M) to find the key, then O(K) for a compiled chain of length K
+        """
+        key = self.state_key()
+        chain = ArrayAdditiveStore.chain_cache.get(key)
+        if chain is None:
+            if len(ArrayAdditiveStore.chain_cache) >= self.CHAIN_CACHE_LIMIT:
+                ArrayAdditiveStore.chain_cache.clear()
+            chain = ArrayAdditiveStore.chain_cache[key] = compile_chain(tuple(LAYERS[index] for index in key))
+        return apply_chain(chain, start, timestamp, x, y)
+
+    def erase(self, layer: Layer) -> bool:
+        """
+        Remove the first layer that was added, whatever layer is given. Returns true if the LayerStore was actually changed.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        if not self.arrays.length[self.cell]:
+            return False
+        if not LAYERS[self.arrays.serve(self.cell)].pure:
+            self.arrays.animated[self.cell] -= 1
+        self.changed()
+        return True
+
+    def special(self) -> None:
+        """
+        Reverse the order of current layers, by flipping the direction of the square's ring.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        self.arrays.reversed[self.cell] = not self.arrays.reversed[self.cell]
+        if self.arrays.length[self.cell] > 1:
+            self.changed()
+
+    def is_animated(self) -> bool:
+        return self.arrays.animated[self.cell] > 0
+
+    def applied_layers(self) -> tuple[Layer, ...]:
+        return tuple(LAYERS[index] for index in self.arrays.indices(self.cell))
+
+    def state_key(self) -> tuple:
+        """
+        The same key AdditiveLayerStore gives.
+        """
+        return self.arrays.state_key(self.cell)
+
+    def is_empty(self) -> bool:
+        return not self.arrays.length[self.cell]
+
+
+class ProxyColumn:
+    """
+    Column x of a grid which doesn't keep LayerStore objects, so grid[x][y] still works.
+    Indexing asks the grid for a new view of the square, which reports its changes to the grid.
+    """
+
+    def __init__(self, grid, x: int) -> None:
+        self.grid = grid
+        self.x = x
+
+    def __len__(self) -> int:
+        return self.grid.y
+
+    def __getitem__(self, y: int) -> LayerStore:
+        """
+        Raises:
+        - IndexError: if y is out of range, negative values count from the end like ArrayR
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        if not -self.grid.y <= y < self.grid.y:
+            raise IndexError("invalid index")
+        y %= self.grid.y
+        store = self.grid.proxy(self.x, y)
+        store.watch(self.grid, (self.x, y))
+        return store
+
+
+class ProxyColumns:
+    """
+    The columns of a grid which doesn't keep LayerStore objects, made when indexed so a grid
+    of any width costs nothing to create.
+    """
+
+    def __init__(self, grid) -> None:
+        self.grid = grid
+
+    def __len__(self) -> int:
+        return self.grid.x
+
+    def __getitem__(self, x: int) -> ProxyColumn:
+        """
+        Raises:
+        - IndexError: if x is out of range, negative values count from the end like ArrayR
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        if not -self.grid.x <= x < self.grid.x:
+            raise IndexError("invalid index")
+        return ProxyColumn(self.grid, x % self.grid.x)
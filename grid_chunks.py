@@ -0,0 +1,172 @@
+"""
+Chunked storage for a grid of any size, where only the parts that have been painted take memory.
+
+The canvas is cut into square chunks of chunk_size by chunk_size squares, each kept as grid_arrays storage.
+A chunk is only made the first time one of its squares changes, until then its squares read as the
+template, an empty chunk which also holds what Grid.special did to unpainted squares.
+Chunks are keyed by canvas position, which doesn't move when the grid grows, see Grid.grow.
+"""
+
+from __future__ import annotations
+import copy
+from typing import Callable
+import numpy as np
+from grid_arrays import SetArrays, ArraySetStore, ArraySequenceStore, ArrayAdditiveStore
+from layer_store import LayerStore
+from layer_util import Layer
+
+
+class GridChunks:
+    """
+    Attributes:
+        size (int): the width and height of a chunk in squares
+        template: storage for an empty chunk, copied when a chunk is made
+        chunks (dict): the chunks made so far, by (x // size, y // size) of their canvas position
+    """
+    CHUNK_SIZE = 64
+
+    def __init__(self, make: Callable[[int], object], chunk_size: int = CHUNK_SIZE) -> None:
+        """
+        Args:
+        - make: makes grid_arrays storage for the given number of squares
+        - chunk_size: the width and height of a chunk in squares
+        """
+        self.size = chunk_size
+        self.template = make(chunk_size * chunk_size)
+        self.chunks = {}
+
+    def locate(self, x: int, y: int) -> tuple[tuple[int, int], int]:
+        """
+        Returns the key of the chunk holding canvas position (x, y), and the number of the square in it.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        (kx, ox), (ky, oy) = divmod(x, self.size), divmod(y, self.size)
+        return (kx, ky), ox * self.size + oy
+
+    def get(self, key: tuple[int, int]):
+        """
+        Returns the chunk with the key, or the template if it hasn't been made. The template must not be changed.
+        """
+        return self.chunks.get(key, self.template)
+
+    def claim(self, key: tuple[int, int]):
+        """
+        Returns the chunk with the key, making it from the template if it hasn't been made.
+
+        Complexity:
+        - Worst case: O(S^2) when the chunk is made, S is the chunk size
+        - Best case: O(1)
+        """
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = copy.deepcopy(self.template)
+        return chunk
+
+    def split(self, positions: np.ndarray):
+        """
+        Groups canvas positions by chunk, keeping the order of positions in the same chunk.
+
+        Args:
+        - positions: (C, 2) array of canvas positions
+
+        Returns:
+        - result: (key, cells) pairs, cells being the numbers of the squares in that chunk
+
+        Complexity:
+        - Worst case and Best: O(C*log(C)), C is the number of positions
+        """
+        keys, offsets = np.divmod(positions, self.size)
+        distinct, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        order = np.argsort(inverse, kind='stable')
+        cells = offsets[:, 0] * self.size + offsets[:, 1]
+        ends = np.cumsum(np.bincount(inverse, minlength=len(distinct))).tolist()
+        begin = 0
+        for key, end in zip(distinct.tolist(), ends):
+            yield tuple(key), cells[order[begin:end]]
+            begin = end
+
+    def positions(self, key: tuple[int, int], cells: np.ndarray) -> np.ndarray:
+        """
+        Returns the (C, 2) canvas positions of squares of a chunk, the inverse of split.
+        """
+        xs, ys = np.divmod(cells, self.size)
+        return np.stack([xs + key[0] * self.size, ys + key[1] * self.size], axis=1)
+
+    def special(self) -> list[tuple[tuple[int, int], np.ndarray]]:
+        """
+        Applies special to every square, painted or not.
+
+        Returns:
+        - result: (key, cells) pairs of the squares of made chunks which changed
+
+        Complexity:
+        - Worst case and Best: O(K*S^2) for the K chunks made, see the special of the storage
+        """
+        self.template.special()
+        return [(key, chunk.special()) for key, chunk in self.chunks.items()]
+
+    def empty(self, key: tuple[int, int], cells: np.ndarray) -> np.ndarray:
+        """
+        Returns whether each square given of a made chunk reads the same as the squares of chunks
+        which haven't been made, which have no layers but can be inverted with DRAW_STYLE_SET.
+
+        Complexity:
+        - Worst case and Best: O(C), C is the number of squares given, see the empty of the storage
+        """
+        chunk = self.chunks[key]
+        if isinstance(chunk, SetArrays):
+            return chunk.empty(cells, bool(self.template.inverted[0]))
+        return chunk.empty(cells)
+
+
+class ChunkView:
+    """
+    Mixed into the grid_arrays views, so that a square of a chunk which hasn't been made reads the template,
+    and makes the chunk before it is changed. The chunk is looked up on every use, so views made before
+    the chunk was made see it too.
+    """
+
+    def __init__(self, chunks: GridChunks, key: tuple[int, int], cell: int) -> None:
+        LayerStore.__init__(self)
+        self.chunks = chunks
+        self.key = key
+        self.cell = cell
+
+    @property
+    def arrays(self):
+        return self.chunks.get(self.key)
+
+    def add(self, layer: Layer) -> bool:
+        self.chunks.claim(self.key)
+        return super().add(layer)
+
+    def erase(self, layer: Layer) -> bool:
+        if self.key not in self.chunks.chunks:
+            # Squares of a chunk which hasn't been made have no layers.
+            return False
+        return super().erase(layer)
+
+    def special(self) -> None:
+        self.chunks.claim(self.key)
+        super().special()
+
+    def is_empty(self) -> bool:
+        """
+        True if the square reads the same as the squares of chunks which haven't been made.
+        """
+        return self.state_key() == type(self)(self.chunks, None, self.cell).state_key()
+
+
+class ChunkSetStore(ChunkView, ArraySetStore):
+    pass
+
+
+class ChunkAdditiveStore(ChunkView, ArrayAdditiveStore):
+    pass
+
+
+class ChunkSequenceStore(ChunkView, ArraySequenceStore):
+    pass
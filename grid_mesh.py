@@ -0,0 +1,94 @@
+"""
+Retained geometry for drawing the painting grid.
+
+The quads for every grid square are uploaded to the GPU once, and each frame
+only the vertex colours are rewritten, so the whole grid is a single draw call.
+"""
+
+from __future__ import annotations
+import arcade
+import numpy as np
+from arcade.gl import BufferDescription
+
+
+class GridMesh:
+    """
+    One quad per grid square, stored in the same order as the grid is indexed
+    (all of column x=0 bottom to top, then column x=1, ...).
+
+    Attributes:
+        size_x, size_y (int): dimensions of the grid being drawn
+        colors (np.ndarray): RGBA bytes for every vertex, rewritten by update()
+    """
+
+    VERTICES_PER_SQUARE = 4
+    BYTES_PER_VERTEX = 4
+
+    def __init__(self, size_x: int, size_y: int, square_width: float, square_height: float) -> None:
+        """
+        Builds the vertex positions and indices of every grid square.
+        Needs an active arcade window, as the buffers live in its context.
+
+        Args:
+        - size_x, size_y: the dimensions of the grid
+        - square_width, square_height: the on screen size of a single square
+
+        Complexity:
+        - Worst case and Best: O(X*Y), the geometry is only built once per reset
+        """
+        self.ctx = arcade.get_window().ctx
+        self.size_x = size_x
+        self.size_y = size_y
+
+        # draw_lrtb_rectangle_filled grows every rectangle by half a pixel on each side,
+        # with later squares drawn over earlier ones. Triangles in a single draw call are
+        # still rasterised in order, so doing the same here gives an identical picture.
+        xs, ys = np.meshgrid(np.arange(size_x), np.arange(size_y), indexing='ij')
+        left = (square_width * xs - 0.5).ravel()
+        right = (square_width * (xs + 1) + 0.5).ravel()
+        bottom = (square_height * ys - 0.5).ravel()
+        top = (square_height * (ys + 1) + 0.5).ravel()
+        positions = np.stack([left, bottom, right, bottom, right, top, left, top], axis=1).astype('f4')
+        first = np.arange(size_x * size_y, dtype='u4')[:, None] * self.VERTICES_PER_SQUARE
+        indices = first + np.array([0, 1, 2, 0, 2, 3], dtype='u4')
+
+        # Opaque black to start with, only the RGB channels change after this.
+        self.colors = np.zeros((size_x * size_y, self.VERTICES_PER_SQUARE, self.BYTES_PER_VERTEX), dtype=np.uint8)
+        self.colors[:, :, 3] = 255
+        self.position_buffer = self.ctx.buffer(data=positions)
+        self.color_buffer = self.ctx.buffer(data=self.colors, usage="stream")
+        self.index_buffer = self.ctx.buffer(data=indices)
+        self.geometry = self.ctx.geometry(
+            [
+                BufferDescription(self.position_buffer, '2f', ['in_vert']),
+                BufferDescription(self.color_buffer, '4f1', ['in_color'], normalized=['in_color']),
+            ],
+            index_buffer=self.index_buffer,
+            mode=self.ctx.TRIANGLES,
+        )
+        self.program = self.ctx.shape_element_list_program
+
+    def update(self, framebuffer: np.ndarray) -> None:
+        """
+        Sets the colour of every square.
+
+        Args:
+        - framebuffer: (x, y, 3) uint8 array of square colours, as given by Grid.colors
+
+        Complexity:
+        - Worst case and Best: O(X*Y)
+        """
+        self.colors[:, :, :3] = framebuffer.reshape(-1, 1, 3)
+        self.color_buffer.write(self.colors)
+
+    def draw(self) -> None:
+        """
+        Draws every grid square in a single call.
+
+        Complexity:
+        - Worst case and Best: O(1) draw calls
+        """
+        self.program['Position'] = (0, 0)
+        self.program['Angle'] = 0
+        self.geometry.render(self.program)
+
@@ -0,0 +1,294 @@
+"""
+Hash consed layer store states, shared by every square in the same state.
+
+Most squares of a canvas are in one of a few states, empty or holding the same layers, so instead of a
+LayerStore per square each distinct state is kept once as a canonical LayerStore which is never changed,
+and each square only holds the number of its state. Changing a square copies the canonical store of its state,
+changes the copy and looks up (or adds) the canonical state of the result. What an add, erase or special
+does to a state is remembered, so doing the same thing to a state again is a lookup,
+and the colour of a state of pure layers is only worked out once.
+"""
+
+from __future__ import annotations
+import copy
+from typing import Callable
+import numpy as np
+from layer_util import Layer, LAYERS
+from layer_store import LayerStore
+from grid_arrays import rounds
+from state_tree import StateTree, Snapshot
+
+ADD = "add"
+ERASE = "erase"
+SPECIAL = "special"
+
+
+class StateTable:
+    """
+    The distinct states of one draw style.
+
+    Attributes:
+        stores (list): canonical store of each state, stores[i] is the state numbered i, and must not be changed
+        keys (list): state_key of each state
+        numbers (dict): number of the state with each state_key
+        transitions (dict): (state, action, layer index) to (new state, whether the store changed)
+        colors (dict): (state, start) to the colour of a state which isn't animated
+    """
+    COLOR_CACHE_LIMIT = 4096
+
+    def __init__(self, make_store: Callable[[], LayerStore]) -> None:
+        """
+        Args:
+        - make_store: makes an empty LayerStore of the draw style
+        """
+        self.stores = []
+        self.keys = []
+        self.numbers = {}
+        self.transitions = {}
+        self.colors = {}
+        self.empty = self.intern(make_store())
+
+    def __len__(self) -> int:
+        return len(self.stores)
+
+    def intern(self, store: LayerStore) -> int:
+        """
+        Returns the number of the state of the store, which becomes the canonical store if the state is new.
+
+        Complexity:
+        - Worst case and Best: O(K), K is the cost of state_key
+        """
+        key = store.state_key()
+        number = self.numbers.get(key)
+        if number is None:
+            number = self.numbers[key] = len(self.stores)
+            self.stores.append(store)
+            self.keys.append(key)
+        return number
+
+    def transition(self, state: int, action: str, layer: Layer | None) -> tuple[int, bool]:
+        """
+        Returns the state reached by doing an action to a state, and whether the store changed.
+
+        Args:
+        - state: the number of the state
+        - action: ADD, ERASE or SPECIAL
+        - layer: the layer to add or erase, None for SPECIAL
+
+        Complexity:
+        - Worst case: O(M) when the action hasn't been done to the state before, M is the size of the store
+        - Best case: O(1)
+        """
+        memo = (state, action, None if layer is None else layer.index)
+        result = self.transitions.get(memo)
+        if result is None:
+            store = self.copy(self.stores[state])
+            if action == ADD:
+                changed = store.add(layer)
+            elif action == ERASE:
+                changed = store.erase(layer)
+            else:
+                store.special()
+                changed = None
+            after = self.intern(store)
+            result = self.transitions[memo] = (after, after != state if changed is None else changed)
+        return result
+
+    def color(self, state: int, start: tuple, timestamp: float, x: int, y: int) -> tuple[int, int, int]:
+        """
+        Returns the colour of a square in the state, only worked out once for states which aren't animated.
+
+        Complexity:
+        - Worst case: O(M) when the colour isn't cached or the state is animated
+        - Best case: O(1)
+        """
+        store = self.stores[state]
+        if store.is_animated():
+            return store.get_color(start, timestamp, x, y)
+        memo = (state, tuple(start))
+        color = self.colors.get(memo)
+        if color is None:
+            if len(self.colors) >= self.COLOR_CACHE_LIMIT:
+                self.colors.clear()
+            color = self.colors[memo] = store.get_color(start, timestamp, x, y)
+        return color
+
+    @staticmethod
+    def copy(store: LayerStore) -> LayerStore:
+        """
+        Returns a copy of a store which can be changed without changing it, sharing the layers themselves.
+        """
+        return copy.deepcopy(store, {id(layer): layer for layer in LAYERS if layer is not None})
+
+
+class StateArrays:
+    """
+    The state number of every square, with the bulk operations of the grid_arrays storage classes,
+    each done once per distinct state rather than once per square.
+    The numbers are kept in a StateTree, so snapshots of them can be taken in O(1).
+
+    Attributes:
+        table (StateTable): the states the numbers refer to
+        states (StateTree): state number of each square
+    """
+
+    def __init__(self, table: StateTable, size: int) -> None:
+        self.table = table
+        self.states = StateTree(size, table.empty)
+
+    def add(self, index: int, cells: np.ndarray) -> np.ndarray:
+        """
+        Adds the layer to every square given, in order, see rounds.
+        Returns the numbers of the squares which changed, once per change.
+
+        Complexity:
+        - Worst case and Best: O(C*log(C) + D), D is the number of distinct states of the squares given
+        """
+        return self.__act(ADD, LAYERS[index], cells)
+
+    def erase(self, index: int, cells: np.ndarray) -> np.ndarray:
+        """
+        Erases the layer from every square given, in order, see rounds.
+        Returns the numbers of the squares which changed, once per change.
+
+        Complexity:
+        - Worst case and Best: O(C*log(C) + D), D is the number of distinct states of the squares given
+        """
+        return self.__act(ERASE, LAYERS[index], cells)
+
+    def special(self) -> np.ndarray:
+        """
+        Applies special to every square, returns the numbers of the squares which changed.
+
+        Complexity:
+        - Worst case and Best: O(N*log(N) + D), D is the number of distinct states
+        """
+        return self.__act(SPECIAL, None, np.arange(self.states.size))
+
+    def empty(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Returns whether each square given is in the empty state.
+
+        Complexity:
+        - Worst case and Best: O(C*log(C) + L*log(N)), see StateTree.gather
+        """
+        return self.states.gather(cells) == self.table.empty
+
+    def state_key(self, cell: int):
+        """
+        Returns the key the canonical store of a square's state gives, see LayerStore.state_key.
+
+        Complexity:
+        - Worst case and Best: O(log(N)), see StateTree.get
+        """
+        return self.table.keys[self.states.get(cell)]
+
+    def snapshot(self) -> Snapshot:
+        """
+        Returns the states of every square now, which won't change.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        return self.states.snapshot(self.table)
+
+    def restore(self, snapshot: Snapshot) -> np.ndarray:
+        """
+        Goes back to a snapshot, of this storage or another of the same size, whose table is used from now on.
+
+        Returns:
+        - result: the numbers of the squares which changed, all of them if the table is different
+
+        Raises:
+        - ValueError: if the snapshot is of a different number of squares
+
+        Complexity:
+        - Worst case: O(N)
+        - Best case: O(P*log(N)), P is the number of paths written since the snapshot
+        """
+        changed = self.states.restore(snapshot)
+        if snapshot.table is not self.table:
+            self.table = snapshot.table
+            changed = np.arange(self.states.size)
+        return changed
+
+    def __act(self, action: str, layer: Layer | None, cells: np.ndarray) -> np.ndarray:
+        """
+        Does the action to every square given, working out the result once per distinct state.
+        Only squares whose state number changes are written, so other leaves stay shared with snapshots.
+        """
+        changed = []
+        for cells in rounds(cells):
+            before = self.states.gather(cells)
+            distinct, inverse = np.unique(before, return_inverse=True)
+            results = [self.table.transition(state, action, layer) for state in distinct.tolist()]
+            after = np.array([state for state, _ in results], dtype=np.int32)[inverse]
+            did_change = np.array([change for _, change in results], dtype=bool)[inverse]
+            moved = after != before
+            self.states.scatter(cells[moved], after[moved])
+            changed.append(cells[did_change])
+        return np.concatenate(changed) if changed else np.zeros(0, dtype=np.int64)
+
+
+class StateLayerStore(LayerStore):
+    """
+    A single square of StateArrays, behaving like the canonical store of its state.
+    """
+
+    def __init__(self, arrays: StateArrays, cell: int) -> None:
+        LayerStore.__init__(self)
+        self.arrays = arrays
+        self.cell = cell
+
+    @property
+    def store(self) -> LayerStore:
+        """
+        The canonical store of the square's state, which must not be changed.
+        """
+        return self.arrays.table.stores[self.arrays.states.get(self.cell)]
+
+    def act(self, action: str, layer: Layer | None) -> bool:
+        """
+        Moves the square to the state the action leads to, returns whether the store changed.
+
+        Complexity:
+        - Worst case: O(M) when the action hasn't been done to the state before, plus copying the path, see StateTree.set
+        - Best case: O(log(N))
+        """
+        before = self.arrays.states.get(self.cell)
+        after, changed = self.arrays.table.transition(before, action, layer)
+        if after != before:
+            self.arrays.states.set(self.cell, after)
+        if changed:
+            self.changed()
+        return changed
+
+    def add(self, layer: Layer) -> bool:
+        return self.act(ADD, layer)
+
+    def erase(self, layer: Layer) -> bool:
+        return self.act(ERASE, layer)
+
+    def special(self) -> None:
+        self.act(SPECIAL, None)
+
+    def get_color(self, start: tuple, timestamp: float, x: int, y: int) -> tuple[int, int, int]:
+        return self.arrays.table.color(self.arrays.states.get(self.cell), start, timestamp, x, y)
+
+    def is_animated(self) -> bool:
+        return self.store.is_animated()
+
+    def applied_layers(self) -> tuple[Layer, ...]:
+        return self.store.applied_layers()
+
+    def painted_layers(self) -> tuple[Layer, ...]:
+        return self.store.painted_layers()
+
+    def state_key(self):
+        """
+        The same key the canonical store gives.
+        """
+        return self.arrays.state_key(self.cell)
+
+    def is_empty(self) -> bool:
+        return self.arrays.states.get(self.cell) == self.arrays.table.empty
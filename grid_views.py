@@ -0,0 +1,117 @@
+"""
+Views of the squares of a grid.
+
+A grid with a LayerStore object per square keeps them in one flat list, square (x, y) at x * size_y + y,
+so the squares of a column, or of a column of a region, are next to each other and can be sliced out.
+FlatColumns and FlatColumn keep grid[x][y] working on top of the list, and GridRegion goes over a
+rectangle of squares of any grid.
+"""
+
+from __future__ import annotations
+from typing import Iterator
+from layer_store import LayerStore
+
+
+class FlatColumn:
+    """
+    Column x of a grid kept in a flat list, cells[start : start + length].
+    """
+    __slots__ = ('cells', 'start', 'length')
+
+    def __init__(self, cells: list, start: int, length: int) -> None:
+        self.cells = cells
+        self.start = start
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, y: int) -> LayerStore:
+        """
+        Raises:
+        - IndexError: if y is out of range, negative values count from the end like ArrayR
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        if 0 <= y < self.length:
+            return self.cells[self.start + y]
+        if -self.length <= y < 0:
+            return self.cells[self.start + self.length + y]
+        raise IndexError("invalid index")
+
+    def __iter__(self) -> Iterator[LayerStore]:
+        return iter(self.cells[self.start:self.start + self.length])
+
+
+class FlatColumns:
+    """
+    The columns of a grid kept in a flat list, made once so grid[x] is a lookup.
+    """
+
+    def __init__(self, cells: list, x: int, y: int) -> None:
+        self.columns = [FlatColumn(cells, i * y, y) for i in range(x)]
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __getitem__(self, x: int) -> FlatColumn:
+        """
+        Raises:
+        - IndexError: if x is out of range, negative values count from the end like ArrayR
+        """
+        return self.columns[x]
+
+    def __iter__(self) -> Iterator[FlatColumn]:
+        return iter(self.columns)
+
+
+class GridRegion:
+    """
+    The squares x0 <= x < x1, y0 <= y < y1 of a grid, gone over in order of x then y.
+    For grids with a LayerStore object per square, each column of the region is a slice of the flat list.
+
+    Attributes:
+        grid: the Grid
+        x0, y0, x1, y1 (int): the corners of the region, x1 and y1 not included
+    """
+
+    def __init__(self, grid, x0: int, y0: int, x1: int, y1: int) -> None:
+        """
+        Raises:
+        - IndexError: if the region isn't inside the grid
+        """
+        if not (0 <= x0 <= x1 <= grid.x and 0 <= y0 <= y1 <= grid.y):
+            raise IndexError("invalid region")
+        self.grid = grid
+        self.x0, self.y0, self.x1, self.y1 = x0, y0, x1, y1
+
+    def __len__(self) -> int:
+        return (self.x1 - self.x0) * (self.y1 - self.y0)
+
+    def __iter__(self) -> Iterator[LayerStore]:
+        """
+        Complexity:
+        - Worst case and Best: O(1) per square
+        """
+        cells = self.grid.cells
+        if cells is not None:
+            size_y = self.grid.y
+            for x in range(self.x0, self.x1):
+                yield from cells[x * size_y + self.y0:x * size_y + self.y1]
+        else:
+            for x in range(self.x0, self.x1):
+                for y in range(self.y0, self.y1):
+                    yield self.grid[x, y]
+
+    def positions(self) -> list[tuple[int, int]]:
+        """
+        Returns the positions of the squares, in the order they are gone over.
+        """
+        return [(x, y) for x in range(self.x0, self.x1) for y in range(self.y0, self.y1)]
+
+    def items(self) -> Iterator[tuple[tuple[int, int], LayerStore]]:
+        """
+        Goes over ((x, y), store) pairs.
+        """
+        return zip(self.positions(), self)
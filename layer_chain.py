@@ -0,0 +1,138 @@
+"""
+Compiles a sequence of layers into a shorter one which gives exactly the same colours.
+
+- Layers applied before the last layer which overwrites the colour (layer_util.overwrites) are dropped.
+- Runs of layers with a channel_map (lighten, darken, invert) fold into a single ChannelMap,
+  and maps which end up changing nothing are dropped.
+- If the chain then starts with pure layers which overwrite the colour,
+  everything up to the first layer which isn't pure is worked out once into a Constant.
+
+Colours are assumed to have every channel between 0 and 255, which all layers keep to.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import ClassVar
+import numpy as np
+from layer_util import Layer
+
+
+@dataclass(frozen=True)
+class ChannelMap:
+    """
+    Changes every channel c of the colour to min(high, max(low, scale*c + offset)),
+    where scale is 1 or -1. Behaves like a pure Layer.
+    """
+
+    scale: int
+    offset: int
+    low: int
+    high: int
+    pure: ClassVar[bool] = True
+    overwrites: ClassVar[bool] = False
+
+    def then(self, other: ChannelMap) -> ChannelMap:
+        """
+        Returns the map which applies self and then other.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        # Scaling and offsetting a clamped value moves the bounds with it,
+        # and clamping twice is the same as clamping once to the first bounds clamped by the second.
+        low = other.scale*self.low + other.offset
+        high = other.scale*self.high + other.offset
+        if other.scale < 0:
+            low, high = high, low
+        return ChannelMap(
+            other.scale*self.scale,
+            other.scale*self.offset + other.offset,
+            min(other.high, max(other.low, low)),
+            min(other.high, max(other.low, high)),
+        )
+
+    def is_identity(self) -> bool:
+        """
+        True if the map leaves every colour unchanged.
+        """
+        return self.scale == 1 and self.offset == 0 and self.low <= 0 and self.high >= 255
+
+    def apply(self, color: tuple, timestamp: float, x: int, y: int) -> tuple[int, int, int]:
+        return tuple(min(self.high, max(self.low, self.scale*c + self.offset)) for c in color)
+
+    def apply_batch(self, colors: np.ndarray, timestamp: float, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        # Widened first, as in a narrow dtype such as uint8 the sum would wrap around before the clip.
+        wide = self.scale*colors.astype(np.int64, copy=False) + self.offset
+        return np.clip(wide, self.low, self.high).astype(colors.dtype, copy=False)
+
+
+@dataclass(frozen=True)
+class Constant:
+    """
+    Always gives the same colour. Behaves like a pure Layer which overwrites the colour.
+    """
+
+    color: tuple[int, int, int]
+    pure: ClassVar[bool] = True
+    overwrites: ClassVar[bool] = True
+
+    def apply(self, color: tuple, timestamp: float, x: int, y: int) -> tuple[int, int, int]:
+        return self.color
+
+    def apply_batch(self, colors: np.ndarray, timestamp: float, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        result = np.empty_like(colors)
+        result[:] = self.color
+        return result
+
+
+def compile_chain(applied: tuple[Layer, ...]) -> tuple:
+    """
+    Compiles layers into a chain giving the same colours when applied in order.
+
+    Args:
+    - applied: the layers, in the order they are applied
+
+    Returns:
+    - result: a tuple of Layers, ChannelMaps and Constants, each with apply and apply_batch
+
+    Complexity:
+    - Worst case and Best: O(N), N is the number of layers
+    """
+    first = 0
+    for i, layer in enumerate(applied):
+        if layer.overwrites:
+            first = i
+
+    chain = []
+    for layer in applied[first:]:
+        if layer.channel_map is None:
+            chain.append(layer)
+            continue
+        mapping = ChannelMap(*layer.channel_map)
+        if chain and isinstance(chain[-1], ChannelMap):
+            mapping = chain.pop().then(mapping)
+        chain.append(mapping)
+    # Maps are always folded into their neighbours, so dropping one never leaves two maps next to each other.
+    chain = [step for step in chain if not (isinstance(step, ChannelMap) and step.is_identity())]
+
+    if chain and chain[0].overwrites and chain[0].pure:
+        color = (0, 0, 0)
+        constant = 0
+        while constant < len(chain) and chain[constant].pure:
+            color = chain[constant].apply(color, 0, 0, 0)
+            constant += 1
+        chain[:constant] = [Constant(color)]
+    return tuple(chain)
+
+
+def apply_chain(chain: tuple, start: tuple, timestamp: float, x: int, y: int) -> tuple[int, int, int]:
+    """
+    Applies a compiled chain to the start colour of the square at (x, y).
+
+    Complexity:
+    - Worst case and Best: O(K), K is the length of the chain
+    """
+    color = start
+    for step in chain:
+        color = step.apply(color, timestamp, x, y)
+    return color
@@ -1,20 +1,59 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+import layer_util
 from layer_util import Layer, LAYERS
 from data_structures.stack_adt import ArrayStack
 import layers
-from data_structures.queue_adt import CircularQueue
+from data_structures.deque_adt import CircularDeque
 from data_structures.bset import BSet
-from data_structures.array_sorted_list import ArraySortedList
-from data_structures.sorted_list_adt import ListItem
+from layer_chain import compile_chain, apply_chain
 
 
 
 
+class GridSpecial:
+    """
+    A special applied to every store sharing it at once, see LayerStore.share and Grid.special.
+
+    Attributes:
+        active (bool): True while the stores read as if their own special had been applied once more
+    """
+    __slots__ = ('active',)
+
+    def __init__(self) -> None:
+        self.active = False
+
+
 class LayerStore(ABC):
+    # Stores which aren't sharing a GridSpecial all share this one, which is never activated.
+    grid_special = GridSpecial()
 
     def __init__(self) -> None:
-        pass
+        self.listener = None
+        self.position = None
+
+    def watch(self, listener, position: tuple[int, int]) -> None:
+        """
+        Report every actual change of this store with listener.cell_changed(x, y),
+        so the grid square at position can be marked dirty.
+        """
+        self.listener = listener
+        self.position = position
+
+    def share(self, grid_special: GridSpecial) -> None:
+        """
+        Makes the store read, and change, as if special had been applied to it once more whenever
+        grid_special is active, so a grid can apply special to all its squares by flipping one flag.
+        Only SetLayerStore and AdditiveLayerStore, whose special is the same whatever the layers are, use it.
+        """
+        self.grid_special = grid_special
+
+    def changed(self) -> None:
+        """
+        Called by the implementations whenever add, erase or special changed the store.
+        """
+        if self.listener is not None:
+            self.listener.cell_changed(*self.position)
 
     @abstractmethod
     def add(self, layer: Layer) -> bool:
@@ -46,6 +85,43 @@ class LayerStore(ABC):
         """
         pass
 
+    @abstractmethod
+    def is_animated(self) -> bool:
+        """
+        True if the colour can change without the store changing,
+        which is whenever one of the layers applied is not pure.
+        """
+        pass
+
+    @abstractmethod
+    def applied_layers(self) -> tuple[Layer, ...]:
+        """
+        Returns the layers get_color applies, in the order they are applied.
+        """
+        pass
+
+    def is_empty(self) -> bool:
+        """
+        True if the store reads the same as a new store, so its square shows what unpainted squares show:
+        no layers are applied, apart from a special shared with the other stores of the grid.
+        """
+        return not self.applied_layers()
+
+    def painted_layers(self) -> tuple[Layer, ...]:
+        """
+        Returns the layers added to the store and not erased, in the order get_color applies them,
+        leaving out anything special applies to the colour output.
+        """
+        return self.applied_layers()
+
+    @abstractmethod
+    def state_key(self):
+        """
+        Returns a hashable value which is equal for two stores of the same type
+        exactly when they apply the same layers.
+        """
+        pass
+
 
 class SetLayerStore(LayerStore):
     """
@@ -64,9 +140,12 @@ class SetLayerStore(LayerStore):
 
         self.layers_store is where the layers are stored and is a stack
         self.special_state is if special is active for the layer or not and is initially false
+        self.key is the state_key, kept up to date on every change as rendering asks for it a lot
         '''
+        LayerStore.__init__(self)
         self.layers_store = ArrayStack(1)
         self.special_state = False
+        self.key = (None, False)
 
     def add(self, layer: Layer) -> bool:
         """
@@ -87,12 +166,14 @@ class SetLayerStore(LayerStore):
         """
         if self.layers_store.is_empty():
             self.layers_store.push(layer)
+            self.changed()
             return True
         current_layer = self.layers_store.peek()
         if layer == current_layer: #checking if the adding the layer will change the stack
             return False
         self.layers_store.pop() #if it will then remove the layer already there and push the new one
         self.layers_store.push(layer)
+        self.changed()
         return True
 
     def get_color(self, start: tuple, timestamp: float, x: int, y: int) -> tuple[int, int, int]:
@@ -120,7 +201,7 @@ class SetLayerStore(LayerStore):
                 start, timestamp, x, y
             )  #apply is constant as it is max 3 iterations for any given layer
 
-        if self.special_state: #if the special state is true then we do the special method which is invert
+        if bool(self.special_state) != self.grid_special.active: #if the special state is true then we do the special method which is invert
             color = layers.invert.apply(color, timestamp, x, y)
 
         return color
@@ -145,6 +226,7 @@ class SetLayerStore(LayerStore):
         if self.layers_store.is_empty():
             return False
         self.layers_store.pop() #removes the layer no matter what the arguement is
+        self.changed()
         return True
 
     def special(self) -> None:
@@ -164,6 +246,91 @@ class SetLayerStore(LayerStore):
             - Worst case and Best: O(1)
         """
         self.special_state = ~self.special_state #bitwise operation to flip the state
+        self.changed()
+
+    def is_animated(self) -> bool:
+        """
+        True if the colour can change without the store changing.
+        Args:
+            - None
+
+            Raises:
+            - None
+
+            Returns:
+            - result: a boolean, if the current layer is not pure
+
+            Complexity:
+            - Worst case and Best: O(1)
+        """
+        return not self.layers_store.is_empty() and not self.layers_store.peek().pure
+
+    def applied_layers(self) -> tuple[Layer, ...]:
+        """
+        Returns the layers get_color applies, in the order they are applied.
+        Args:
+            - None
+
+            Raises:
+            - None
+
+            Returns:
+            - result: a tuple of the current layer, followed by invert if special is active
+
+            Complexity:
+            - Worst case and Best: O(1)
+        """
+        applied = () if self.layers_store.is_empty() else (self.layers_store.peek(),)
+        if bool(self.special_state) != self.grid_special.active:
+            applied += (layers.invert,)
+        return applied
+
+    def painted_layers(self) -> tuple[Layer, ...]:
+        """
+        The single layer, without the invert special applies.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        return () if self.layers_store.is_empty() else (self.layers_store.peek(),)
+
+    def is_empty(self) -> bool:
+        """
+        True if there is no layer and no special of the store's own.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        return self.key == (None, False)
+
+    def state_key(self) -> tuple:
+        """
+        Returns a hashable value which is equal for two stores exactly when they apply the same layers.
+        Args:
+            - None
+
+            Raises:
+            - None
+
+            Returns:
+            - result: a tuple of the current layer index (None if empty) and if special is active
+
+            Complexity:
+            - Worst case and Best: O(1)
+        """
+        if self.grid_special.active:
+            return self.key[0], not self.key[1]
+        return self.key
+
+    def changed(self) -> None:
+        """
+        Updates the state key, of the store's own layer and special, before reporting the change.
+        """
+        if self.layers_store.is_empty():
+            self.key = (None, bool(self.special_state))
+        else:
+            self.key = (self.layers_store.peek().index, bool(self.special_state))
+        LayerStore.changed(self)
 
 
 class AdditiveLayerStore(LayerStore):
@@ -173,39 +340,65 @@ class AdditiveLayerStore(LayerStore):
     - erase: Remove the first layer that was added. Ignore what is currently selected.
     - special: Reverse the order of current layers (first becomes last, etc.)
     """
+    MAX_LAYERS = 100
 
-    def __init__(self) -> None:
+    def __init__(self, max_layers: int = MAX_LAYERS) -> None:
         '''
-        creates a circualr queue to store the layers as we need first in first out principal
+        creates a circular deque to store the layers as we need first in first out principal,
+        and it can be iterated over without serving and reversed in O(1) for special
+        the deque only allocates its array on the first add and grows it as needed,
+        so squares which are never painted stay small. At most max_layers can be stored
+        self.animated_layers counts the layers in the queue which are not pure
+        self.chain is the compiled form of the queue (see layer_chain), made by get_color
+        and thrown away whenever the store changes, self.chain_flipped is whether the grid special was active then
+        while the grid special is active (see LayerStore.share) the front of the deque is the last layer applied,
+        so add, erase and applied_layers use the other end
+
+        Raises:
+        - ValueError: if max_layers is less than 1
         '''
-        self.layers_store = CircularQueue(100)
+        if max_layers < 1:
+            raise ValueError("A square must be able to hold at least one layer")
+        LayerStore.__init__(self)
+        self.layers_store = CircularDeque(max_layers)
+        self.animated_layers = 0
+        self.chain = None
+        self.chain_flipped = False
 
     def add(self, layer: Layer) -> bool:
         """
         Add a layer to the store.
         Returns true if the LayerStore was actually changed.
+        nothing is added if the store already has max_layers layers
         Args:
             - layer object
 
         Raises:
-        - Exception, queue is full if it is
+        - None
 
         Returns:
         - Boolean
 
         Complexity:
-        - Worst case and Best: O(1)
+        - Worst case: O(N) N is the length of the self.layer_store, when the deque grows its array
+        - Best case: O(1), and O(1) amortised
         """
-        try:
-            self.layers_store.append(layer)
-            return True
-        except:
+        if self.layers_store.is_full():
             return False
+        if self.grid_special.active:
+            self.layers_store.prepend(layer)
+        else:
+            self.layers_store.append(layer)
+        if not layer.pure:
+            self.animated_layers += 1
+        self.changed()
+        return True
 
     def get_color(self,  start: tuple, timestamp: float, x: int, y: int) -> tuple[int, int, int]:
         """
-        Returns the colour this square should show, given the current layers. 
-        iterates through the queue serves each layer and applies it then adds the layer back into the queue
+        Returns the colour this square should show, given the current layers.
+        compiles the queue into the shortest chain of layers giving the same colour the first time,
+        then only applies that chain until the store changes
         Args:
             - 2 ints, x and y
             - the start value of the color which is a tuple
@@ -218,25 +411,19 @@ class AdditiveLayerStore(LayerStore):
         - result: a tuple with the rgb values of the color
 
         Complexity:
-        - Worst case and Best: O(N) N is the length of the self.layer_store
+        - Worst case: O(N) N is the length of the self.layer_store, when the chain has to be compiled
+        - Best case: O(K) K is the length of the compiled chain, at most N
         """
-        if self.layers_store.is_empty():
-            return start
-
-        current_color = start
-
-        for _ in range(len(self.layers_store)):
-            current_layer = self.layers_store.serve()
-            current_color = current_layer.apply(current_color, timestamp, x, y) #O(1) as its maxed at 3
-            self.layers_store.append(current_layer)
-
-        return current_color
+        if self.chain is None or self.chain_flipped != self.grid_special.active:
+            self.chain = compile_chain(self.applied_layers())
+            self.chain_flipped = self.grid_special.active
+        return apply_chain(self.chain, start, timestamp, x, y)
 
     def erase(self, layer: Layer) -> bool:
         """
         Complete the erase action with this layer
         Returns true if the LayerStore was actually changed.
-        serves the first element in the queue 
+        serves the first layer added, from whichever end of the deque is currently the front
         Args:
             - layer object
 
@@ -251,15 +438,18 @@ class AdditiveLayerStore(LayerStore):
         """
         if self.layers_store.is_empty():
             return False
-        self.layers_store.serve()
+        served = self.layers_store.pop() if self.grid_special.active else self.layers_store.serve()
+        if not served.pure:
+            self.animated_layers -= 1
+        self.changed()
         return True
 
     def special(self) -> None:
         """
         Special mode. Different for each store implementation.
-        reverses the store of layers and is O(N)
+        reverses the store of layers, which only flips the direction of the deque
         Args:
-            - layer object
+            - None
 
         Raises:
         - None
@@ -267,15 +457,82 @@ class AdditiveLayerStore(LayerStore):
         Returns:
         - None
 
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        self.layers_store.reverse()
+        if len(self.layers_store) > 1: #reversing one or no layers changes nothing
+            self.changed()
+
+    def is_animated(self) -> bool:
+        """
+        True if the colour can change without the store changing.
+        Args:
+            - None
+
+        Raises:
+        - None
+
+        Returns:
+        - Boolean, if any layer in the queue is not pure
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        return self.animated_layers > 0
+
+    def applied_layers(self) -> tuple[Layer, ...]:
+        """
+        Returns the layers get_color applies, in the order they are applied.
+        iterates over the deque without changing it
+        Args:
+            - None
+
+        Raises:
+        - None
+
+        Returns:
+        - tuple of the layers, first added first
+
+        Complexity:
+        - Worst case and Best: O(N) N is the length of the self.layer_store
+        """
+        if self.grid_special.active:
+            return tuple(self.layers_store)[::-1]
+        return tuple(self.layers_store)
+
+    def state_key(self) -> tuple:
+        """
+        Returns a hashable value which is equal for two stores exactly when they apply the same layers.
+        Args:
+            - None
+
+        Raises:
+        - None
+
+        Returns:
+        - tuple of the indices of the layers, first added first
+
         Complexity:
         - Worst case and Best: O(N) N is the length of the self.layer_store
         """
-        self.reversed_queue = ArrayStack(len(self.layers_store))
-        for _ in range(len(self.layers_store)):  #O(N)
-            self.reversed_queue.push(self.layers_store.serve())
-        for _ in range(len(self.reversed_queue)):  #(N)
-            self.layers_store.append(self.reversed_queue.pop())
+        return tuple(layer.index for layer in self.applied_layers())
 
+    def is_empty(self) -> bool:
+        """
+        True if no layers are applied.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        return self.layers_store.is_empty()
+
+    def changed(self) -> None:
+        """
+        Throws away the compiled chain before reporting the change.
+        """
+        self.chain = None
+        LayerStore.changed(self)
 
 
 class SequenceLayerStore(LayerStore):
@@ -289,9 +546,21 @@ class SequenceLayerStore(LayerStore):
 
         create a bitset that checks if the layer at that index is applying or not, 1 if it is and 0 if its not
     """
-    #can use a bitset to represent if the layers are applying or not todo if i have time
+    # Shared by every store, as many squares have the same layers.
+    # applied_cache maps a mask to the layers it applies, and color_cache maps a mask and start colour
+    # to the colour after the pure layers at the start, along with the layers left to apply after them.
+    applied_cache = {}
+    color_cache = {}
+    COLOR_CACHE_LIMIT = 4096
+    # Layer names never change, so the registered layers are only sorted by name once (see name_order),
+    # and special_cache maps a mask to the mask left after special.
+    name_order = ()
+    name_ranks = ()
+    special_cache = {}
+
     def __init__(self) -> None:
         #O(1)
+        LayerStore.__init__(self)
         self.layers_store = BSet(len(LAYERS))
 
     def add(self, layer: Layer) -> bool:
@@ -312,53 +581,59 @@ class SequenceLayerStore(LayerStore):
         - Worst case: O(1) 
         - Best case: O(1) 
         """
-        self.temp_layer_store = self.layers_store
-        self.layers_store.add(layer.index+1)
-        if self.layers_store.intersection(self.temp_layer_store):
+        if layer.index+1 in self.layers_store: #already applied, nothing changes
             return False
-        else:
-            return True
+        self.layers_store.add(layer.index+1)
+        self.changed()
+        return True
                 
 
     def get_color(self, start :tuple , timestamp: float, x:int, y: int)  -> tuple[int, int, int]:
         """
         Returns the colour this square should show, given the current layers.
+        the pure layers at the start of the mask only depend on the start colour, so their result is shared
+        by every store with the same mask through color_cache, along with the layers still left to apply
         Args:
             - 2 ints, x and y
             - the start value of the color which is a tuple
             - the timestamp as a float
 
         Raises:
-            - type Error: if any of the inputs are not correct type or if layer[i] is not int or input into contains is not int
+            - type Error: if any of the inputs are not correct type
 
         Returns:
             - result: a tuple with the rgb values of the color
 
         Complexity:
-            - Worst case and Best: O(N)
+            - Worst case: O(M), M is the number of applied layers, when the mask and start colour aren't cached
+            - Best case: O(1) when every applied layer is pure and the result is cached
         """
         if self.layers_store.is_empty():
             return start
 
-        current_color = start
-
-        for i in range(len(LAYERS)):
-            try:
-                if type(LAYERS[i].index) == int:
-                    if self.layers_store.__contains__(LAYERS[i].index+1):
-                        current_layer = LAYERS[i]
-                        current_color = current_layer.apply(current_color, timestamp, x, y)
-            except:
-                break
-
+        key = (self.layers_store.elems, tuple(start))
+        cached = SequenceLayerStore.color_cache.get(key)
+        if cached is None:
+            applied = self.applied_layers()
+            pure_color = start
+            first_animated = 0
+            while first_animated < len(applied) and applied[first_animated].pure:
+                pure_color = applied[first_animated].apply(pure_color, timestamp, x, y)
+                first_animated += 1
+            if len(SequenceLayerStore.color_cache) >= self.COLOR_CACHE_LIMIT:
+                SequenceLayerStore.color_cache.clear()
+            cached = SequenceLayerStore.color_cache[key] = (pure_color, applied[first_animated:])
+
+        current_color, animated = cached
+        for current_layer in animated:
+            current_color = current_layer.apply(current_color, timestamp, x, y)
         return current_color
 
     def erase(self, layer: Layer) -> bool:
         """
         Complete the erase action with this layer
         Returns true if the LayerStore was actually changed.
-        creates a temp layer store that is the origninal unchanged layer store then
-        removes layer from layer store and checks against temp layer store to see if it was changed
+        only removes the layer from the layer store if it is currently applied
         Args:
             - 1 layer
 
@@ -371,19 +646,16 @@ class SequenceLayerStore(LayerStore):
             - Worst case and Best: O(1)
         
         """
-        if self.layers_store.is_empty():
+        if layer.index+1 not in self.layers_store:
             return False
-        self.temp_layer_store = self.layers_store
         self.layers_store.remove(layer.index+1)
-        if self.layers_store.intersection(self.temp_layer_store):
-            return False
-        else:
-            return True
+        self.changed()
+        return True
 
     def special(self):
         """
         Special mode. Different for each store implementation.
-        removes the alphabetically middle layer
+        removes the alphabetically middle layer, found from the mask with special_mask
         Args:
         - None
 
@@ -394,17 +666,165 @@ class SequenceLayerStore(LayerStore):
         - None
 
         Complexity:
-        - Worst case and Best: O(N log (N))
-        """
-        self.alphabetical_layers_store = ArraySortedList(len(LAYERS))
-        for i in range(len(LAYERS)): #O(N)
-            try:
-                if self.layers_store.__contains__(LAYERS[i].index+1):
-                    current_layer = ListItem(LAYERS[i], LAYERS[i].name)
-                    self.alphabetical_layers_store.add(current_layer) #O(log N)
-            except:
-                break
-        if self.alphabetical_layers_store.is_empty():
+        - Worst case: O(M), M is the number of applied layers, when the mask isn't cached
+        - Best case: O(1)
+        """
+        if self.layers_store.is_empty():
             return
-        middle_layer = self.alphabetical_layers_store[(len(self.alphabetical_layers_store)-1)//2].value
-        self.layers_store.remove(middle_layer.index+1) #O(1)
+        self.layers_store.elems = SequenceLayerStore.special_mask(self.layers_store.elems)
+        self.changed()
+
+    @staticmethod
+    def special_all(stores) -> None:
+        """
+        Applies special to every store given, as Grid.special does for a whole sequence grid.
+        Squares with the same mask always end up with the same mask, so it is only worked out once per mask.
+        Args:
+        - stores: iterable of SequenceLayerStores
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(N + D*M), N is the number of stores and D the number of distinct masks
+        - Best case: O(N) when every mask is cached
+        """
+        special_mask = SequenceLayerStore.special_mask
+        for store in stores:
+            mask = store.layers_store.elems
+            if mask:
+                store.layers_store.elems = special_mask(mask)
+                store.changed()
+
+    @staticmethod
+    def special_mask(mask: int) -> int:
+        """
+        Returns the mask left after removing the layer with the median name from mask.
+        With an even number of layers the lexicographically smaller of the two middle names is removed.
+        The layers are moved into a set of name ranks, where the median is select((count-1)//2).
+        Args:
+        - mask: the non empty bits of a layer set, bit i for the layer with index i
+
+        Raises:
+        - None
+
+        Returns:
+        - the new mask
+
+        Complexity:
+        - Worst case: O(M), M is the number of applied layers, when the mask isn't cached
+        - Best case: O(1)
+        """
+        SequenceLayerStore.rank_names()
+        result = SequenceLayerStore.special_cache.get(mask)
+        if result is None:
+            layer_set = BSet()
+            layer_set.elems = mask
+            by_name = BSet()
+            for item in layer_set:
+                by_name.add(SequenceLayerStore.name_ranks[item-1] + 1)
+            median = SequenceLayerStore.name_order[by_name.select((len(by_name) - 1) // 2) - 1]
+            layer_set.remove(median.index+1)
+            result = SequenceLayerStore.special_cache[mask] = layer_set.elems
+        return result
+
+    @staticmethod
+    def rank_names() -> None:
+        """
+        Sorts the registered layers by name into name_order, with name_ranks[i] the position of the layer
+        with index i in it. Only done again if more layers have been registered since.
+        Args:
+        - None
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(N log N), N is the number of registered layers, when they have changed
+        - Best case: O(1)
+        """
+        if len(SequenceLayerStore.name_order) == layer_util.cur_layer_index:
+            return
+        registered = [LAYERS[i] for i in range(layer_util.cur_layer_index)]
+        SequenceLayerStore.name_order = tuple(sorted(registered, key=lambda layer: layer.name))
+        ranks = [0] * len(registered)
+        for rank, layer in enumerate(SequenceLayerStore.name_order):
+            ranks[layer.index] = rank
+        SequenceLayerStore.name_ranks = tuple(ranks)
+        SequenceLayerStore.special_cache.clear()
+
+    def is_animated(self) -> bool:
+        """
+        True if the colour can change without the store changing.
+        Args:
+        - None
+
+        Raises:
+        - None
+
+        Returns:
+        - Boolean, if any applied layer is not pure
+
+        Complexity:
+        - Worst case and Best: O(M), M is the number of applied layers
+        """
+        for layer in self.applied_layers():
+            if not layer.pure:
+                return True
+        return False
+
+    def applied_layers(self) -> tuple[Layer, ...]:
+        """
+        Returns the layers get_color applies, in the order they are applied.
+        only visits the set bits of the mask, lowest index first, and the result is shared
+        by every store with the same mask through applied_cache
+        Args:
+        - None
+
+        Raises:
+        - None
+
+        Returns:
+        - tuple of the applied layers, in order of index
+
+        Complexity:
+        - Worst case: O(M), M is the number of applied layers, when the mask isn't cached
+        - Best case: O(1)
+        """
+        mask = self.layers_store.elems
+        applied = SequenceLayerStore.applied_cache.get(mask)
+        if applied is None:
+            applied = SequenceLayerStore.applied_cache[mask] = tuple(LAYERS[item-1] for item in self.layers_store)
+        return applied
+
+    def state_key(self) -> int:
+        """
+        Returns a hashable value which is equal for two stores exactly when they apply the same layers.
+        Args:
+        - None
+
+        Raises:
+        - None
+
+        Returns:
+        - the bits of the layer set
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        return self.layers_store.elems
+
+    def is_empty(self) -> bool:
+        """
+        True if no layers are applied.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        return self.layers_store.is_empty()
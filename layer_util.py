@@ -6,6 +6,7 @@ No need to edit unless adding new features.
 
 from __future__ import annotations
 from dataclasses import dataclass, field
+import numpy as np
 from data_structures.referential_array import ArrayR
 
 LAYERS: ArrayR[Layer] = ArrayR(20)
@@ -18,12 +19,42 @@ class Layer:
     apply: function
     name: str = field(init=False)
     bg: tuple[int, int, int] | None = None
+    pure: bool = False
+    batch: function | None = None
+    overwrites: bool = False
+    channel_map: tuple[int, int, int, int] | None = None
 
     def __post_init__(self):
         if hasattr(self.apply, "__bg__"):
             self.bg = self.apply.__bg__
+        if hasattr(self.apply, "__pure__"):
+            self.pure = self.apply.__pure__
+        if hasattr(self.apply, "__batch__"):
+            self.batch = self.apply.__batch__
+        if hasattr(self.apply, "__overwrites__"):
+            self.overwrites = self.apply.__overwrites__
+        if hasattr(self.apply, "__channel_map__"):
+            self.channel_map = self.apply.__channel_map__
         self.name = self.apply.__name__
 
+    def apply_batch(self, colors: np.ndarray, timestamp: float, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Applies the layer to many squares at once.
+        colors is an (n, 3) integer array, and square i is at (xs[i], ys[i]).
+        Returns a new (n, 3) array, with row i equal to apply(colors[i], timestamp, xs[i], ys[i]).
+
+        Uses the batch form of the layer if it has one, otherwise calls apply on every square.
+        Batch forms get the colours as int64, as they can go past 0 or 255 before clamping,
+        which would wrap around in a narrow dtype such as the uint8 of the framebuffer.
+        The result has the dtype of colors.
+        """
+        if self.batch is not None:
+            return self.batch(colors.astype(np.int64, copy=False), timestamp, xs, ys).astype(colors.dtype, copy=False)
+        result = np.empty_like(colors)
+        for i, (color, x, y) in enumerate(zip(colors.tolist(), xs.tolist(), ys.tolist())):
+            result[i] = self.apply(tuple(color), timestamp, x, y)
+        return result
+
 class background(object):
     """Simple decorator to add a __bg__ property to a layer
 
@@ -43,6 +74,84 @@ class background(object):
         func.__bg__ = self.val
         return layer
 
+class batch(object):
+    """Decorator to give a layer a batch form, which applies it to many squares at once.
+    The batch form takes (colors, timestamp, xs, ys), where colors is an (n, 3) integer
+    array and square i is at (xs[i], ys[i]), and returns a new (n, 3) array.
+    It must give the same colours as the layer itself, which stays the source of truth.
+
+    Usage:  @register
+            @batch(my_special_layer_batch)
+            def my_special_layer(...):
+    """
+    def __init__(self, kernel):
+        self.kernel = kernel
+
+    def __call__(self, layer: function|Layer):
+        # This could be applied before or after registration
+        if isinstance(layer, Layer):
+            layer.batch = self.kernel
+            func = layer.apply
+        else:
+            func = layer
+        func.__batch__ = self.kernel
+        return layer
+
+def pure(layer: function|Layer):
+    """Decorator to mark a layer as only depending on the colour given to it,
+    and not on the timestamp or position. Squares with only pure layers keep
+    the same colour until they are changed.
+
+    Usage:  @register
+            @pure
+            def my_special_layer(...):
+    """
+    if isinstance(layer, Layer):
+        layer.pure = True
+        func = layer.apply
+    else:
+        func = layer
+    func.__pure__ = True
+    return layer
+
+def overwrites(layer: function|Layer):
+    """Decorator to mark a layer as ignoring the colour given to it,
+    so any layers applied before it make no difference.
+
+    Usage:  @register
+            @overwrites
+            def my_special_layer(...):
+    """
+    if isinstance(layer, Layer):
+        layer.overwrites = True
+        func = layer.apply
+    else:
+        func = layer
+    func.__overwrites__ = True
+    return layer
+
+class channel_map(object):
+    """Decorator to describe a layer which changes every channel c of the colour
+    to min(high, max(low, scale*c + offset)), where scale is 1 or -1.
+    Lets layer_chain fold runs of these layers into one.
+
+    Usage:  @register
+            @channel_map(1, 40)
+            def my_special_layer(...):
+    """
+    def __init__(self, scale, offset, low=0, high=255):
+        self.val = (scale, offset, low, high)
+
+    def __call__(self, layer: function|Layer):
+        # This could be applied before or after registration
+        if isinstance(layer, Layer):
+            layer.channel_map = self.val
+            func = layer.apply
+        else:
+            func = layer
+        func.__channel_map__ = self.val
+        return layer
+
 def register(func):
     """
     Layer register function.
@@ -52,8 +161,13 @@ def register(func):
 
     In order to actually confirm this registration,
     you'll need to import the file containing the layer definition
+
+    LAYERS doubles in length whenever it is full, so any number of layers can be registered.
     """
     global cur_layer_index
+    if cur_layer_index == len(LAYERS):
+        # LAYERS is imported directly by other modules, so it grows in place rather than being replaced.
+        LAYERS.resize(2 * len(LAYERS))
     LAYERS[cur_layer_index] = Layer(cur_layer_index, func)
     cur_layer_index += 1
     return LAYERS[cur_layer_index-1]
@@ -1,33 +1,117 @@
 """
 All layers are defined here.
+
+Each layer can also have a batch form (see layer_util.batch), working on NumPy arrays
+of many squares at once. These are defined just above the layer they belong to,
+and must give exactly the same colours as it.
 """
 
 import colorsys
-from layer_util import background, register
+import numpy as np
+from layer_util import background, batch, channel_map, overwrites, pure, register
+
+# The same constants colorsys uses, so the batch form of rainbow rounds identically.
+ONE_THIRD = 1.0/3.0
+ONE_SIXTH = 1.0/6.0
+TWO_THIRD = 2.0/3.0
+
+def _hls_channel(m1, m2, hue):
+    """colorsys._v for an array of hues."""
+    hue = hue % 1.0
+    return np.where(
+        hue < ONE_SIXTH, m1 + (m2-m1)*hue*6.0, np.where(
+        hue < 0.5, m2, np.where(
+        hue < TWO_THIRD, m1 + (m2-m1)*(TWO_THIRD-hue)*6.0,
+        m1))
+    )
+
+def _hls_to_rgb(h, l, s):
+    """colorsys.hls_to_rgb for an array of hues, with a constant lightness and saturation."""
+    if l <= 0.5:
+        m2 = l * (1.0+s)
+    else:
+        m2 = l+s-(l*s)
+    m1 = 2.0*l - m2
+    return np.stack([_hls_channel(m1, m2, h+ONE_THIRD), _hls_channel(m1, m2, h), _hls_channel(m1, m2, h-ONE_THIRD)], axis=1)
+
+# Rainbow's hue only changes along the diagonals x+y, so a frame only has O(width+height)
+# distinct hues. The colour of each hue seen this frame is kept until the timestamp changes.
+# The hue itself is the key rather than x+y, as the rounding of timestamp/20 + x/20 + y/20
+# can differ slightly between squares on the same diagonal.
+_rainbow_timestamp = None
+_rainbow_colors = {}
+
+def _rainbow_hue(timestamp, x, y):
+    return (timestamp/20 + x/20 + y/20)%1
+
+def _rainbow_batch(colors, timestamp, xs, ys):
+    hues = _rainbow_hue(timestamp, xs, ys)
+    # Convert one hue per diagonal, then only the distinct hues of squares which rounded differently.
+    diagonals = xs + ys
+    diagonal_hues = np.zeros(diagonals.max() + 1 if len(diagonals) else 0)
+    diagonal_hues[diagonals] = hues
+    result = (255*_hls_to_rgb(diagonal_hues, 0.6, 0.6)).astype(np.int64)[diagonals]
+    rounded = np.flatnonzero(hues != diagonal_hues[diagonals])
+    rounded_hues, inverse = np.unique(hues[rounded], return_inverse=True)
+    result[rounded] = (255*_hls_to_rgb(rounded_hues, 0.6, 0.6)).astype(np.int64)[inverse.ravel()]
+    return result
 
 @register
 @background(200, 0, 120)
+@overwrites
+@batch(_rainbow_batch)
 def rainbow(color, timestamp, x, y):
-    return tuple(
-        int(255*x)
-        for x in colorsys.hls_to_rgb((timestamp/20 + x/20 + y/20)%1, 0.6, 0.6)
-    )
+    global _rainbow_timestamp
+    if timestamp != _rainbow_timestamp:
+        _rainbow_timestamp = timestamp
+        _rainbow_colors.clear()
+    hue = _rainbow_hue(timestamp, x, y)
+    result = _rainbow_colors.get(hue)
+    if result is None:
+        result = _rainbow_colors[hue] = tuple(
+            int(255*x)
+            for x in colorsys.hls_to_rgb(hue, 0.6, 0.6)
+        )
+    return result
+
+def _constant_batch(color):
+    """Batch form of a layer which always gives the same colour."""
+    def constant(colors, timestamp, xs, ys):
+        result = np.empty_like(colors)
+        result[:] = color
+        return result
+    return constant
 
 @register
 @background(170, 170, 170)
+@pure
+@overwrites
+@batch(_constant_batch((0, 0, 0)))
 def black(color, timestamp, x, y):
     return (0, 0, 0)
 
+def _lighten_batch(colors, timestamp, xs, ys):
+    return np.minimum(255, colors + 40)
+
 @register
 @background(240, 240, 240)
+@pure
+@channel_map(1, 40)
+@batch(_lighten_batch)
 def lighten(color, timestamp, x, y):
     return tuple(
         min(255, x + 40)
         for x in color
     )
 
+def _invert_batch(colors, timestamp, xs, ys):
+    return 255 - colors
+
 @register
 @background(0, 255, 255)
+@pure
+@channel_map(-1, 255)
+@batch(_invert_batch)
 def invert(color, timestamp, x, y):
     return tuple(
         255 - c
@@ -36,37 +120,86 @@ def invert(color, timestamp, x, y):
 
 @register
 @background(255, 0, 0)
+@pure
+@overwrites
+@batch(_constant_batch((255, 0, 0)))
 def red(color, timestamp, x, y):
     return (255, 0, 0)
 
 @register
 @background(0, 255, 0)
+@pure
+@overwrites
+@batch(_constant_batch((0, 255, 0)))
 def green(color, timestamp, x, y):
     return (0, 255, 0)
 
 @register
 @background(0, 0, 255)
+@pure
+@overwrites
+@batch(_constant_batch((0, 0, 255)))
 def blue(color, timestamp, x, y):
     return (0, 0, 255)
 
+LCG_MULTIPLIER = 1103515245
+LCG_INCREMENT = 12345
+LCG_MODULUS = 1 << 31
+
+def lcg_jump(steps):
+    """
+    Returns (a, c) such that stepping other = (LCG_MULTIPLIER * other + LCG_INCREMENT) % LCG_MODULUS
+    steps times is the same as other = (a * other + c) % LCG_MODULUS.
+    Squares the one step map, so it is O(log steps).
+    """
+    a, c = 1, 0
+    step_a, step_c = LCG_MULTIPLIER, LCG_INCREMENT
+    while steps:
+        if steps & 1:
+            a, c = step_a * a % LCG_MODULUS, (step_a * c + step_c) % LCG_MODULUS
+        step_a, step_c = step_a * step_a % LCG_MODULUS, (step_a * step_c + step_c) % LCG_MODULUS
+        steps >>= 1
+    return a, c
+
+# Sparkle always steps between 10 and 26 times, so all the jumps it needs are precomputed.
+SPARKLE_MAX_STEPS = 10 + 16
+SPARKLE_JUMPS = [lcg_jump(steps) for steps in range(SPARKLE_MAX_STEPS + 1)]
+_SPARKLE_JUMP_A = np.array([a for a, c in SPARKLE_JUMPS], dtype=np.uint64)
+_SPARKLE_JUMP_C = np.array([c for a, c in SPARKLE_JUMPS], dtype=np.uint64)
+
+def _sparkle_batch(colors, timestamp, xs, ys):
+    ts = np.trunc((timestamp + xs/3 + ys/5) * 3).astype(np.int64)
+    steps = 10 + (ts * 31 % 17)
+    a, c = _SPARKLE_JUMP_A[steps], _SPARKLE_JUMP_C[steps]
+    # uint64 arithmetic wraps modulo 2**64, which is a multiple of 2**31, so the result is unchanged.
+    modulus = np.uint64(LCG_MODULUS)
+    other = (a * xs.astype(np.uint64) + c) % modulus
+    other = (a * (other + ys.astype(np.uint64)) + c) % modulus
+    other = other >> np.uint64(16)
+    lit = (other/(1 << 15) < 0.1)[:, None]
+    return np.where(lit, _lighten_batch(colors, timestamp, xs, ys), _darken_batch(colors, timestamp, xs, ys))
+
 @register
 @background(100, 170, 255)
+@batch(_sparkle_batch)
 def sparkle(color, timestamp, x, y):
     ts = int((timestamp + x/3 + y/5) * 3)
-    other = x
-    for _ in range(10 + (ts * 31 % 17)):
-        other = (1103515245 * other + 12345) % (1 << 31)
-    other += y
-    for _ in range(10 + (ts * 31 % 17)):
-        other = (1103515245 * other + 12345) % (1 << 31)
-    ts = int((timestamp + x/10 + y/20) * 3)
-    other = (other & ((1 << 31)-1)) >> 16
+    a, c = SPARKLE_JUMPS[10 + (ts * 31 % 17)]
+    other = (a * x + c) % LCG_MODULUS
+    other = (a * (other + y) + c) % LCG_MODULUS
+    other = other >> 16
     if other/(1 << 15) < 0.1:
         return lighten.apply(color, timestamp, x, y)
     return darken.apply(color, timestamp, x, y)
 
+def _darken_batch(colors, timestamp, xs, ys):
+    return np.maximum(0, colors - 40)
+
 @register
 @background(30, 30, 30)
+@pure
+@channel_map(1, -40)
+@batch(_darken_batch)
 def darken(color, timestamp, x, y):
     return tuple(
         max(0, x - 40)
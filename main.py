@@ -1,12 +1,13 @@
 import arcade
 import arcade.key as keys
-import math
 from grid import Grid
+from stencil import line
 from layer_util import get_layers, Layer
 from layers import lighten
 from undo import UndoTracker
 from action import PaintAction, PaintStep
 from replay import ReplayTracker
+from grid_mesh import GridMesh
 
 
 class MyWindow(arcade.Window):
@@ -19,6 +20,7 @@ class MyWindow(arcade.Window):
     SCREEN_TITLE = "Paint"
 
     REPLAY_TIMER_DELTA = 0.05
+    SPECIAL_BUDGET = 0.008 # seconds of each frame a special can take, see Grid.step_special
 
     GRID_SIZE_X = 32
     GRID_SIZE_Y = 32
@@ -50,7 +52,6 @@ class MyWindow(arcade.Window):
 
         self.selected_layer_index = -1
         self.dragging = None
-        self.prev_drawn = None
         self.prev_pos = None
         self.draw_size = 2
 
@@ -59,6 +60,8 @@ class MyWindow(arcade.Window):
         self.GRID_SQ_WIDTH = self.DRAW_PANEL / self.GRID_SIZE_X
         self.GRID_SQ_HEIGHT = self.SCREEN_HEIGHT / self.GRID_SIZE_Y
         self.LAYER_BUTTON_SIZE = self.SIDEBAR_WIDTH / 2
+        self.grid_mesh = GridMesh(self.GRID_SIZE_X, self.GRID_SIZE_Y,
+                                  self.GRID_SQ_WIDTH, self.GRID_SQ_HEIGHT)
         # Action button sprites
         self.action_buttons = arcade.SpriteList()
         self.draw_mode_button = arcade.Sprite(
@@ -140,16 +143,8 @@ class MyWindow(arcade.Window):
         # UI - Draw Modes / Action buttons
         self.action_buttons.draw()
         # Grid
-        for x in range(self.GRID_SIZE_X):
-            for y in range(self.GRID_SIZE_Y):
-                arcade.draw_lrtb_rectangle_filled(
-                    self.GRID_SQ_WIDTH * x,
-                    self.GRID_SQ_WIDTH * (x + 1),
-                    self.GRID_SQ_HEIGHT * (y + 1),
-                    self.GRID_SQ_HEIGHT * y,
-                    self.grid[x][y].get_color(self.BG[:], self.timestamp, x,
-                                              y),
-                )
+        self.grid_mesh.update(self.grid.colors(self.BG, self.timestamp))
+        self.grid_mesh.draw()
 
     def on_mouse_press(self, x: int, y: int, button: int,
                        modifiers: int) -> None:
@@ -200,6 +195,13 @@ class MyWindow(arcade.Window):
             yend = 2 * self.LAYER_BUTTON_SIZE
             if xstart <= x < xend and yend <= y < ystart:
                 self.on_special()
+        elif modifiers & keys.MOD_SHIFT:
+            # Shift click fills the region under the mouse instead of drawing.
+            if 0 <= self.selected_layer_index < len(get_layers()):
+                px = int(x // self.GRID_SQ_WIDTH)
+                py = int(y // self.GRID_SQ_HEIGHT)
+                if 0 <= px < self.GRID_SIZE_X and 0 <= py < self.GRID_SIZE_Y:
+                    self.on_fill(get_layers()[self.selected_layer_index], px, py)
         else:
             self.dragging = True
             self.try_draw(x, y)
@@ -207,7 +209,6 @@ class MyWindow(arcade.Window):
     def on_mouse_release(self, x: int, y: int, button: int, modifiers: int):
         """Called when the mouse buttons are released."""
         self.dragging = False
-        self.prev_drawn = None
         self.prev_pos = None
 
     def on_mouse_motion(self, x, y, dx, dy) -> None:
@@ -239,31 +240,24 @@ class MyWindow(arcade.Window):
         self.y_pressed = False
 
     def try_draw(self, x, y) -> None:
-        """Attempt to draw at a position, but safely fail if an invalid square."""
+        """
+        Attempt to draw at a position, but safely fail if an invalid square.
+        While dragging, the brush is stroked along the squares between the last position and this one, see stencil.line.
+        """
         if self.selected_layer_index == -1:
             return
         layer = get_layers()[self.selected_layer_index]
-        if self.prev_pos is not None:
-            # Try draw in increments of 0.5 to avoid skipping squares.
-            mhat_dist = abs(x - self.prev_pos[0]) + abs(y - self.prev_pos[1])
-            increment = 0.5
-            points_to_draw = []
-            for d in range(1, math.ceil(mhat_dist / increment) + 1):
-                distance = min(d * increment / mhat_dist, 1)
-                nx = distance * (x - self.prev_pos[0]) + self.prev_pos[0]
-                ny = distance * (y - self.prev_pos[1]) + self.prev_pos[1]
-                nx_pos = int(nx // self.GRID_SQ_WIDTH)
-                ny_pos = int(ny // self.GRID_SQ_HEIGHT)
-                points_to_draw.append((nx_pos, ny_pos))
+        px = int(x // self.GRID_SQ_WIDTH)
+        py = int(y // self.GRID_SQ_HEIGHT)
+        if self.prev_pos is None:
+            if 0 <= px < self.GRID_SIZE_X and 0 <= py < self.GRID_SIZE_Y:
+                self.on_paint(layer, px, py)
         else:
-            x_pos = int(x // self.GRID_SQ_WIDTH)
-            y_pos = int(y // self.GRID_SQ_HEIGHT)
-            points_to_draw = [(x_pos, y_pos)]
-        for px, py in points_to_draw:
-            if self.prev_drawn is None or (px, py) != self.prev_drawn:
-                if 0 <= px < self.GRID_SIZE_X and 0 <= py < self.GRID_SIZE_Y:
-                    self.on_paint(layer, px, py)
-                    self.prev_drawn = (px, py)
+            # The square the last position was on has been painted already.
+            points = line(int(self.prev_pos[0] // self.GRID_SQ_WIDTH), int(self.prev_pos[1] // self.GRID_SQ_HEIGHT), px, py)[1:]
+            points = [(qx, qy) for qx, qy in points if 0 <= qx < self.GRID_SIZE_X and 0 <= qy < self.GRID_SIZE_Y]
+            if points:
+                self.on_stroke(layer, points)
         self.prev_pos = (x, y)
 
     def start_replay(self) -> None:
@@ -276,6 +270,7 @@ class MyWindow(arcade.Window):
     def on_update(self, delta_time) -> None:
         """Movement and game logic."""
         self.timestamp += delta_time
+        self.grid.step_special(self.SPECIAL_BUDGET)
         if self.z_pressed:
             self.z_timer -= delta_time
             if self.z_timer <= 0:
@@ -356,7 +351,7 @@ class MyWindow(arcade.Window):
 
 
         Raises:
-        - Index error if index is not in grid but catches this error and ignores
+        - ValueError: if the grid's brush shape isn't registered, see stencil
         - Type error if any of the types are wrong
         - Exception if undo or replay tracker is full
 
@@ -364,20 +359,62 @@ class MyWindow(arcade.Window):
         - None
 
         Complexity:
-        - Worst case and Best: O(N^2) ignoring complexity of add as it is different depending on the layer
+        - Worst case and Best: O(S + C), S is the number of columns of the brush and C the number of squares painted,
+          ignoring complexity of add as it is different depending on the layer
+        """
+        self.brush_size = self.grid.brush_size
+        # The brush is clipped to the grid, see Grid.paint and stencil.
+        steps = PaintAction([PaintStep(position, layer) for position in self.grid.paint(layer, px, py)])
+        self.undo_track.add_action(steps)
+        self.replay_tracker.add_action(steps)
+
+    def on_stroke(self, layer: Layer, points: list[tuple[int, int]]) -> None:
+        """
+        Called when the mouse is dragged over grid squares, which should paint in the vicinity of each of them.
+        All of it is one action, and each square is painted once however many of the points it is near.
+
+        Args:
+        - layer: The layer being applied.
+        - points: the positions of the brush, in the order they were dragged over
+
+        Raises:
+        - ValueError: if the grid's brush shape isn't registered, see stencil
+        - Exception if undo or replay tracker is full
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(P*S*log(P*S) + C), P is the number of points, S the number of columns of the brush
+          and C the number of squares painted, ignoring complexity of add as it is different depending on the layer
         """
         self.brush_size = self.grid.brush_size
-        steps = PaintAction()
-        for i in range(-self.brush_size, self.brush_size + 1):  #O(N)
-            for j in range(-self.brush_size, self.brush_size + 1):  #O(N)
-                if abs(px - (px + i)) + abs(py - (py + j)) <= self.brush_size:
-                    try:
-                        x = abs(px + i)
-                        y = abs(py + j)
-                        self.grid[x][y].add(layer)  #O(1) or O(M)
-                        steps.add_step(PaintStep((x, y), layer))
-                    except IndexError:
-                        pass
+        steps = PaintAction([PaintStep(position, layer) for position in self.grid.stroke(layer, points)])
+        self.undo_track.add_action(steps)
+        self.replay_tracker.add_action(steps)
+
+    def on_fill(self, layer: Layer, px: int, py: int) -> None:
+        """
+        Called when a grid square is shift clicked on, which should fill the region around it with the layer:
+        the squares reachable from it through squares which look the same as it, see Grid.fill_region.
+        All of it is one action.
+
+        Args:
+        - layer: The layer being applied.
+        - px, py: the position clicked on
+
+        Raises:
+        - IndexError: if (px, py) is outside the grid
+        - Exception if undo or replay tracker is full
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case and Best: O(C), C is the number of squares filled,
+          ignoring complexity of add as it is different depending on the layer
+        """
+        steps = PaintAction([PaintStep(position, layer) for position in self.grid.fill(layer, px, py)])
         self.undo_track.add_action(steps)
         self.replay_tracker.add_action(steps)
 
@@ -435,10 +472,12 @@ class MyWindow(arcade.Window):
         Returns:
         - None.
 
+        Returns straight away, a sequence special is done over the next frames, see Grid.start_special.
+
         Complexity:
         - Worst case and Best: O(N^2) but dependent on which special is called, refer to main file
         """
-        self.grid.special()
+        self.grid.start_special()
 
     def on_replay_start(self) -> None:
         """Called when the replay starting is requested.
@@ -0,0 +1,143 @@
+"""
+Indexes of the squares of a grid, kept up to date as squares change: which squares aren't empty,
+so work that only matters for painted squares can skip the rest of the grid,
+and which squares each layer is painted on.
+"""
+
+from __future__ import annotations
+from collections import Counter
+from typing import Iterator
+
+
+class Occupancy:
+    """
+    Attributes:
+        cells (set): positions (x, y) of the squares which aren't empty
+        columns (Counter): number of those squares with each x, only for x with at least one
+        rows (Counter): number of those squares with each y, only for y with at least one
+    """
+
+    def __init__(self) -> None:
+        self.cells = set()
+        self.columns = Counter()
+        self.rows = Counter()
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __contains__(self, position: tuple[int, int]) -> bool:
+        return position in self.cells
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        return iter(self.cells)
+
+    def update(self, x: int, y: int, empty: bool) -> None:
+        """
+        Records whether the square at (x, y) is empty now.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        position = (x, y)
+        if empty:
+            if position in self.cells:
+                self.cells.remove(position)
+                self.__decrement(self.columns, x)
+                self.__decrement(self.rows, y)
+        elif position not in self.cells:
+            self.cells.add(position)
+            self.columns[x] += 1
+            self.rows[y] += 1
+
+    def update_many(self, positions: list[tuple[int, int]], empty: list[bool]) -> None:
+        """
+        Records whether each square is empty now, empty[i] for the square at positions[i].
+
+        Complexity:
+        - Worst case and Best: O(C), C is the number of positions
+        """
+        for (x, y), is_empty in zip(positions, empty):
+            self.update(x, y, is_empty)
+
+    def bounds(self) -> tuple[int, int, int, int] | None:
+        """
+        Returns the smallest region (x0, y0, x1, y1) holding every square which isn't empty,
+        x1 and y1 not included as in Grid.region, or None if every square is empty.
+
+        Complexity:
+        - Worst case and Best: O(R + C), the number of rows and columns with a square which isn't empty
+        """
+        if not self.cells:
+            return None
+        return min(self.columns), min(self.rows), max(self.columns) + 1, max(self.rows) + 1
+
+    def shift(self, dx: int, dy: int) -> None:
+        """
+        Moves every square by (dx, dy), for when squares are added before the others.
+
+        Complexity:
+        - Worst case and Best: O(P), P is the number of squares which aren't empty
+        """
+        self.cells = {(x + dx, y + dy) for x, y in self.cells}
+        self.columns = Counter({x + dx: count for x, count in self.columns.items()})
+        self.rows = Counter({y + dy: count for y, count in self.rows.items()})
+
+    @staticmethod
+    def __decrement(counts: Counter, key: int) -> None:
+        counts[key] -= 1
+        if not counts[key]:
+            del counts[key]
+
+
+class LayerIndex:
+    """
+    Attributes:
+        cells (dict): position (x, y) to the frozenset of indices of the layers painted on it, only for squares with some
+        layers (dict): layer index to the set of positions of the squares it is painted on, only for layers on some square
+    """
+
+    def __init__(self) -> None:
+        self.cells = {}
+        self.layers = {}
+
+    def update(self, x: int, y: int, indices: frozenset) -> None:
+        """
+        Records the indices of the layers painted on the square at (x, y) now.
+
+        Complexity:
+        - Worst case and Best: O(M), M is the number of layers on the square before and after
+        """
+        position = (x, y)
+        before = self.cells.get(position, frozenset())
+        if before == indices:
+            return
+        for index in before - indices:
+            squares = self.layers[index]
+            squares.remove(position)
+            if not squares:
+                del self.layers[index]
+        for index in indices - before:
+            self.layers.setdefault(index, set()).add(position)
+        if indices:
+            self.cells[position] = indices
+        else:
+            del self.cells[position]
+
+    def positions(self, index: int) -> list[tuple[int, int]]:
+        """
+        Returns the positions of the squares the layer with the index is painted on, in order of x then y.
+
+        Complexity:
+        - Worst case and Best: O(K*log(K)), K is the number of those squares
+        """
+        return sorted(self.layers.get(index, ()))
+
+    def shift(self, dx: int, dy: int) -> None:
+        """
+        Moves every square by (dx, dy), see Occupancy.shift.
+
+        Complexity:
+        - Worst case and Best: O(P*M), P is the number of squares with layers
+        """
+        self.cells = {(x + dx, y + dy): indices for (x, y), indices in self.cells.items()}
+        self.layers = {index: {(x + dx, y + dy) for x, y in squares} for index, squares in self.layers.items()}
@@ -0,0 +1,101 @@
+"""
+Headless rendering of a Grid into a NumPy array of colours.
+
+Doesn't need arcade or a display, so it can be used for serving, testing and exporting canvases.
+Squares are grouped by the state of their layer store, the layers of each state are only looked
+up once, and each group of squares is filled in bulk.
+"""
+
+from __future__ import annotations
+import numpy as np
+
+DEFAULT_START = (255, 255, 255)
+
+
+def render(grid, timestamp: float, start: tuple = DEFAULT_START) -> np.ndarray:
+    """
+    Renders every square of the grid.
+
+    Args:
+    - grid: the Grid to render
+    - timestamp: the time to calculate the colours at
+    - start: the background colour the layers are applied on top of
+
+    Returns:
+    - result: an (x, y, 3) uint8 array, result[x, y] is the colour of grid[x][y]
+
+    Empty squares all have the colour of grid.background(), so the image is filled with it
+    and only the squares in grid.occupied are worked out.
+
+    Complexity:
+    - Worst case: O(N + P*L), N is the number of squares, P the number of occupied squares
+      and L the number of layers per square, the O(N) being one numpy fill
+    - Best case: O(N + P) when only pure layers are used, with one get_color per distinct state
+    """
+    out = np.empty((grid.x, grid.y, 3), dtype=np.uint8)
+    out[:] = grid.background().get_color(start, timestamp, 0, 0)
+    render_cells(grid, grid.occupied, timestamp, start, out)
+    return out
+
+
+def render_cells(grid, cells, timestamp: float, start: tuple, out: np.ndarray) -> None:
+    """
+    Renders only the given squares into an existing array, as render() would.
+
+    Args:
+    - grid: the Grid to render
+    - cells: iterable of (x, y) positions to render
+    - timestamp: the time to calculate the colours at
+    - start: the background colour the layers are applied on top of
+    - out: the contiguous (x, y, 3) uint8 array to write to
+
+    Complexity:
+    - Worst case: O(C*L), C is the number of cells given and L the number of layers per square
+    """
+    keys = {}
+    flat = []
+    codes = []
+    for x, y in cells:
+        flat.append(x * grid.y + y)
+        codes.append(keys.setdefault(grid[x, y].state_key(), len(keys)))
+    if flat:
+        _fill(grid, np.array(flat), np.array(codes), len(keys), timestamp, start, out.reshape(-1, 3))
+
+
+def _fill(grid, flat: np.ndarray, codes: np.ndarray, count: int, timestamp: float, start: tuple, out: np.ndarray) -> None:
+    """
+    Fills out[flat[i]] for every i, where codes[i] numbers the state of that square's store.
+    flat holds positions as x * grid.y + y, and out is the (x * y, 3) view of the image.
+    """
+    order = np.argsort(codes, kind='stable')
+    ends = np.cumsum(np.bincount(codes, minlength=count))
+    begin = 0
+    for end in ends.tolist():
+        group = flat[order[begin:end]]
+        begin = end
+        x, y = divmod(int(group[0]), grid.y)
+        _fill_group(out, grid[x, y].applied_layers(), group, grid.y, timestamp, start)
+
+
+def _fill_group(out: np.ndarray, applied: tuple, group: np.ndarray, size_y: int, timestamp: float, start: tuple) -> None:
+    """
+    Applies the same layers to every square in group, writing the results into out.
+    While the layers so far are pure every square has the same colour,
+    so it is only computed once.
+    """
+    color = tuple(start)
+    i = 0
+    while i < len(applied) and applied[i].pure:
+        color = applied[i].apply(color, timestamp, 0, 0)
+        i += 1
+    if i == len(applied):
+        out[group] = color
+        return
+
+    xs, ys = np.divmod(group, size_y)
+    colors = np.empty((len(group), 3), dtype=np.int64)
+    colors[:] = color
+    for layer in applied[i:]:
+        colors = layer.apply_batch(colors, timestamp, xs, ys)
+    out[group] = colors
+
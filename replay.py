@@ -1,6 +1,7 @@
 from __future__ import annotations
 from action import PaintAction
 from grid import Grid
+from state_tree import Snapshot
 from data_structures.queue_adt import CircularQueue
 
 
@@ -17,7 +18,7 @@ class ReplayTracker:
         """
         pass
 
-    def add_action(self, action: PaintAction, is_undo: bool = False) -> None:
+    def add_action(self, action: PaintAction, is_undo: bool = False, snapshot: Snapshot | None = None) -> None:
         """
         Adds an action to the replay.
 
@@ -27,6 +28,8 @@ class ReplayTracker:
         Args:
         - Bolean
         - Paintaction
+        - snapshot: optionally, Grid.snapshot() from just after the action, which play_next_action restores
+          instead of playing the action, a cheap restore point to replay exactly from
 
         Raises:
         - Exception if is full
@@ -37,7 +40,7 @@ class ReplayTracker:
         Complexity:
         - Worst case and Best: O(N)
         """
-        self.replay_tracker.append((action, is_undo))
+        self.replay_tracker.append((action, is_undo, snapshot))
 
     def play_next_action(self, grid: Grid) -> bool:
         """
@@ -56,13 +59,15 @@ class ReplayTracker:
         - Bolean
 
         Complexity:
-        - Worst case and Best: O(N)
+        - Worst case and Best: O(N), or see Grid.restore if the action has a snapshot
         """
         if self.replay_tracker.is_empty():
             return True
         redo_layer = self.replay_tracker.serve()
-        redo_layer, is_undo = redo_layer
-        if is_undo:
+        redo_layer, is_undo, snapshot = redo_layer
+        if snapshot is not None:
+            grid.restore(snapshot)
+        elif is_undo:
             redo_layer.undo_apply(grid) #O(N)
         else:
             redo_layer.redo_apply(grid) #O(N)
@@ -0,0 +1,282 @@
+"""
+Bit plane storage for a whole sequence grid.
+
+Instead of one BSet per square, every layer has a plane holding one bit per square of the grid,
+packed into uint64 words, so adding, erasing and special over many squares are bitwise operations
+on whole words. PlaneLayerStore gives a single square the usual LayerStore interface,
+and grid_arrays.ProxyColumns makes grid[x][y] give them.
+"""
+
+from __future__ import annotations
+import numpy as np
+import layer_util
+from layer_util import Layer, LAYERS
+from layer_store import LayerStore, SequenceLayerStore
+from data_structures.bset import BSet
+
+WORD_BITS = 64
+
+
+class SequencePlanes:
+    """
+    Layer membership of every square of a sequence grid.
+    Square (x, y) is numbered x * size_y + y, and square s is bit s % 64 of word s // 64 of a plane.
+    Sets of squares (regions) are given in the same packed form, see pack and unpack.
+
+    Attributes:
+        size_x, size_y (int): dimensions of the grid
+        words (int): number of uint64 words in a plane
+        planes (np.ndarray): (layers, words) uint64 array, planes[i] holds the squares the layer with index i is applied to
+    """
+
+    def __init__(self, size_x: int, size_y: int) -> None:
+        """
+        Args:
+        - size_x, size_y: the dimensions of the grid
+
+        Complexity:
+        - Worst case and Best: O(L*X*Y/64), L is the number of registered layers
+        """
+        self.size_x = size_x
+        self.size_y = size_y
+        self.words = max(1, -(-size_x * size_y // WORD_BITS))
+        self.planes = np.zeros((max(1, layer_util.cur_layer_index), self.words), dtype=np.uint64)
+        self.everything = self.pack(np.arange(size_x * size_y))
+
+    def pack(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Returns the region holding the given square numbers, which may repeat.
+
+        Complexity:
+        - Worst case and Best: O(C + X*Y/64), C is the number of squares given
+        """
+        bits = np.zeros(self.words * WORD_BITS, dtype=bool)
+        bits[cells] = True
+        return np.packbits(bits, bitorder='little').view('<u8').astype(np.uint64)
+
+    def unpack(self, region: np.ndarray) -> np.ndarray:
+        """
+        Returns the square numbers in a region, in increasing order.
+
+        Complexity:
+        - Worst case and Best: O(X*Y)
+        """
+        bits = np.unpackbits(region.astype('<u8').view(np.uint8), bitorder='little')
+        return np.flatnonzero(bits[:self.size_x * self.size_y])
+
+    def plane(self, layer: Layer) -> np.ndarray:
+        """
+        Returns the plane of a layer, making room for it if it was registered after the planes were made.
+
+        Complexity:
+        - Worst case: O(L*X*Y/64) when the planes have to grow
+        - Best case: O(1)
+        """
+        if layer.index >= len(self.planes):
+            grown = np.zeros((max(layer.index + 1, 2 * len(self.planes)), self.words), dtype=np.uint64)
+            grown[:len(self.planes)] = self.planes
+            self.planes = grown
+        return self.planes[layer.index]
+
+    def add(self, layer: Layer, region: np.ndarray) -> np.ndarray:
+        """
+        Applies the layer to every square in the region.
+
+        Returns:
+        - result: the region of squares which didn't have the layer before
+
+        Complexity:
+        - Worst case and Best: O(X*Y/64)
+        """
+        plane = self.plane(layer)
+        changed = region & ~plane
+        plane |= region
+        return changed
+
+    def erase(self, layer: Layer, region: np.ndarray) -> np.ndarray:
+        """
+        Stops applying the layer to every square in the region.
+
+        Returns:
+        - result: the region of squares which had the layer before
+
+        Complexity:
+        - Worst case and Best: O(X*Y/64)
+        """
+        plane = self.plane(layer)
+        changed = region & plane
+        plane &= ~region
+        return changed
+
+    def special(self, region: np.ndarray | None = None) -> np.ndarray:
+        """
+        Applies SequenceLayerStore.special to every square in the region (all of them by default),
+        removing the layer with the median name, the lexicographically smaller on ties.
+
+        Works on all squares at once by keeping counts as bit slices: slice k holds bit k of the count
+        of every square. The number c of layers on each square is counted, and then the layers are gone
+        through in name order, removing a layer from the squares where (c-1)//2 layers came before it.
+
+        Returns:
+        - result: the region of squares which had at least one layer, and so changed
+
+        Complexity:
+        - Worst case and Best: O(L*log(L)*X*Y/64), L is the number of registered layers
+        """
+        if region is None:
+            region = self.everything
+        SequenceLayerStore.rank_names()
+        order = [layer.index for layer in SequenceLayerStore.name_order if layer.index < len(self.planes)]
+        width = max(1, len(order).bit_length())
+
+        counts = [np.zeros(self.words, dtype=np.uint64) for _ in range(width)]
+        for index in order:
+            self.__increment(counts, self.planes[index] & region)
+        changed = np.zeros(self.words, dtype=np.uint64)
+        for count in counts:
+            changed |= count
+
+        # (c-1)//2: subtract one from every square with a layer, then drop the lowest slice.
+        borrow = changed.copy()
+        below = []
+        for count in counts:
+            below.append(count ^ borrow)
+            borrow = ~count & borrow
+        target = below[1:] + [np.zeros(self.words, dtype=np.uint64)]
+
+        seen = [np.zeros(self.words, dtype=np.uint64) for _ in range(width)]
+        for index in order:
+            here = self.planes[index] & region
+            median = here.copy()
+            for seen_bits, target_bits in zip(seen, target):
+                median &= ~(seen_bits ^ target_bits)
+            self.planes[index] &= ~median
+            self.__increment(seen, here)
+        return changed
+
+    def empty(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Returns whether each square given has no layers.
+
+        Complexity:
+        - Worst case and Best: O(L*X*Y/64 + C), C is the number of squares given
+        """
+        used = np.bitwise_or.reduce(self.planes, axis=0)
+        bits = (used[cells // WORD_BITS] >> (cells % WORD_BITS).astype(np.uint64)) & np.uint64(1)
+        return bits == 0
+
+    def mask(self, cell: int) -> int:
+        """
+        Returns the layers applied to a square as BSet bits, bit i for the layer with index i.
+
+        Complexity:
+        - Worst case and Best: O(L)
+        """
+        bits = (self.planes[:, cell // WORD_BITS] >> np.uint64(cell % WORD_BITS)) & np.uint64(1)
+        return int.from_bytes(np.packbits(bits.astype(np.uint8), bitorder='little').tobytes(), 'little')
+
+    def state_key(self, cell: int) -> int:
+        """
+        Returns the key SequenceLayerStore gives for a square, its BSet bits, see LayerStore.state_key.
+
+        Complexity:
+        - Worst case and Best: O(L)
+        """
+        return self.mask(cell)
+
+    def set_mask(self, cell: int, mask: int) -> None:
+        """
+        Sets the layers applied to a square from BSet bits.
+
+        Complexity:
+        - Worst case and Best: O(L)
+        """
+        if mask.bit_length() > len(self.planes):
+            self.plane(LAYERS[mask.bit_length() - 1])
+        word, bit = cell // WORD_BITS, np.uint64(1 << (cell % WORD_BITS))
+        for index in range(len(self.planes)):
+            if (mask >> index) & 1:
+                self.planes[index, word] |= bit
+            else:
+                self.planes[index, word] &= ~bit
+
+    @staticmethod
+    def __increment(counts: list, bits: np.ndarray) -> None:
+        """ Adds one to the bit sliced counts of the squares in bits, rippling the carry up the slices. """
+        carry = bits
+        for k in range(len(counts)):
+            counts[k], carry = counts[k] ^ carry, counts[k] & carry
+
+
+class PlaneLayerStore(SequenceLayerStore):
+    """
+    A single square of SequencePlanes, behaving like a SequenceLayerStore.
+    The layers are read from and written to the planes, so many of these can exist for the same square.
+    """
+
+    def __init__(self, planes: SequencePlanes, x: int, y: int) -> None:
+        LayerStore.__init__(self)
+        self.planes = planes
+        self.cell = x * planes.size_y + y
+
+    @property
+    def layers_store(self) -> BSet:
+        """
+        The layers applied to the square, as a new BSet. Changing it doesn't change the square.
+        """
+        layers = BSet()
+        layers.elems = self.planes.mask(self.cell)
+        return layers
+
+    def add(self, layer: Layer) -> bool:
+        """
+        Add a layer to the store.
+        Returns true if the LayerStore was actually changed.
+
+        Complexity:
+        - Worst case and Best: O(1), O(L) when the planes have to grow
+        """
+        plane = self.planes.plane(layer)
+        word, bit = self.cell // WORD_BITS, np.uint64(1 << (self.cell % WORD_BITS))
+        if plane[word] & bit:
+            return False
+        plane[word] |= bit
+        self.changed()
+        return True
+
+    def erase(self, layer: Layer) -> bool:
+        """
+        Complete the erase action with this layer
+        Returns true if the LayerStore was actually changed.
+
+        Complexity:
+        - Worst case and Best: O(1), O(L) when the planes have to grow
+        """
+        plane = self.planes.plane(layer)
+        word, bit = self.cell // WORD_BITS, np.uint64(1 << (self.cell % WORD_BITS))
+        if not plane[word] & bit:
+            return False
+        plane[word] &= ~bit
+        self.changed()
+        return True
+
+    def special(self) -> None:
+        """
+        Special mode, removes the layer with the median name, see SequenceLayerStore.special.
+
+        Complexity:
+        - Worst case and Best: O(L)
+        """
+        mask = self.planes.mask(self.cell)
+        if not mask:
+            return
+        self.planes.set_mask(self.cell, SequenceLayerStore.special_mask(mask))
+        self.changed()
+
+    def state_key(self) -> int:
+        """
+        The same key SequenceLayerStore gives, without making a BSet.
+        """
+        return self.planes.state_key(self.cell)
+
+
@@ -0,0 +1,206 @@
+"""
+Persistent storage of the state number of every square, with snapshots that share structure.
+
+The squares are cut into leaves of LEAF_SIZE squares, each a small int32 array, under a tree of nodes with
+BRANCHING children. Every node belongs to the edit it was made in. A snapshot is just the root, and taking one
+starts a new edit, so nodes from before are never changed again: a write copies the path from the root to its
+leaf the first time the leaf is written in the edit, and writes in place after that. Snapshots and the tree
+share every node which wasn't written since, so comparing them only looks at the paths which were.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+import numpy as np
+
+LEAF_BITS = 10
+LEAF_SIZE = 1 << LEAF_BITS
+BRANCH_BITS = 5
+BRANCHING = 1 << BRANCH_BITS
+
+
+class Node:
+    """
+    Attributes:
+        edit: the edit the node was made in, it can be changed in place only in that edit
+        children: list of child nodes, or the int32 array of a leaf
+    """
+    __slots__ = ('edit', 'children')
+
+    def __init__(self, edit: object, children) -> None:
+        self.edit = edit
+        self.children = children
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    The state of every square at one time, which never changes.
+
+    Attributes:
+        root (Node): root of the tree of state numbers
+        size (int): number of squares
+        table: the StateTable the state numbers refer to
+    """
+    root: Node
+    size: int
+    table: object
+
+
+class StateTree:
+    """
+    Attributes:
+        size (int): number of squares
+        depth (int): number of levels of nodes above the leaves
+        root (Node): root of the current tree
+        edit: the current edit, see snapshot
+    """
+
+    def __init__(self, size: int, state: int) -> None:
+        """
+        Makes a tree with every square in the state. All the leaves start as one shared leaf,
+        and all the nodes of a level as one shared node.
+
+        Complexity:
+        - Worst case and Best: O(log(N))
+        """
+        self.size = size
+        leaves = max(1, -(-size // LEAF_SIZE))
+        self.depth = 0
+        while BRANCHING ** self.depth < leaves:
+            self.depth += 1
+        self.edit = object()
+        node = Node(None, np.full(LEAF_SIZE, state, dtype=np.int32))
+        for _ in range(self.depth):
+            node = Node(None, [node] * BRANCHING)
+        self.root = node
+
+    def leaf(self, leaf: int) -> np.ndarray:
+        """
+        Returns the states of the squares of leaf number leaf, which must not be changed.
+
+        Complexity:
+        - Worst case and Best: O(log(N))
+        """
+        node = self.root
+        for level in range(self.depth - 1, -1, -1):
+            node = node.children[(leaf >> (BRANCH_BITS * level)) & (BRANCHING - 1)]
+        return node.children
+
+    def writable_leaf(self, leaf: int) -> np.ndarray:
+        """
+        Returns the states of the squares of leaf number leaf, which can be changed,
+        copying the path to it if it was made in an earlier edit.
+
+        Complexity:
+        - Worst case: O(log(N) * BRANCHING + LEAF_SIZE) when the path is copied
+        - Best case: O(log(N))
+        """
+        node = self.root = self.__own(self.root)
+        for level in range(self.depth - 1, -1, -1):
+            i = (leaf >> (BRANCH_BITS * level)) & (BRANCHING - 1)
+            node.children[i] = self.__own(node.children[i])
+            node = node.children[i]
+        return node.children
+
+    def get(self, cell: int) -> int:
+        """
+        Returns the state of a square.
+
+        Complexity:
+        - Worst case and Best: O(log(N))
+        """
+        return int(self.leaf(cell >> LEAF_BITS)[cell & (LEAF_SIZE - 1)])
+
+    def set(self, cell: int, state: int) -> None:
+        """
+        Sets the state of a square.
+
+        Complexity:
+        - Worst case: O(log(N) * BRANCHING + LEAF_SIZE) when the path is copied
+        - Best case: O(log(N))
+        """
+        self.writable_leaf(cell >> LEAF_BITS)[cell & (LEAF_SIZE - 1)] = state
+
+    def gather(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Returns the states of the squares given.
+
+        Complexity:
+        - Worst case and Best: O(C*log(C) + L*log(N)), L is the number of leaves the C squares are in
+        """
+        states = np.empty(len(cells), dtype=np.int32)
+        for leaf, group in self.__by_leaf(cells):
+            states[group] = self.leaf(leaf)[cells[group] & (LEAF_SIZE - 1)]
+        return states
+
+    def scatter(self, cells: np.ndarray, states: np.ndarray) -> None:
+        """
+        Sets the states of the squares given, only copying the paths to the leaves they are in.
+
+        Complexity:
+        - Worst case and Best: O(C*log(C) + L*log(N)) plus the paths copied, L is the number of leaves
+        """
+        for leaf, group in self.__by_leaf(cells):
+            self.writable_leaf(leaf)[cells[group] & (LEAF_SIZE - 1)] = states[group]
+
+    def snapshot(self, table) -> Snapshot:
+        """
+        Returns the current states, which won't change when the tree does.
+
+        Complexity:
+        - Worst case and Best: O(1)
+        """
+        self.edit = object()
+        return Snapshot(self.root, self.size, table)
+
+    def restore(self, snapshot: Snapshot) -> np.ndarray:
+        """
+        Goes back to the states of a snapshot of a tree of the same size, which stays as it was.
+
+        Returns:
+        - result: the numbers of the squares whose state number is different
+
+        Raises:
+        - ValueError: if the snapshot is of a different number of squares
+
+        Complexity:
+        - Worst case: O(N)
+        - Best case: O(1) when the tree hasn't been written since the snapshot
+        """
+        if snapshot.size != self.size:
+            raise ValueError("Snapshot is of a grid of a different size")
+        changed = self.diff(self.root, snapshot.root, self.depth, 0)
+        self.root = snapshot.root
+        self.edit = object()
+        return changed[changed < self.size]
+
+    def diff(self, old: Node, new: Node, depth: int, first: int) -> np.ndarray:
+        """
+        Returns the numbers of the squares with different states under two nodes at the same depth,
+        the first square under them being number first. Shared nodes are skipped.
+        """
+        if old is new:
+            return np.zeros(0, dtype=np.int64)
+        if depth == 0:
+            return first + np.flatnonzero(old.children != new.children)
+        span = LEAF_SIZE << (BRANCH_BITS * (depth - 1))
+        return np.concatenate([self.diff(a, b, depth - 1, first + i * span)
+                               for i, (a, b) in enumerate(zip(old.children, new.children))])
+
+    def __own(self, node: Node) -> Node:
+        """ Returns the node if it was made in this edit, or a copy of it made in this edit. """
+        if node.edit is self.edit:
+            return node
+        return Node(self.edit, node.children.copy())
+
+    @staticmethod
+    def __by_leaf(cells: np.ndarray):
+        """ Yields each leaf the squares are in, with the positions in cells of the squares in it. """
+        leaves = cells >> LEAF_BITS
+        distinct, inverse = np.unique(leaves, return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        ends = np.cumsum(np.bincount(inverse, minlength=len(distinct))).tolist()
+        begin = 0
+        for leaf, end in zip(distinct.tolist(), ends):
+            yield leaf, order[begin:end]
+            begin = end
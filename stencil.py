@@ -0,0 +1,166 @@
+"""
+Brush stencils: the squares a brush covers around its centre, for each shape and size.
+
+A stencil is kept as spans, one per column it covers, each the range of y offsets covered in that column.
+Squares of a column are next to each other in Grid.cells, so a span clipped to the grid is one slice of it.
+Stencils are worked out once per shape and size, and clipping one to the grid only looks at its columns,
+so brushes can be much bigger than Grid.MAX_BRUSH. More shapes can be added with register_shape.
+A stroke is the union of the stencil centred on each square of a line, see line and Stencil.stroke.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Callable, Iterable
+
+DIAMOND = "diamond"
+SQUARE = "square"
+CIRCLE = "circle"
+
+
+class Stencil:
+    """
+    Attributes:
+        spans (tuple): (dx, dy0, dy1) for each column covered, dy0 <= dy <= dy1 being covered, in increasing dx
+    """
+    __slots__ = ('spans', 'size')
+
+    def __init__(self, spans: Iterable[tuple[int, int, int]]) -> None:
+        self.spans = tuple(sorted(span for span in spans if span[1] <= span[2]))
+        self.size = sum(dy1 - dy0 + 1 for _, dy0, dy1 in self.spans)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def clip(self, px: int, py: int, size_x: int, size_y: int) -> list[tuple[int, int, int]]:
+        """
+        Returns the spans of the stencil centred at (px, py) which are inside a size_x by size_y grid,
+        as (x, y0, y1) with y0 <= y < y1, in increasing x. Parts outside the grid are left out, not mirrored.
+
+        Complexity:
+        - Worst case and Best: O(S), S is the number of columns of the stencil
+        """
+        clipped = []
+        for dx, dy0, dy1 in self.spans:
+            x = px + dx
+            if 0 <= x < size_x:
+                y0, y1 = max(py + dy0, 0), min(py + dy1 + 1, size_y)
+                if y0 < y1:
+                    clipped.append((x, y0, y1))
+        return clipped
+
+    def positions(self, px: int, py: int, size_x: int, size_y: int) -> list[tuple[int, int]]:
+        """
+        Returns the positions of the squares of the stencil centred at (px, py) inside the grid, see clip.
+
+        Complexity:
+        - Worst case and Best: O(S + C), C is the number of squares returned
+        """
+        return [(x, y) for x, y0, y1 in self.clip(px, py, size_x, size_y) for y in range(y0, y1)]
+
+    def stroke(self, points: Iterable[tuple[int, int]], size_x: int, size_y: int) -> list[tuple[int, int, int]]:
+        """
+        Returns the union of the stencil centred at each of the points, clipped to a size_x by size_y grid,
+        as spans (x, y0, y1) with y0 <= y < y1 in increasing x, and no two spans of a column overlapping or touching.
+        So every square of the stroke is in exactly one span, however many of the points cover it.
+
+        Complexity:
+        - Worst case: O(P*S*log(P*S)), P is the number of points and S the number of columns of the stencil
+        - Best case: O(P*S)
+        """
+        columns = {}
+        for px, py in points:
+            for x, y0, y1 in self.clip(px, py, size_x, size_y):
+                columns.setdefault(x, []).append((y0, y1))
+        spans = []
+        for x in sorted(columns):
+            intervals = sorted(columns[x])
+            y0, y1 = intervals[0]
+            for start, end in intervals[1:]:
+                if start > y1:
+                    spans.append((x, y0, y1))
+                    y0, y1 = start, end
+                elif end > y1:
+                    y1 = end
+            spans.append((x, y0, y1))
+        return spans
+
+
+def line(x0: int, y0: int, x1: int, y1: int) -> list[tuple[int, int]]:
+    """
+    Returns the squares a straight line from the centre of (x0, y0) to the centre of (x1, y1) passes through,
+    both ends included, in order. Each square is next to the one before it (sharing a side), so a stroke of
+    even the smallest brush along it has no gaps. Where the line passes exactly through a corner it steps in y first.
+
+    Complexity:
+    - Worst case and Best: O(|x1 - x0| + |y1 - y0|)
+    """
+    dx, dy = abs(x1 - x0), abs(y1 - y0)
+    sx = 1 if x1 > x0 else -1
+    sy = 1 if y1 > y0 else -1
+    x, y = x0, y0
+    ix = iy = 0
+    squares = [(x, y)]
+    while ix < dx or iy < dy:
+        # Step across whichever side of the square the line reaches first.
+        if (1 + 2 * ix) * dy >= (1 + 2 * iy) * dx or ix == dx:
+            y += sy
+            iy += 1
+        else:
+            x += sx
+            ix += 1
+        squares.append((x, y))
+    return squares
+
+
+def diamond(size: int) -> Iterable[tuple[int, int, int]]:
+    """ Squares at Manhattan distance at most size. """
+    return ((dx, -(size - abs(dx)), size - abs(dx)) for dx in range(-size, size + 1))
+
+
+def square(size: int) -> Iterable[tuple[int, int, int]]:
+    """ Squares at most size away in both x and y. """
+    return ((dx, -size, size) for dx in range(-size, size + 1))
+
+
+def circle(size: int) -> Iterable[tuple[int, int, int]]:
+    """ Squares whose centre is at most size + 0.5 away from the centre of the brush. """
+    limit = (size + 0.5) ** 2
+    for dx in range(-size, size + 1):
+        reach = 0
+        while (reach + 1) ** 2 + dx * dx <= limit:
+            reach += 1
+        yield dx, -reach, reach
+
+
+SHAPES = {DIAMOND: diamond, SQUARE: square, CIRCLE: circle}
+
+
+def register_shape(name: str, spans: Callable[[int], Iterable[tuple[int, int, int]]]) -> None:
+    """
+    Adds a brush shape, or replaces the one with the same name.
+
+    Args:
+    - name: the name of the shape, see Grid.brush_shape
+    - spans: given a brush size, returns (dx, dy0, dy1) for each column the brush covers, see Stencil
+    """
+    SHAPES[name] = spans
+    get_stencil.cache_clear()
+
+
+@lru_cache(maxsize=256)
+def get_stencil(name: str, size: int) -> Stencil:
+    """
+    Returns the stencil of a brush shape and size, only worked out the first time.
+
+    Raises:
+    - ValueError: if no shape has the name, or the size is negative
+
+    Complexity:
+    - Worst case: O(S*log(S)) the first time, S is the number of columns of the stencil
+    - Best case: O(1)
+    """
+    if name not in SHAPES:
+        raise ValueError(f"Unknown brush shape {name}")
+    if size < 0:
+        raise ValueError("Brush size can't be negative")
+    return Stencil(SHAPES[name](size))
@@ -1,6 +1,7 @@
 import unittest
 from ed_utils.decorators import number
 
+from grid import Grid
 from layer_store import AdditiveLayerStore
 from layers import black, lighten, rainbow, invert
 
@@ -62,3 +63,48 @@ class TestAddLayer(unittest.TestCase):
         s.erase(black)
         s.add(invert)
         self.assertEqual(s.get_color((100, 100, 100), 7, 0, 0), (255-91, 255-214, 255-104))
+
+    @number("2.6")
+    def test_special_order(self):
+        s = AdditiveLayerStore()
+        s.add(black)
+        s.add(lighten)
+        s.add(invert)
+        self.assertEqual(s.get_color((100, 100, 100), 0, 0, 0), (215, 215, 215))
+        # Getting the colour doesn't change the order.
+        self.assertEqual(s.applied_layers(), (black, lighten, invert))
+        s.special()
+        self.assertEqual(s.applied_layers(), (invert, lighten, black))
+        # Erasing after special removes the layer that is now first, the last one added.
+        s.erase(black)
+        self.assertEqual(s.applied_layers(), (lighten, black))
+        s.add(invert)
+        s.special()
+        self.assertEqual(s.applied_layers(), (invert, black, lighten))
+        self.assertEqual(s.get_color((100, 100, 100), 0, 0, 0), (40, 40, 40))
+
+    @number("2.7")
+    def test_max_layers(self):
+        s = AdditiveLayerStore(3)
+        for _ in range(3):
+            self.assertEqual(s.add(lighten), True)
+        self.assertEqual(s.add(black), False)
+        self.assertEqual(s.get_color((0, 0, 0), 0, 0, 0), (120, 120, 120))
+        s.erase(black)
+        self.assertEqual(s.add(black), True)
+
+        s = AdditiveLayerStore()
+        for _ in range(AdditiveLayerStore.MAX_LAYERS):
+            s.add(lighten)
+        self.assertEqual(s.add(lighten), False)
+
+        # A cap which allows no layers is refused, by every backend alike.
+        for max_layers in (0, -1):
+            self.assertRaises(ValueError, AdditiveLayerStore, max_layers)
+            for backend in Grid.BACKEND_OPTIONS:
+                if backend != Grid.BACKEND_PLANES:
+                    self.assertRaises(ValueError, Grid, Grid.DRAW_STYLE_ADD, 2, 2, max_layers=max_layers, backend=backend)
+        for backend in (Grid.BACKEND_OBJECTS, Grid.BACKEND_ARRAYS, Grid.BACKEND_CHUNKS, Grid.BACKEND_STATES):
+            grid = Grid(Grid.DRAW_STYLE_ADD, 2, 2, max_layers=1, backend=backend)
+            self.assertEqual(grid[0, 0].add(lighten), True)
+            self.assertEqual(grid[0, 0].add(black), False)
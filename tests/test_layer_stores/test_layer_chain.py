@@ -0,0 +1,79 @@
+import random
+import unittest
+import numpy as np
+from ed_utils.decorators import number
+
+from layer_chain import ChannelMap, Constant, compile_chain
+from layer_store import AdditiveLayerStore
+from layer_util import get_layers
+from layers import black, lighten, darken, invert, rainbow, sparkle
+
+# Colours next to the ends of the channel range, which wrap around in uint8 if not clamped first.
+EDGES = [(0, 255, 10), (39, 216, 40), (255, 0, 250), (128, 1, 254)]
+
+def naive_fold(applied, start, timestamp, x, y):
+    color = start
+    for layer in applied:
+        color = layer.apply(color, timestamp, x, y)
+    return color
+
+class TestLayerChain(unittest.TestCase):
+
+    @number("10.1")
+    def test_layer_metadata(self):
+        for layer in get_layers():
+            if layer is None:
+                break
+            if layer.channel_map is not None:
+                mapping = ChannelMap(*layer.channel_map)
+                for c in range(256):
+                    self.assertEqual(mapping.apply((c, c, c), 0, 0, 0), layer.apply((c, c, c), 0, 0, 0), layer.name)
+            if layer.overwrites:
+                for timestamp, x, y in [(0, 0, 0), (7.5, 3, 9)]:
+                    self.assertEqual(
+                        layer.apply((0, 0, 0), timestamp, x, y),
+                        layer.apply((255, 100, 30), timestamp, x, y),
+                        f"{layer.name} depends on the incoming colour"
+                    )
+
+    @number("10.2")
+    def test_compiled(self):
+        self.assertEqual(compile_chain(()), ())
+        self.assertEqual(compile_chain((invert, invert)), ())
+        self.assertEqual(compile_chain((darken, lighten, rainbow, lighten, lighten)), (rainbow, ChannelMap(1, 80, 40, 255)))
+        # Black, then 40, then 215, then 175.
+        self.assertEqual(compile_chain((sparkle, lighten, black, lighten, invert, darken)), (Constant((175, 175, 175)),))
+        self.assertEqual(compile_chain((black, sparkle, lighten, lighten)), (Constant((0, 0, 0)), sparkle, ChannelMap(1, 80, 40, 255)))
+
+    @number("10.3")
+    def test_matches_naive_fold(self):
+        rng = random.Random(1054)
+        all_layers = [layer for layer in get_layers() if layer is not None]
+        for _ in range(300):
+            s = AdditiveLayerStore()
+            for _ in range(rng.randrange(12)):
+                operation = rng.random()
+                if operation < 0.7:
+                    s.add(rng.choice(all_layers))
+                elif operation < 0.85:
+                    s.erase(black)
+                else:
+                    s.special()
+                start = tuple(rng.randrange(256) for _ in range(3))
+                timestamp, x, y = rng.choice([0, 0.5, 7, 123.25]), rng.randrange(50), rng.randrange(50)
+                self.assertEqual(
+                    s.get_color(start, timestamp, x, y),
+                    naive_fold(s.applied_layers(), start, timestamp, x, y),
+                    f"Differs for {[layer.name for layer in s.applied_layers()]}"
+                )
+                # The compiled chain on the uint8 colours of the framebuffer.
+                colors = np.array(EDGES, dtype=np.uint8)
+                xs, ys = np.full(len(EDGES), x), np.full(len(EDGES), y)
+                for step in compile_chain(s.applied_layers()):
+                    colors = step.apply_batch(colors, timestamp, xs, ys)
+                self.assertEqual(colors.dtype, np.uint8)
+                self.assertEqual(
+                    [tuple(color) for color in colors.tolist()],
+                    [naive_fold(s.applied_layers(), color, timestamp, x, y) for color in EDGES],
+                    f"Differs on uint8 for {[layer.name for layer in s.applied_layers()]}"
+                )
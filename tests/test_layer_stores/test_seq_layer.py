@@ -1,7 +1,10 @@
+import random
 import unittest
 from ed_utils.decorators import number
 
+from grid import Grid
 from layer_store import SequenceLayerStore
+from layer_util import get_layers
 from layers import black, lighten, rainbow, invert
 
 class TestSeqLayer(unittest.TestCase):
@@ -69,3 +72,69 @@ class TestSeqLayer(unittest.TestCase):
         self.assertEqual(s.get_color((100, 100, 100), 7, 0, 0), (0, 0, 0))
         s.erase(black)
         self.assertEqual(s.get_color((100, 100, 100), 7, 0, 0), (91, 214, 104))
+
+    @number("3.6")
+    def test_changed(self):
+        s = SequenceLayerStore()
+        self.assertEqual(s.add(black), True)
+        self.assertEqual(s.add(black), False)
+        self.assertEqual(s.erase(lighten), False)
+        self.assertEqual(s.erase(black), True)
+        self.assertEqual(s.erase(black), False)
+
+    @number("3.7")
+    def test_shared_cache(self):
+        rng = random.Random(1054)
+        all_layers = [layer for layer in get_layers() if layer is not None]
+        for _ in range(200):
+            s = SequenceLayerStore()
+            chosen = rng.sample(all_layers, rng.randrange(len(all_layers)))
+            for layer in chosen:
+                s.add(layer)
+            applied = sorted(chosen, key=lambda layer: layer.index)
+            self.assertEqual(list(s.applied_layers()), applied)
+            for start in [(255, 255, 255), [10, 20, 30]]:
+                timestamp, x, y = rng.choice([0, 7, 12.5]), rng.randrange(30), rng.randrange(30)
+                color = start
+                for layer in applied:
+                    color = layer.apply(color, timestamp, x, y)
+                self.assertEqual(s.get_color(start, timestamp, x, y), color)
+
+    @number("3.8")
+    def test_special_median(self):
+        rng = random.Random(2023)
+        all_layers = [layer for layer in get_layers() if layer is not None]
+        for _ in range(300):
+            s = SequenceLayerStore()
+            chosen = rng.sample(all_layers, rng.randrange(1, len(all_layers) + 1))
+            for layer in chosen:
+                s.add(layer)
+            by_name = sorted(chosen, key=lambda layer: layer.name)
+            # The lexicographically smaller of the two middle names when there are an even number.
+            median = by_name[(len(by_name) - 1) // 2]
+            s.special()
+            self.assertEqual(s.applied_layers(), tuple(sorted(
+                [layer for layer in chosen if layer is not median], key=lambda layer: layer.index
+            )))
+
+    @number("3.9")
+    def test_grid_special(self):
+        rng = random.Random(7)
+        all_layers = [layer for layer in get_layers() if layer is not None]
+        grid = Grid(Grid.DRAW_STYLE_SEQUENCE, 6, 5)
+        expected = []
+        for x in range(6):
+            for y in range(5):
+                for layer in rng.sample(all_layers, rng.randrange(4)):
+                    grid[x][y].add(layer)
+                    # Many squares have the same mask.
+                    grid[(x + 3) % 6][y].add(layer)
+        for x in range(6):
+            for y in range(5):
+                s = SequenceLayerStore()
+                for layer in grid[x][y].applied_layers():
+                    s.add(layer)
+                s.special()
+                expected.append(s.applied_layers())
+        grid.special()
+        self.assertEqual([grid[x][y].applied_layers() for x in range(6) for y in range(5)], expected)
@@ -0,0 +1,38 @@
+"""
+Random changes to grids of every backend, shared by the tests of the indexes the grid keeps up to date.
+"""
+
+import random
+from grid import Grid
+from layer_util import get_layers
+
+def make_grids(style, x=9, y=7):
+    """ Small grids of the style, one for each backend which can hold it. """
+    for backend in Grid.BACKEND_OPTIONS:
+        if backend != Grid.BACKEND_PLANES or style == Grid.DRAW_STYLE_SEQUENCE:
+            yield Grid(style, x, y, max_layers=4, backend=backend, chunk_size=4)
+
+def random_changes(grid, seed, steps=150):
+    """
+    Makes random changes to the grid through both single squares and the bulk methods,
+    yielding the number of the step after each one so the caller can check the grid.
+    """
+    rng = random.Random(seed)
+    all_layers = [layer for layer in get_layers() if layer is not None]
+    for step in range(steps):
+        layer = rng.choice(all_layers)
+        x, y = rng.randrange(grid.x), rng.randrange(grid.y)
+        operation = rng.random()
+        if operation < 0.35:
+            grid[x, y].add(layer)
+        elif operation < 0.6:
+            grid[x, y].erase(layer)
+        elif operation < 0.65:
+            grid[x, y].special()
+        elif operation < 0.8:
+            grid.add_many(layer, [(x, y), (x, (y + 1) % grid.y)])
+        elif operation < 0.97:
+            grid.erase_many(layer, [(x, y), ((x + 1) % grid.x, y)])
+        else:
+            grid.special()
+        yield step
@@ -0,0 +1,110 @@
+import colorsys
+import unittest
+import numpy as np
+from ed_utils.decorators import number
+
+from layer_util import Layer, batch, get_layers
+from layers import lcg_jump, sparkle, lighten, darken, rainbow
+
+def checker(color, timestamp, x, y):
+    if (x + y) % 2:
+        return color
+    return tuple(255 - c for c in color)
+
+def looping_sparkle(color, timestamp, x, y):
+    """sparkle as it was first written, stepping the generator one step at a time."""
+    ts = int((timestamp + x/3 + y/5) * 3)
+    other = x
+    for _ in range(10 + (ts * 31 % 17)):
+        other = (1103515245 * other + 12345) % (1 << 31)
+    other += y
+    for _ in range(10 + (ts * 31 % 17)):
+        other = (1103515245 * other + 12345) % (1 << 31)
+    other = (other & ((1 << 31)-1)) >> 16
+    if other/(1 << 15) < 0.1:
+        return lighten.apply(color, timestamp, x, y)
+    return darken.apply(color, timestamp, x, y)
+
+def uncached_rainbow(color, timestamp, x, y):
+    """rainbow as it was first written, converting the hue of every square."""
+    return tuple(int(255*x) for x in colorsys.hls_to_rgb((timestamp/20 + x/20 + y/20)%1, 0.6, 0.6))
+
+class TestBatchLayers(unittest.TestCase):
+
+    @number("9.1")
+    def test_matches_apply(self):
+        rng = np.random.default_rng(2023)
+        xs = rng.integers(0, 1000, 500)
+        ys = rng.integers(0, 1000, 500)
+        colors = rng.integers(0, 256, (500, 3))
+        for layer in get_layers():
+            if layer is None:
+                break
+            self.assertIsNotNone(layer.batch, f"{layer.name} has no batch form")
+            for timestamp in [0, 7, 0.35, 1234.5]:
+                self.assertBatchCorrect(layer, colors, timestamp, xs, ys)
+
+    @number("9.2")
+    def test_fallback(self):
+        # Not registered, so it doesn't change the layers in the UI.
+        layer = Layer(-1, checker)
+        self.assertIsNone(layer.batch)
+        colors = np.array([[10, 20, 30], [40, 50, 60], [0, 0, 0]])
+        self.assertBatchCorrect(layer, colors, 0, np.array([0, 1, 5]), np.array([0, 3, 5]))
+
+        # The batch form can also be added afterwards.
+        kernel = lambda colors, timestamp, xs, ys: np.where(((xs + ys) % 2)[:, None] == 1, colors, 255 - colors)
+        batch(kernel)(layer)
+        self.assertIs(layer.batch, kernel)
+        self.assertBatchCorrect(layer, colors, 0, np.array([0, 1, 5]), np.array([0, 3, 5]))
+
+    @number("9.3")
+    def test_lcg_jump(self):
+        other = 12345678
+        for steps in range(200):
+            a, c = lcg_jump(steps)
+            self.assertEqual((a * 12345678 + c) % (1 << 31), other, f"Wrong jump of {steps} steps")
+            other = (1103515245 * other + 12345) % (1 << 31)
+
+    @number("9.4")
+    def test_sparkle_unchanged(self):
+        for timestamp in [0, 0.05, 3.7, 99.99]:
+            for x in range(0, 300, 7):
+                for y in range(0, 300, 11):
+                    self.assertEqual(
+                        sparkle.apply((100, 150, 200), timestamp, x, y),
+                        looping_sparkle((100, 150, 200), timestamp, x, y),
+                    )
+
+    @number("9.5")
+    def test_rainbow_unchanged(self):
+        xs, ys = np.divmod(np.arange(200 * 150), 150)
+        colors = np.zeros((len(xs), 3), dtype=np.int64)
+        # Going back to an earlier timestamp has to start a new frame too.
+        for timestamp in [0, 7, 0.35, 7, 1234.5]:
+            expected = [uncached_rainbow(None, timestamp, x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+            self.assertEqual([rainbow.apply(None, timestamp, x, y) for x, y in zip(xs.tolist(), ys.tolist())], expected)
+            self.assertEqual([tuple(c) for c in rainbow.apply_batch(colors, timestamp, xs, ys).tolist()], expected)
+
+    @number("9.6")
+    def test_uint8_colors(self):
+        # The framebuffer is uint8, where going past 0 or 255 before clamping would wrap around.
+        values = [0, 1, 10, 39, 40, 41, 128, 214, 215, 216, 250, 254, 255]
+        colors = np.array([[v, values[-1 - i], v] for i, v in enumerate(values)], dtype=np.uint8)
+        xs, ys = np.arange(len(values)), np.arange(len(values)) * 7
+        for layer in get_layers():
+            if layer is None:
+                break
+            for timestamp in [0, 0.35]:
+                self.assertEqual(layer.apply_batch(colors, timestamp, xs, ys).dtype, np.uint8)
+                self.assertBatchCorrect(layer, colors, timestamp, xs, ys)
+
+    def assertBatchCorrect(self, layer, colors, timestamp, xs, ys):
+        result = layer.apply_batch(colors, timestamp, xs, ys)
+        self.assertEqual(result.shape, colors.shape)
+        for i in range(len(colors)):
+            self.assertEqual(
+                tuple(result[i]),
+                tuple(layer.apply(tuple(colors[i].tolist()), timestamp, int(xs[i]), int(ys[i]))),
+                f"Batch form of {layer.name} differs from apply."
+            )
@@ -0,0 +1,49 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from data_structures.bset import BSet
+
+def make_set(items):
+    s = BSet()
+    for item in items:
+        s.add(item)
+    return s
+
+class TestBSet(unittest.TestCase):
+
+    @number("11.1")
+    def test_len_and_iter(self):
+        rng = random.Random(11)
+        for _ in range(100):
+            items = sorted(rng.sample(range(1, 200), rng.randrange(30)))
+            s = make_set(items)
+            self.assertEqual(len(s), len(items))
+            self.assertEqual(list(s), items)
+        self.assertEqual(list(BSet()), [])
+
+    @number("11.2")
+    def test_rank_select(self):
+        s = make_set([3, 7, 8, 64, 65])
+        self.assertEqual([s.rank(item) for item in [1, 3, 4, 8, 9, 65, 100]], [0, 0, 1, 2, 3, 4, 5])
+        self.assertEqual([s.select(k) for k in range(5)], [3, 7, 8, 64, 65])
+        for item in s:
+            self.assertEqual(s.select(s.rank(item)), item)
+        self.assertRaises(IndexError, s.select, 5)
+        self.assertRaises(IndexError, s.select, -1)
+        self.assertRaises(TypeError, s.rank, 0)
+
+    @number("11.3")
+    def test_in_place(self):
+        s = make_set([1, 2, 3])
+        t = make_set([3, 4])
+        original = s
+        s |= t
+        self.assertIs(s, original)
+        self.assertEqual(list(s), [1, 2, 3, 4])
+        s -= make_set([1, 4])
+        self.assertEqual(list(s), [2, 3])
+        s &= t
+        self.assertIs(s, original)
+        self.assertEqual(list(s), [3])
+        self.assertEqual(list(t), [3, 4])
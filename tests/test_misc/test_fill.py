@@ -0,0 +1,73 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from grid import Grid
+from layers import red, blue, green
+from main import MyWindow
+
+def flood(grid, px, py):
+    target = grid[px, py].state_key()
+    region = {(px, py)}
+    queue = [(px, py)]
+    for x, y in queue:
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < grid.x and 0 <= ny < grid.y and (nx, ny) not in region and grid[nx, ny].state_key() == target:
+                region.add((nx, ny))
+                queue.append((nx, ny))
+    return region
+
+class FakeWindow:
+    def __init__(self, grid: Grid):
+        self.grid = grid
+
+FakeWindow.on_init = MyWindow.on_init
+FakeWindow.on_fill = MyWindow.on_fill
+FakeWindow.on_undo = MyWindow.on_undo
+
+class TestFill(unittest.TestCase):
+
+    @number("24.1")
+    def test_fill_matches_flood(self):
+        rng = random.Random(0)
+        for backend, style in ((Grid.BACKEND_OBJECTS, Grid.DRAW_STYLE_SET), (Grid.BACKEND_OBJECTS, Grid.DRAW_STYLE_ADD),
+                               (Grid.BACKEND_ARRAYS, Grid.DRAW_STYLE_SEQUENCE), (Grid.BACKEND_CHUNKS, Grid.DRAW_STYLE_SET),
+                               (Grid.BACKEND_PLANES, Grid.DRAW_STYLE_SEQUENCE), (Grid.BACKEND_STATES, Grid.DRAW_STYLE_ADD)):
+            grid = Grid(style, 23, 17, backend=backend)
+            for _ in range(150):
+                grid[rng.randrange(grid.x), rng.randrange(grid.y)].add(rng.choice([red, blue]))
+            for px, py in ((0, 0), (11, 8), (22, 16), (5, 13)):
+                region = flood(grid, px, py)
+                spans = grid.fill_region(px, py)
+                positions = [(x, y) for x, y0, y1 in spans for y in range(y0, y1)]
+                self.assertEqual(len(positions), len(region), (backend, style, px, py))
+                self.assertEqual(set(positions), region)
+        self.assertRaises(IndexError, grid.fill_region, 23, 0)
+
+    @number("24.2")
+    def test_fill_action(self):
+        grid = Grid(Grid.DRAW_STYLE_ADD, 120, 120)
+        # A wall with a gap, so the region winds around it.
+        for y in range(119):
+            grid[60, y].add(blue)
+        window = FakeWindow(grid)
+        window.on_init()
+        window.on_fill(green, 0, 0)
+        self.assertEqual(len(grid.occupied), 120 * 120)
+        self.assertEqual(grid[60, 119].state_key(), (green.index,))
+        self.assertEqual(grid[60, 0].state_key(), (blue.index,))
+        self.assertEqual(grid[119, 0].state_key(), (green.index,))
+        window.on_undo()
+        self.assertEqual(grid.occupied.cells, {(60, y) for y in range(119)})
+
+    @number("24.3")
+    def test_fill_huge_chunked_grid(self):
+        # Nothing the size of the canvas is made, so a small fill on a huge grid is cheap.
+        grid = Grid(Grid.DRAW_STYLE_SET, 100000, 100000, backend=Grid.BACKEND_CHUNKS)
+        ring = [(x, y) for x in range(49998, 50003) for y in range(49998, 50003) if x in (49998, 50002) or y in (49998, 50002)]
+        grid.add_many(red, ring)
+        inside = [(x, y) for x in range(49999, 50002) for y in range(49999, 50002)]
+        self.assertEqual(sorted(grid.fill(blue, 50000, 50000)), inside)
+        spans = grid.fill_region(49998, 50000)
+        self.assertEqual(sorted((x, y) for x, y0, y1 in spans for y in range(y0, y1)), sorted(ring))
+        self.assertEqual(len(grid.chunks.chunks), 1)
@@ -0,0 +1,55 @@
+import unittest
+from ed_utils.decorators import number
+
+from grid import Grid
+from layers import black, lighten, rainbow, invert, red, sparkle
+
+class TestFramebuffer(unittest.TestCase):
+
+    @number("7.1")
+    def test_matches_get_color(self):
+        for style in Grid.DRAW_STYLE_OPTIONS:
+            grid = Grid(style, 6, 5)
+            self.assertFramebufferCorrect(grid, (255, 255, 255), 0)
+            grid[1][2].add(black)
+            grid[1][2].add(lighten)
+            grid[3][4].add(rainbow)
+            grid[5][0].add(sparkle)
+            grid[0][0].add(invert)
+            self.assertFramebufferCorrect(grid, (255, 255, 255), 1.5)
+            grid.special()
+            self.assertFramebufferCorrect(grid, (255, 255, 255), 3)
+            grid[1][2].erase(black)
+            grid[3][4].erase(rainbow)
+            self.assertFramebufferCorrect(grid, (255, 255, 255), 4)
+            # A new background recomputes everything.
+            self.assertFramebufferCorrect(grid, (10, 20, 30), 4)
+
+    @number("7.2")
+    def test_only_changes_recomputed(self):
+        grid = Grid(Grid.DRAW_STYLE_SET, 4, 4)
+        grid[0][0].add(red)
+        grid[1][1].add(rainbow)
+        grid.colors((255, 255, 255), 0)
+        self.assertEqual(grid.dirty, set())
+        self.assertEqual(grid.animated, {(1, 1)})
+
+        # Adding a layer that is already there doesn't change anything.
+        grid[0][0].add(red)
+        self.assertEqual(grid.dirty, set())
+        grid[2][3].add(black)
+        self.assertEqual(grid.dirty, {(2, 3)})
+        grid[1][1].erase(rainbow)
+        self.assertFramebufferCorrect(grid, (255, 255, 255), 1)
+        self.assertEqual(grid.dirty, set())
+        self.assertEqual(grid.animated, set())
+
+    def assertFramebufferCorrect(self, grid: Grid, start, timestamp):
+        framebuffer = grid.colors(start, timestamp)
+        for x in range(grid.x):
+            for y in range(grid.y):
+                self.assertEqual(
+                    tuple(framebuffer[x, y]),
+                    tuple(grid[x][y].get_color(start, timestamp, x, y)),
+                    "Framebuffer colour differs from get_color."
+                )
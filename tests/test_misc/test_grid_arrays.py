@@ -0,0 +1,73 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from grid import Grid
+from layer_util import get_layers
+from layers import rainbow
+from layer_store import AdditiveLayerStore
+
+def all_squares(grid):
+    return [grid[x][y].applied_layers() for x in range(grid.x) for y in range(grid.y)]
+
+class TestGridArrays(unittest.TestCase):
+
+    def check_matches_objects(self, style, seed, max_layers=AdditiveLayerStore.MAX_LAYERS):
+        rng = random.Random(seed)
+        all_layers = [layer for layer in get_layers() if layer is not None]
+        objects = Grid(style, 9, 11, max_layers=max_layers)
+        arrays = Grid(style, 9, 11, max_layers=max_layers, backend=Grid.BACKEND_ARRAYS)
+        for _ in range(300):
+            operation = rng.random()
+            layer = rng.choice(all_layers)
+            x, y = rng.randrange(9), rng.randrange(11)
+            if operation < 0.3:
+                self.assertEqual(arrays[x][y].add(layer), objects[x][y].add(layer))
+            elif operation < 0.4:
+                self.assertEqual(arrays[x][y].erase(layer), objects[x][y].erase(layer))
+            elif operation < 0.45:
+                arrays[x][y].special()
+                objects[x][y].special()
+            elif operation < 0.95:
+                cells = [(rng.randrange(9), rng.randrange(11)) for _ in range(rng.randrange(40))]
+                if operation < 0.8:
+                    changed, expected = arrays.add_many(layer, cells), objects.add_many(layer, cells)
+                else:
+                    changed, expected = arrays.erase_many(layer, cells), objects.erase_many(layer, cells)
+                self.assertEqual(sorted(set(changed)), sorted(set(expected)))
+            else:
+                arrays.special()
+                objects.special()
+            self.assertEqual(all_squares(arrays), all_squares(objects))
+        for x in range(9):
+            for y in range(11):
+                self.assertEqual(arrays[x][y].get_color((1, 2, 3), 4.5, x, y), objects[x][y].get_color((1, 2, 3), 4.5, x, y))
+                self.assertEqual(arrays[x][y].is_animated(), objects[x][y].is_animated())
+                self.assertEqual(arrays[x][y].state_key(), objects[x][y].state_key())
+        self.assertEqual(arrays.colors((255, 255, 255), 3).tolist(), objects.colors((255, 255, 255), 3).tolist())
+
+    @number("13.1")
+    def test_set(self):
+        self.check_matches_objects(Grid.DRAW_STYLE_SET, 14)
+
+    @number("13.2")
+    def test_additive(self):
+        self.check_matches_objects(Grid.DRAW_STYLE_ADD, 15)
+        # Squares stop taking layers at max_layers, like AdditiveLayerStore.
+        self.check_matches_objects(Grid.DRAW_STYLE_ADD, 16, max_layers=3)
+
+    @number("13.3")
+    def test_sequence(self):
+        self.check_matches_objects(Grid.DRAW_STYLE_SEQUENCE, 17)
+
+    @number("13.4")
+    def test_views(self):
+        grid = Grid(Grid.DRAW_STYLE_ADD, 4, 5, backend=Grid.BACKEND_ARRAYS)
+        self.assertEqual(len(grid.grid), 4)
+        self.assertEqual(len(grid[0]), 5)
+        self.assertRaises(IndexError, grid[0].__getitem__, 5)
+        # Views of the same square share it, and changes are reported to the grid.
+        grid.dirty.clear()
+        grid[1][-1].add(rainbow)
+        self.assertEqual(grid[1][4].applied_layers(), (rainbow,))
+        self.assertIn((1, 4), grid.dirty)
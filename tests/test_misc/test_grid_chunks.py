@@ -0,0 +1,91 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from grid import Grid
+from layer_util import get_layers
+from layers import red, blue, rainbow, invert
+
+def all_squares(grid):
+    return [grid[x][y].applied_layers() for x in range(grid.x) for y in range(grid.y)]
+
+class TestGridChunks(unittest.TestCase):
+
+    def check_matches_objects(self, style, seed):
+        rng = random.Random(seed)
+        all_layers = [layer for layer in get_layers() if layer is not None]
+        objects = Grid(style, 9, 11, max_layers=5)
+        chunks = Grid(style, 9, 11, max_layers=5, backend=Grid.BACKEND_CHUNKS, chunk_size=4)
+        for _ in range(300):
+            operation = rng.random()
+            layer = rng.choice(all_layers)
+            x, y = rng.randrange(9), rng.randrange(11)
+            if operation < 0.3:
+                self.assertEqual(chunks[x][y].add(layer), objects[x][y].add(layer))
+            elif operation < 0.4:
+                self.assertEqual(chunks[x][y].erase(layer), objects[x][y].erase(layer))
+            elif operation < 0.45:
+                chunks[x][y].special()
+                objects[x][y].special()
+            elif operation < 0.95:
+                cells = [(rng.randrange(9), rng.randrange(11)) for _ in range(rng.randrange(40))]
+                if operation < 0.8:
+                    changed, expected = chunks.add_many(layer, cells), objects.add_many(layer, cells)
+                else:
+                    changed, expected = chunks.erase_many(layer, cells), objects.erase_many(layer, cells)
+                self.assertEqual(sorted(changed), sorted(expected) if style == Grid.DRAW_STYLE_ADD else sorted(set(expected)))
+            else:
+                chunks.special()
+                objects.special()
+            self.assertEqual(all_squares(chunks), all_squares(objects))
+            if operation > 0.9:
+                self.assertEqual(chunks.colors((255, 255, 255), 3).tolist(), objects.colors((255, 255, 255), 3).tolist())
+        self.assertEqual(chunks.colors((255, 255, 255), 3).tolist(), objects.colors((255, 255, 255), 3).tolist())
+
+    @number("14.1")
+    def test_matches_objects(self):
+        self.check_matches_objects(Grid.DRAW_STYLE_SET, 18)
+        self.check_matches_objects(Grid.DRAW_STYLE_ADD, 19)
+        self.check_matches_objects(Grid.DRAW_STYLE_SEQUENCE, 20)
+
+    @number("14.2")
+    def test_huge_canvas(self):
+        grid = Grid(Grid.DRAW_STYLE_ADD, 100000, 100000, backend=Grid.BACKEND_CHUNKS)
+        self.assertEqual(len(grid.grid), 100000)
+        self.assertEqual(grid[99999][-1].applied_layers(), ())
+        # Reading and erasing unpainted squares makes nothing.
+        self.assertFalse(grid[50000][50000].erase(red))
+        self.assertEqual(grid.chunks.chunks, {})
+
+        stroke = [(50000 + i, 70000 + i) for i in range(100)]
+        self.assertEqual(len(grid.add_many(blue, stroke)), 100)
+        grid[0][0].add(rainbow)
+        # The stroke crosses four chunks.
+        self.assertEqual(len(grid.chunks.chunks), 5)
+        self.assertEqual(grid[50010][70010].applied_layers(), (blue,))
+        self.assertEqual(grid[50010][70011].applied_layers(), ())
+        self.assertTrue(grid[0][0].is_animated())
+        self.assertRaises(IndexError, grid.add_many, red, [(100000, 0)])
+
+    @number("14.3")
+    def test_grow(self):
+        grid = Grid(Grid.DRAW_STYLE_SET, 5, 5, backend=Grid.BACKEND_CHUNKS, chunk_size=2)
+        grid[0][0].add(red)
+        grid[4][4].add(blue)
+        before = grid.colors((255, 255, 255), 0).copy()
+        grid.grow(x_before=3, y_before=1, x_after=2)
+        self.assertEqual((grid.x, grid.y), (10, 6))
+        self.assertEqual(grid[3][1].applied_layers(), (red,))
+        self.assertEqual(grid[7][5].applied_layers(), (blue,))
+        self.assertEqual(grid[0][0].applied_layers(), ())
+        after = grid.colors((255, 255, 255), 0)
+        self.assertEqual(after.shape, (10, 6, 3))
+        self.assertEqual(after[3:8, 1:6].tolist(), before.tolist())
+
+        # Squares added after special read as inverted, like every other unpainted square.
+        grid.special()
+        grid.grow(y_after=3)
+        self.assertEqual(grid[9][8].applied_layers(), (invert,))
+        self.assertEqual(grid[3][1].applied_layers(), (red, invert))
+        self.assertRaises(ValueError, grid.grow, x_before=-1)
+        self.assertRaises(TypeError, Grid(Grid.DRAW_STYLE_SET, 2, 2).grow, 1)
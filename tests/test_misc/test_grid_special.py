@@ -0,0 +1,73 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from action import PaintAction
+from grid import Grid
+from undo import UndoTracker
+from layer_util import get_layers
+from layers import red, blue, lighten
+
+def all_squares(grid):
+    return [grid[x, y].state_key() for x in range(grid.x) for y in range(grid.y)]
+
+class TestGridSpecial(unittest.TestCase):
+
+    @number("20.1")
+    def test_matches_special_per_square(self):
+        rng = random.Random(20)
+        all_layers = [layer for layer in get_layers() if layer is not None]
+        for style in (Grid.DRAW_STYLE_SET, Grid.DRAW_STYLE_ADD):
+            objects = Grid(style, 7, 5, max_layers=4)
+            arrays = Grid(style, 7, 5, max_layers=4, backend=Grid.BACKEND_ARRAYS)
+            for step in range(300):
+                layer = rng.choice(all_layers)
+                x, y = rng.randrange(7), rng.randrange(5)
+                operation = rng.random()
+                if operation < 0.4:
+                    self.assertEqual(objects[x, y].add(layer), arrays[x, y].add(layer))
+                elif operation < 0.7:
+                    self.assertEqual(objects[x, y].erase(layer), arrays[x, y].erase(layer))
+                elif operation < 0.8:
+                    objects[x, y].special()
+                    arrays[x, y].special()
+                elif operation < 0.9:
+                    objects.special()
+                    arrays.special()
+                else:
+                    start = (rng.randrange(256), 100, 200)
+                    self.assertTrue((objects.colors(start, step) == arrays.colors(start, step)).all(), (style, step))
+                self.assertEqual(all_squares(objects), all_squares(arrays), (style, step))
+
+    @number("20.2")
+    def test_special_is_one_flag(self):
+        for style in (Grid.DRAW_STYLE_SET, Grid.DRAW_STYLE_ADD):
+            grid = Grid(style, 6, 6)
+            grid[1, 1].add(red)
+            grid[1, 1].add(lighten)
+            grid[2, 2].add(blue)
+            grid.colors((255, 255, 255), 0)
+            before = all_squares(grid)
+            undo = UndoTracker()
+            undo.add_action(PaintAction(is_special=True))
+            grid.special()
+            self.assertTrue(grid.grid_special.active)
+            self.assertEqual(grid.occupied.cells, {(1, 1), (2, 2)})
+            if style == Grid.DRAW_STYLE_ADD:
+                self.assertEqual(grid[1, 1].applied_layers(), (lighten, red))
+                self.assertEqual(grid.dirty, {(1, 1), (2, 2)})
+                grid[1, 1].add(blue)
+                self.assertEqual(grid[1, 1].applied_layers(), (lighten, red, blue))
+                grid[1, 1].erase(blue)
+                self.assertEqual(grid[1, 1].applied_layers(), (red, blue))
+                grid.set_layers(1, 1, (lighten, red))
+            else:
+                self.assertEqual(grid[0, 0].applied_layers()[-1].name, "invert")
+                self.assertIsNone(grid.framebuffer_start)
+            image = grid.colors((255, 255, 255), 1)
+            for x in range(grid.x):
+                for y in range(grid.y):
+                    self.assertEqual(tuple(image[x, y]), tuple(grid[x, y].get_color((255, 255, 255), 1, x, y)))
+            undo.undo(grid)
+            self.assertFalse(grid.grid_special.active)
+            self.assertEqual(all_squares(grid), before)
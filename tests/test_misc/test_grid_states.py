@@ -0,0 +1,81 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from grid import Grid
+from layer_util import get_layers
+from layers import red, lighten, rainbow
+
+def all_squares(grid):
+    return [grid[x][y].applied_layers() for x in range(grid.x) for y in range(grid.y)]
+
+class TestGridStates(unittest.TestCase):
+
+    def check_matches_objects(self, style, seed):
+        rng = random.Random(seed)
+        all_layers = [layer for layer in get_layers() if layer is not None]
+        objects = Grid(style, 9, 11, max_layers=6)
+        states = Grid(style, 9, 11, max_layers=6, backend=Grid.BACKEND_STATES)
+        for _ in range(300):
+            operation = rng.random()
+            layer = rng.choice(all_layers)
+            x, y = rng.randrange(9), rng.randrange(11)
+            if operation < 0.3:
+                self.assertEqual(states[x][y].add(layer), objects[x][y].add(layer))
+            elif operation < 0.4:
+                self.assertEqual(states[x][y].erase(layer), objects[x][y].erase(layer))
+            elif operation < 0.45:
+                states[x][y].special()
+                objects[x][y].special()
+            elif operation < 0.95:
+                cells = [(rng.randrange(9), rng.randrange(11)) for _ in range(rng.randrange(40))]
+                if operation < 0.8:
+                    changed, expected = states.add_many(layer, cells), objects.add_many(layer, cells)
+                else:
+                    changed, expected = states.erase_many(layer, cells), objects.erase_many(layer, cells)
+                self.assertEqual(sorted(changed), sorted(expected))
+            else:
+                states.special()
+                objects.special()
+            self.assertEqual(all_squares(states), all_squares(objects))
+        for x in range(9):
+            for y in range(11):
+                self.assertEqual(states[x][y].get_color((1, 2, 3), 4.5, x, y), objects[x][y].get_color((1, 2, 3), 4.5, x, y))
+                self.assertEqual(states[x][y].is_animated(), objects[x][y].is_animated())
+                self.assertEqual(states[x][y].state_key(), objects[x][y].state_key())
+        self.assertEqual(states.colors((255, 255, 255), 3).tolist(), objects.colors((255, 255, 255), 3).tolist())
+
+    @number("15.1")
+    def test_matches_objects(self):
+        self.check_matches_objects(Grid.DRAW_STYLE_SET, 21)
+        self.check_matches_objects(Grid.DRAW_STYLE_ADD, 22)
+        self.check_matches_objects(Grid.DRAW_STYLE_SEQUENCE, 23)
+
+    @number("15.2")
+    def test_shared_states(self):
+        grid = Grid(Grid.DRAW_STYLE_ADD, 30, 30, backend=Grid.BACKEND_STATES)
+        table = grid.arrays.table
+        everything = [(x, y) for x in range(30) for y in range(30)]
+        grid.add_many(red, everything)
+        grid.add_many(lighten, everything[::3])
+        grid[0][0].add(rainbow)
+        # Empty, red, red then lighten, and the one square with rainbow as well.
+        self.assertEqual(len(table), 4)
+        self.assertIs(grid[5][5].store, grid[5][8].store)
+        self.assertEqual(len(table.transitions), 3)
+
+        # Squares 31 and 32 only have red, so this is the transition already made by add_many.
+        grid[1][1].add(lighten)
+        grid[1][2].add(lighten)
+        self.assertEqual((len(table), len(table.transitions)), (4, 3))
+        grid[0][3].add(lighten)
+        self.assertEqual((len(table), len(table.transitions)), (5, 4))
+        # The canonical stores are never changed by painting.
+        self.assertEqual(grid[0][1].store.applied_layers(), (red,))
+        self.assertEqual(grid[1][1].applied_layers(), (red, lighten))
+        self.assertEqual(grid[0][3].applied_layers(), (red, lighten, lighten))
+
+        grid.special()
+        self.assertEqual(grid[0][0].applied_layers(), (rainbow, lighten, red))
+        self.assertEqual(grid[0][1].get_color((0, 0, 0), 0, 0, 1), grid[0][1].store.get_color((0, 0, 0), 0, 0, 1))
+        self.assertEqual(len(table.colors), 1)
@@ -0,0 +1,46 @@
+import unittest
+from ed_utils.decorators import number
+
+from grid import Grid
+from layers import red, blue
+
+class TestGridViews(unittest.TestCase):
+
+    @number("17.1")
+    def test_indexing(self):
+        for backend in (Grid.BACKEND_OBJECTS, Grid.BACKEND_ARRAYS, Grid.BACKEND_STATES):
+            grid = Grid(Grid.DRAW_STYLE_SET, 4, 3, backend=backend)
+            self.assertEqual(len(grid.grid), 4)
+            self.assertEqual(len(grid[0]), 3)
+            grid[1, 2].add(red)
+            self.assertEqual(grid[1][2].applied_layers(), (red,))
+            self.assertEqual(grid[-3, -1].applied_layers(), (red,))
+            self.assertEqual(grid[1][-1].applied_layers(), (red,))
+            self.assertIn((1, 2), grid.dirty)
+            for x, y in ((4, 0), (0, 3), (-5, 0), (0, -4)):
+                self.assertRaises(IndexError, grid.__getitem__, (x, y))
+            self.assertRaises(IndexError, grid[0].__getitem__, 3)
+        grid = Grid(Grid.DRAW_STYLE_ADD, 4, 3)
+        self.assertIs(grid[2, 1], grid[2][1])
+        self.assertIs(grid[2, 1], grid.cells[2 * 3 + 1])
+        self.assertEqual(list(grid[2]), [grid[2, y] for y in range(3)])
+
+    @number("17.2")
+    def test_regions(self):
+        for backend in (Grid.BACKEND_OBJECTS, Grid.BACKEND_STATES):
+            grid = Grid(Grid.DRAW_STYLE_SEQUENCE, 5, 4, backend=backend)
+            grid.add_many(red, [(1, 1), (2, 2), (3, 1)])
+            region = grid.region(1, 1, 4, 3)
+            self.assertEqual(len(region), 6)
+            self.assertEqual(region.positions(), [(1, 1), (1, 2), (2, 1), (2, 2), (3, 1), (3, 2)])
+            self.assertEqual([store.applied_layers() for store in region], [(red,), (), (), (red,), (red,), ()])
+            for (x, y), store in region.items():
+                self.assertEqual(store.applied_layers(), grid[x, y].applied_layers())
+            # Stores from a view are the squares themselves.
+            for store in grid.row(3):
+                store.add(blue)
+            self.assertEqual([grid[x, 3].applied_layers() for x in range(5)], [(blue,)] * 5)
+            self.assertEqual(grid.column(2).positions(), [(2, y) for y in range(4)])
+            self.assertEqual(len(grid.region(2, 2, 2, 4)), 0)
+            self.assertRaises(IndexError, grid.region, 0, 0, 6, 1)
+            self.assertRaises(IndexError, grid.row, 4)
@@ -0,0 +1,60 @@
+import unittest
+from ed_utils.decorators import number
+
+from grid import Grid
+from layers import red, blue, green, lighten, darken
+
+def all_squares(grid):
+    return [grid[x, y].state_key() for x in range(grid.x) for y in range(grid.y)]
+
+class TestIncrementalSpecial(unittest.TestCase):
+
+    def painted(self):
+        grid = Grid(Grid.DRAW_STYLE_SEQUENCE, 40, 40)
+        palette = [red, blue, green, lighten, darken]
+        for x in range(grid.x):
+            for y in range(grid.y):
+                for k in range((x * 7 + y) % 4):
+                    grid[x, y].add(palette[(x + y + k) % len(palette)])
+        return grid
+
+    @number("21.1")
+    def test_sweep_matches_special(self):
+        grid = self.painted()
+        expected = self.painted()
+        expected.special()
+        before = grid.colors((255, 255, 255), 0).copy()
+        grid.start_special()
+        steps = 1
+        while not grid.step_special(0):
+            steps += 1
+            # Frames keep showing the squares as they were before the special.
+            self.assertTrue((grid.colors((255, 255, 255), 0) == before).all())
+        self.assertEqual(steps, -(-len(self.painted().occupied) // Grid.SPECIAL_SLICE))
+        self.assertEqual(all_squares(grid), all_squares(expected))
+        self.assertTrue((grid.colors((255, 255, 255), 0) == expected.colors((255, 255, 255), 0)).all())
+        self.assertTrue(grid.step_special(0))
+
+    @number("21.2")
+    def test_special_finishes_sweep(self):
+        grid = self.painted()
+        expected = self.painted()
+        expected.special()
+        expected.special()
+        grid.start_special()
+        grid.step_special(0)
+        grid.special()
+        self.assertIsNone(grid.sweep)
+        self.assertEqual(all_squares(grid), all_squares(expected))
+        grid.start_special()
+        grid.start_special()
+        expected.special()
+        expected.special()
+        grid.finish_special()
+        self.assertEqual(all_squares(grid), all_squares(expected))
+        for style in (Grid.DRAW_STYLE_SET, Grid.DRAW_STYLE_ADD):
+            grid = Grid(style, 4, 4)
+            grid[1, 1].add(red)
+            grid.start_special()
+            self.assertIsNone(grid.sweep)
+            self.assertTrue(grid.grid_special.active)
@@ -0,0 +1,70 @@
+import unittest
+from ed_utils.decorators import number
+
+from action import PaintAction
+from grid import Grid
+from undo import UndoTracker
+from layers import red, blue, green, lighten
+from tests.test_misc.grid_changes import make_grids, random_changes
+
+def squares_with(grid):
+    layers = {}
+    for x in range(grid.x):
+        for y in range(grid.y):
+            for layer in grid[x, y].painted_layers():
+                layers.setdefault(layer.index, set()).add((x, y))
+    return layers
+
+def all_squares(grid):
+    return [grid[x, y].state_key() for x in range(grid.x) for y in range(grid.y)]
+
+class TestLayerIndex(unittest.TestCase):
+
+    @number("19.1")
+    def test_index_follows_changes(self):
+        for style in Grid.DRAW_STYLE_OPTIONS:
+            for grid in make_grids(style, 8, 6):
+                for step in random_changes(grid, 19, 120):
+                    self.assertEqual(grid.layer_index.layers, squares_with(grid), (style, grid.backend, step))
+                # positions() gives the squares of a layer in order, as a scan of the grid finds them.
+                for index, positions in squares_with(grid).items():
+                    self.assertEqual(grid.layer_index.positions(index), sorted(positions))
+
+    @number("19.2")
+    def test_replace_and_erase_everywhere(self):
+        for style in Grid.DRAW_STYLE_OPTIONS:
+            for grid in make_grids(style, 8, 6):
+                for x in range(grid.x):
+                    for y in range(grid.y):
+                        if (x + y) % 3 == 0:
+                            grid[x, y].add(red)
+                        if x % 2 == 0:
+                            grid[x, y].add(lighten)
+                grid.special()
+                before = all_squares(grid)
+                expected = {position: tuple(green if layer is red else layer for layer in layers)
+                            for position, layers in ((position, grid[position].painted_layers())
+                                                     for position in grid.layer_index.positions(red.index))}
+                undo = UndoTracker()
+                action = PaintAction.replace_layer(grid, red, green)
+                undo.add_action(action)
+                self.assertEqual(len(action.steps), len(expected))
+                self.assertNotIn(red.index, grid.layer_index.layers)
+                for (x, y), layers in expected.items():
+                    if style == Grid.DRAW_STYLE_SEQUENCE:
+                        self.assertEqual({layer.index for layer in grid[x, y].painted_layers()}, {layer.index for layer in layers})
+                    else:
+                        self.assertEqual(grid[x, y].painted_layers(), layers, (style, grid.backend))
+                undo.undo(grid)
+                self.assertEqual(all_squares(grid), before, (style, grid.backend))
+                undo.redo(grid)
+                self.assertEqual(grid.layer_index.positions(green.index), sorted(expected))
+
+                with_lighten = grid.layer_index.positions(lighten.index)
+                erased = PaintAction.replace_layer(grid, lighten)
+                self.assertNotIn(lighten.index, grid.layer_index.layers)
+                self.assertTrue(all(lighten not in grid[position].painted_layers() for position in grid.occupied))
+                erased.undo_apply(grid)
+                self.assertEqual(len(erased.steps), len(with_lighten))
+                self.assertEqual(grid.layer_index.positions(lighten.index), with_lighten)
+                self.assertEqual(PaintAction.replace_layer(grid, blue).steps, [])
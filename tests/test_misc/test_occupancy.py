@@ -0,0 +1,55 @@
+import unittest
+from ed_utils.decorators import number
+
+from grid import Grid
+from renderer import render
+from layers import red, blue, lighten
+from tests.test_misc.grid_changes import make_grids, random_changes
+
+def occupied_squares(grid):
+    background = grid.background().state_key()
+    return {(x, y) for x in range(grid.x) for y in range(grid.y) if grid[x, y].state_key() != background}
+
+class TestOccupancy(unittest.TestCase):
+
+    @number("18.1")
+    def test_index_follows_changes(self):
+        for style in Grid.DRAW_STYLE_OPTIONS:
+            for grid in make_grids(style):
+                for step in random_changes(grid, 18):
+                    self.assertEqual(grid.occupied.cells, occupied_squares(grid), (style, grid.backend, step))
+                xs = [x for x, _ in grid.occupied]
+                ys = [y for _, y in grid.occupied]
+                for x in set(xs):
+                    self.assertEqual(grid.occupied.columns[x], xs.count(x))
+                for y in set(ys):
+                    self.assertEqual(grid.occupied.rows[y], ys.count(y))
+                if xs:
+                    self.assertEqual(grid.occupied.bounds(), (min(xs), min(ys), max(xs) + 1, max(ys) + 1))
+
+    @number("18.2")
+    def test_bounds_and_growth(self):
+        grid = Grid(Grid.DRAW_STYLE_ADD, 20, 10, backend=Grid.BACKEND_CHUNKS, chunk_size=4)
+        self.assertIsNone(grid.occupied.bounds())
+        grid.add_many(red, [(3, 2), (12, 7)])
+        grid[5, 5].add(blue)
+        self.assertEqual(grid.occupied.bounds(), (3, 2, 13, 8))
+        grid.grow(x_before=2, y_before=1)
+        self.assertEqual(grid.occupied.cells, {(5, 3), (14, 8), (7, 6)})
+        grid.erase_many(red, [(5, 3), (14, 8)])
+        self.assertEqual(grid.occupied.bounds(), (7, 6, 8, 7))
+        self.assertEqual(dict(grid.occupied.rows), {6: 1})
+
+    @number("18.3")
+    def test_rendering_skips_empty_squares(self):
+        for backend in (Grid.BACKEND_OBJECTS, Grid.BACKEND_CHUNKS):
+            grid = Grid(Grid.DRAW_STYLE_SET, 9, 7, backend=backend, chunk_size=4)
+            grid.add_many(red, [(1, 1), (6, 5)])
+            grid[2, 2].add(lighten)
+            for start in ((255, 255, 255), (10, 20, 30)):
+                grid.special()
+                expected = [[tuple(grid[x, y].get_color(start, 0, x, y)) for y in range(grid.y)] for x in range(grid.x)]
+                image = render(grid, 0, start)
+                self.assertEqual([[tuple(image[x, y]) for y in range(grid.y)] for x in range(grid.x)], expected)
+                framebuffer = grid.colors(start, 0)
+                self.assertEqual([[tuple(framebuffer[x, y]) for y in range(grid.y)] for x in range(grid.x)], expected)
@@ -0,0 +1,40 @@
+import subprocess
+import sys
+import unittest
+from ed_utils.decorators import number
+
+from grid import Grid
+from renderer import render
+from layers import black, lighten, rainbow, invert, red, sparkle, darken, blue
+
+class TestRenderer(unittest.TestCase):
+
+    @number("8.1")
+    def test_matches_get_color(self):
+        palette = [black, lighten, rainbow, invert, red, sparkle, darken, blue]
+        for style in Grid.DRAW_STYLE_OPTIONS:
+            grid = Grid(style, 9, 7)
+            for x in range(grid.x):
+                for y in range(grid.y):
+                    for k in range((x + y) % 4):
+                        grid[x][y].add(palette[(x * 3 + y * 5 + k) % len(palette)])
+            self.assertRenderCorrect(grid, (255, 255, 255), 0)
+            self.assertRenderCorrect(grid, (0, 100, 200), 2.25)
+            grid.special()
+            self.assertRenderCorrect(grid, (255, 255, 255), 13)
+
+    @number("8.2")
+    def test_no_arcade(self):
+        code = "import sys, renderer, grid; sys.exit('arcade' in sys.modules)"
+        self.assertEqual(subprocess.run([sys.executable, "-c", code]).returncode, 0, "renderer imported arcade")
+
+    def assertRenderCorrect(self, grid: Grid, start, timestamp):
+        image = render(grid, timestamp, start)
+        self.assertEqual(image.shape, (grid.x, grid.y, 3))
+        for x in range(grid.x):
+            for y in range(grid.y):
+                self.assertEqual(
+                    tuple(image[x, y]),
+                    tuple(grid[x][y].get_color(start, timestamp, x, y)),
+                    "Rendered colour differs from get_color."
+                )
@@ -0,0 +1,79 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+import layer_util
+from grid import Grid
+from layer_util import LAYERS, get_layers, register
+
+def all_squares(grid):
+    return [grid[x][y].applied_layers() for x in range(grid.x) for y in range(grid.y)]
+
+class TestSequencePlanes(unittest.TestCase):
+
+    @number("12.1")
+    def test_matches_objects(self):
+        rng = random.Random(13)
+        all_layers = [layer for layer in get_layers() if layer is not None]
+        objects = Grid(Grid.DRAW_STYLE_SEQUENCE, 9, 11)
+        planes = Grid(Grid.DRAW_STYLE_SEQUENCE, 9, 11, backend=Grid.BACKEND_PLANES)
+        for _ in range(300):
+            operation = rng.random()
+            layer = rng.choice(all_layers)
+            x, y = rng.randrange(9), rng.randrange(11)
+            if operation < 0.3:
+                self.assertEqual(planes[x][y].add(layer), objects[x][y].add(layer))
+            elif operation < 0.4:
+                self.assertEqual(planes[x][y].erase(layer), objects[x][y].erase(layer))
+            elif operation < 0.45:
+                planes[x][y].special()
+                objects[x][y].special()
+            elif operation < 0.95:
+                cells = [(rng.randrange(9), rng.randrange(11)) for _ in range(rng.randrange(40))]
+                if operation < 0.8:
+                    changed, expected = planes.add_many(layer, cells), objects.add_many(layer, cells)
+                else:
+                    changed, expected = planes.erase_many(layer, cells), objects.erase_many(layer, cells)
+                self.assertEqual(sorted(changed), sorted(set(expected)))
+            else:
+                planes.special()
+                objects.special()
+            self.assertEqual(all_squares(planes), all_squares(objects))
+        for x in range(9):
+            for y in range(11):
+                self.assertEqual(planes[x][y].get_color((1, 2, 3), 4.5, x, y), objects[x][y].get_color((1, 2, 3), 4.5, x, y))
+        self.assertEqual(planes.colors((255, 255, 255), 3).tolist(), objects.colors((255, 255, 255), 3).tolist())
+        self.assertRaises(TypeError, Grid, Grid.DRAW_STYLE_ADD, 2, 2, backend=Grid.BACKEND_PLANES)
+
+    @number("12.2")
+    def test_many_layers(self):
+        get_layers()
+        registered = layer_util.cur_layer_index
+        capacity = len(LAYERS)
+        try:
+            extra = []
+            for i in range(150):
+                def shift(color, timestamp, x, y, i=i):
+                    return tuple((c + i) % 256 for c in color)
+                shift.__name__ = f"shift_{i:03}"
+                extra.append(register(shift))
+            self.assertGreater(len(LAYERS), 150)
+            self.assertIs(LAYERS[registered + 149], extra[-1])
+            self.assertEqual(extra[-1].index, registered + 149)
+
+            rng = random.Random(150)
+            objects = Grid(Grid.DRAW_STYLE_SEQUENCE, 5, 5)
+            planes = Grid(Grid.DRAW_STYLE_SEQUENCE, 5, 5, backend=Grid.BACKEND_PLANES)
+            for layer in extra + [layer for layer in get_layers()[:registered]]:
+                cells = [(rng.randrange(5), rng.randrange(5)) for _ in range(8)]
+                planes.add_many(layer, cells)
+                objects.add_many(layer, cells)
+            for _ in range(3):
+                planes.special()
+                objects.special()
+                self.assertEqual(all_squares(planes), all_squares(objects))
+        finally:
+            for i in range(registered, layer_util.cur_layer_index):
+                LAYERS[i] = None
+            layer_util.cur_layer_index = registered
+            LAYERS.resize(capacity)
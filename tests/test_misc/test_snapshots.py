@@ -0,0 +1,100 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from action import PaintAction, PaintStep
+from grid import Grid
+from layer_util import get_layers
+from layers import red, blue, green
+from replay import ReplayTracker
+from undo import UndoTracker
+
+def all_squares(grid):
+    return [grid[x][y].applied_layers() for x in range(grid.x) for y in range(grid.y)]
+
+class TestSnapshots(unittest.TestCase):
+
+    @number("16.1")
+    def test_restore(self):
+        rng = random.Random(24)
+        all_layers = [layer for layer in get_layers() if layer is not None]
+        for style in Grid.DRAW_STYLE_OPTIONS:
+            # 70 * 50 squares need 4 leaves.
+            grid = Grid(style, 70, 50, backend=Grid.BACKEND_STATES)
+            saved = []
+            for _ in range(40):
+                layer = rng.choice(all_layers)
+                operation = rng.random()
+                if operation < 0.5:
+                    grid.add_many(layer, [(rng.randrange(70), rng.randrange(50)) for _ in range(rng.randrange(200))])
+                elif operation < 0.7:
+                    grid.erase_many(layer, [(rng.randrange(70), rng.randrange(50)) for _ in range(rng.randrange(200))])
+                elif operation < 0.8:
+                    grid.special()
+                else:
+                    grid[rng.randrange(70)][rng.randrange(50)].add(layer)
+                if rng.random() < 0.3:
+                    saved.append((grid.snapshot(), all_squares(grid), grid.colors((255, 255, 255), 1).copy()))
+            rng.shuffle(saved)
+            for snapshot, squares, colors in saved:
+                grid.restore(snapshot)
+                self.assertEqual(all_squares(grid), squares)
+                # Only the squares which differ are marked dirty, and that is enough for colors().
+                self.assertEqual(grid.colors((255, 255, 255), 1).tolist(), colors.tolist())
+            self.assertRaises(ValueError, grid.restore, Grid(style, 5, 5, backend=Grid.BACKEND_STATES).snapshot())
+        self.assertRaises(TypeError, Grid(Grid.DRAW_STYLE_SET, 5, 5).snapshot)
+
+    @number("16.2")
+    def test_sharing(self):
+        # 256 * 256 squares are 64 leaves under 2 nodes and the root.
+        grid = Grid(Grid.DRAW_STYLE_SEQUENCE, 256, 256, backend=Grid.BACKEND_STATES)
+        grid.add_many(red, [(x, y) for x in range(256) for y in range(256)])
+        tree = grid.arrays.states
+        before = grid.snapshot()
+        self.assertIs(tree.root, before.root)
+
+        # One write copies the path to its leaf, and nothing else.
+        grid[200][3].add(blue)
+        self.assertIsNot(tree.root, before.root)
+        leaf = (200 * 256 + 3) // 1024
+        for i in range(32):
+            self.assertIs(tree.root.children[1].children[i] is before.root.children[1].children[i], i != leaf % 32)
+        self.assertIs(tree.root.children[0], before.root.children[0])
+        # More writes to the same leaf before the next snapshot are in place.
+        path = tree.root.children[1].children[leaf % 32]
+        grid[200][4].add(blue)
+        self.assertIs(tree.root.children[1].children[leaf % 32], path)
+
+        grid.dirty.clear()
+        grid.restore(before)
+        self.assertEqual(grid.dirty, {(200, 3), (200, 4)})
+        self.assertEqual(grid[200][3].applied_layers(), (red,))
+
+    @number("16.3")
+    def test_trackers(self):
+        grid = Grid(Grid.DRAW_STYLE_SET, 5, 5, backend=Grid.BACKEND_STATES)
+        undo = UndoTracker()
+        replay = ReplayTracker()
+        for layer in (red, blue, green):
+            action = PaintAction([PaintStep((2, 2), layer)])
+            before = grid.snapshot()
+            action.redo_apply(grid)
+            undo.add_action(action, before)
+            replay.add_action(action, snapshot=grid.snapshot())
+
+        # Undoing by erasing would leave the square empty, the snapshot puts blue back.
+        undone = undo.undo(grid)
+        self.assertEqual(grid[2][2].applied_layers(), (blue,))
+        replay.add_action(undone, True, grid.snapshot())
+        undo.undo(grid)
+        self.assertEqual(grid[2][2].applied_layers(), (red,))
+        undo.redo(grid)
+        self.assertEqual(grid[2][2].applied_layers(), (blue,))
+        undo.undo(grid)
+        self.assertEqual(grid[2][2].applied_layers(), (red,))
+
+        other = Grid(Grid.DRAW_STYLE_SET, 5, 5, backend=Grid.BACKEND_STATES)
+        played = []
+        while not replay.play_next_action(other):
+            played.append(other[2][2].applied_layers())
+        self.assertEqual(played, [(red,), (blue,), (green,), (blue,)])
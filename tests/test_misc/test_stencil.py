@@ -0,0 +1,44 @@
+import unittest
+from ed_utils.decorators import number
+
+from grid import Grid
+from layers import red
+from stencil import get_stencil, register_shape, SHAPES, DIAMOND, SQUARE, CIRCLE
+
+class TestStencil(unittest.TestCase):
+
+    @number("22.1")
+    def test_shapes_are_clipped(self):
+        for size in (0, 1, 2, 5, 40):
+            for px, py in ((0, 0), (3, 7), (-2, 5), (9, 12), (30, -30)):
+                inside = lambda x, y: 0 <= x < 10 and 0 <= y < 13
+                expected = {
+                    DIAMOND: [(x, y) for x in range(10) for y in range(13) if abs(x - px) + abs(y - py) <= size],
+                    SQUARE: [(x, y) for x in range(10) for y in range(13) if max(abs(x - px), abs(y - py)) <= size],
+                    CIRCLE: [(x, y) for x in range(10) for y in range(13) if (x - px) ** 2 + (y - py) ** 2 <= (size + 0.5) ** 2],
+                }
+                for shape, positions in expected.items():
+                    self.assertEqual(get_stencil(shape, size).positions(px, py, 10, 13), positions, (shape, size, px, py))
+        self.assertEqual(len(get_stencil(DIAMOND, 128)), 2 * 128 * 129 + 1)
+        self.assertIs(get_stencil(DIAMOND, 3), get_stencil(DIAMOND, 3))
+
+    @number("22.2")
+    def test_grid_paint(self):
+        grid = Grid(Grid.DRAW_STYLE_SET, 5, 5)
+        # Nothing is mirrored back into the grid at the edges.
+        self.assertEqual(grid.paint(red, 0, 0), [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (2, 0)])
+        self.assertEqual(grid.occupied.cells, {(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (2, 0)})
+
+        register_shape("bar", lambda size: ((dx, 0, 0) for dx in range(-size, size + 1)))
+        try:
+            for backend in (Grid.BACKEND_OBJECTS, Grid.BACKEND_ARRAYS):
+                grid = Grid(Grid.DRAW_STYLE_ADD, 6, 4, brush_size=100, backend=backend)
+                grid.brush_shape = "bar"
+                self.assertEqual(grid.paint(red, 2, 1), [(x, 1) for x in range(6)])
+                self.assertEqual(sorted(grid.occupied), [(x, 1) for x in range(6)])
+        finally:
+            del SHAPES["bar"]
+            get_stencil.cache_clear()
+        grid.brush_shape = "blob"
+        self.assertRaises(ValueError, grid.paint, red, 1, 1)
+        self.assertRaises(ValueError, get_stencil, DIAMOND, -1)
@@ -0,0 +1,74 @@
+import unittest
+from ed_utils.decorators import number
+
+from grid import Grid
+from layers import lighten
+from main import MyWindow
+from stencil import line, get_stencil, DIAMOND, SQUARE
+
+class FakeWindow:
+    GRID_SIZE_X = 20
+    GRID_SIZE_Y = 15
+    GRID_SQ_WIDTH = 10
+    GRID_SQ_HEIGHT = 10
+
+    def __init__(self, grid: Grid):
+        self.grid = grid
+        self.selected_layer_index = lighten.index
+        self.prev_pos = None
+
+FakeWindow.on_init = MyWindow.on_init
+FakeWindow.on_paint = MyWindow.on_paint
+FakeWindow.on_stroke = MyWindow.on_stroke
+FakeWindow.on_undo = MyWindow.on_undo
+FakeWindow.try_draw = MyWindow.try_draw
+
+class TestStroke(unittest.TestCase):
+
+    @number("23.1")
+    def test_line(self):
+        for x0, y0 in ((0, 0), (3, -2)):
+            for x1 in range(-6, 7):
+                for y1 in range(-6, 7):
+                    squares = line(x0, y0, x1, y1)
+                    self.assertEqual(squares[0], (x0, y0))
+                    self.assertEqual(squares[-1], (x1, y1))
+                    self.assertEqual(len(squares), abs(x1 - x0) + abs(y1 - y0) + 1)
+                    for (ax, ay), (bx, by) in zip(squares, squares[1:]):
+                        self.assertEqual(abs(bx - ax) + abs(by - ay), 1)
+                    # The line from centre to centre passes through every square.
+                    for x, y in squares:
+                        cross = (x - x0) * (y1 - y0) - (y - y0) * (x1 - x0)
+                        self.assertLessEqual(abs(cross), (abs(x1 - x0) + abs(y1 - y0)) / 2, (x1, y1, x, y))
+
+    @number("23.2")
+    def test_stroke_paints_each_square_once(self):
+        points = line(-3, 2, 12, 9)
+        for shape in (DIAMOND, SQUARE):
+            stencil = get_stencil(shape, 2)
+            covered = set()
+            for px, py in points:
+                covered.update(stencil.positions(px, py, 10, 8))
+            spans = stencil.stroke(points, 10, 8)
+            positions = [(x, y) for x, y0, y1 in spans for y in range(y0, y1)]
+            self.assertEqual(positions, sorted(covered))
+
+        grid = Grid(Grid.DRAW_STYLE_ADD, FakeWindow.GRID_SIZE_X, FakeWindow.GRID_SIZE_Y)
+        window = FakeWindow(grid)
+        window.on_init()
+        brush = get_stencil(DIAMOND, grid.brush_size)
+        pressed = set(brush.positions(1, 1, grid.x, grid.y))
+        window.try_draw(15, 15)
+        # Moving within the square already painted paints nothing.
+        window.try_draw(16, 12)
+        self.assertEqual(grid.occupied.cells, pressed)
+        self.assertEqual(len(window.undo_track.undo_tracker), 1)
+        # A flick across the window is one action, adding the layer to each square once.
+        window.try_draw(185, 95)
+        self.assertEqual(window.prev_pos, (185, 95))
+        stroked = {(x, y) for x, y0, y1 in brush.stroke(line(1, 1, 18, 9)[1:], grid.x, grid.y) for y in range(y0, y1)}
+        for x in range(grid.x):
+            for y in range(grid.y):
+                self.assertEqual(len(grid[x, y].painted_layers()), ((x, y) in pressed) + ((x, y) in stroked))
+        window.on_undo()
+        self.assertEqual(grid.occupied.cells, pressed)
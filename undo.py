@@ -1,14 +1,18 @@
 from __future__ import annotations
 from action import PaintAction
 from grid import Grid
+from state_tree import Snapshot
 from data_structures.stack_adt import ArrayStack
 
 class UndoTracker:
     def __init__(self) -> None:
+        # undo_snapshots and redo_snapshots hold the snapshot given with each action, or None, in step with the actions
         self.undo_tracker = ArrayStack(10000)
         self.redo_tracker = ArrayStack(10000)
+        self.undo_snapshots = ArrayStack(10000)
+        self.redo_snapshots = ArrayStack(10000)
 
-    def add_action(self, action: PaintAction) -> None:
+    def add_action(self, action: PaintAction, snapshot: Snapshot | None = None) -> None:
         """
         Adds an action to the undo tracker.
 
@@ -17,6 +21,8 @@ class UndoTracker:
 
         Args:
         - Paintaction
+        - snapshot: optionally, Grid.snapshot() from just before the action, which undo restores
+          instead of undoing each step, so the grid goes back exactly as it was
 
         Raises:
         - Exception if is full
@@ -31,8 +37,10 @@ class UndoTracker:
         if self.undo_tracker.is_full():
             return
         self.undo_tracker.push(action)
+        self.undo_snapshots.push(snapshot)
 
         self.redo_tracker.clear()
+        self.redo_snapshots.clear()
 
     def undo(self, grid: Grid) -> PaintAction|None:
         """
@@ -49,13 +57,18 @@ class UndoTracker:
         - The action that was undone, or None.
 
         Complexity:
-        - Worst case and Best: O(N)
+        - Worst case and Best: O(N), or see Grid.restore if the action has a snapshot
         """
         if self.undo_tracker.is_empty():
             return None
         undo_action = self.undo_tracker.pop()
+        snapshot = self.undo_snapshots.pop()
         self.redo_tracker.push(undo_action)
-        undo_action.undo_apply(grid) #O(N), input size is the steps
+        self.redo_snapshots.push(snapshot)
+        if snapshot is not None:
+            grid.restore(snapshot)
+        else:
+            undo_action.undo_apply(grid) #O(N), input size is the steps
         return undo_action
 
     def redo(self, grid: Grid) -> PaintAction|None:
@@ -79,5 +92,6 @@ class UndoTracker:
             return
         redo_action = self.redo_tracker.pop()
         self.undo_tracker.push(redo_action)
+        self.undo_snapshots.push(self.redo_snapshots.pop())
         redo_action.redo_apply(grid) #O(N), input size is the steps
         return redo_action